@@ -1,5 +1,8 @@
+import os
 import socket
 import subprocess
+import threading
+from utils.network_info import NetworkInfoCache
 
 # Konfigurationseinstellungen für LED-Visualisierung
 class Config:   
@@ -14,6 +17,16 @@ class Config:
     LED_INVERT = False                   # 
     LED_CHANNEL_ONE = 0                  # PWM-Kanäle für die LED-Steuerung 
     LED_CHANNEL_TWO = 1                  # Separate Kanäle für die zwei LED-Streifen 
+    LED_OUTPUT = 'ws281x'                # 'ws281x' = echte LED-Streifen, 'virtual' = Simulator ohne Hardware (main.py --simulate)
+    FRAME_PAUSE = 0.01                   # Feste Pause nach jedem Frame in Sekunden (zusätzlich zur Wartezeit des Musters)
+    # Echtzeit-Profil für den Render-Thread (nur Linux, siehe utils/realtime.py)
+    REALTIME_ENABLED = False             # Profil aktivieren (Wirkung über pivoltmeter_frame_jitter_seconds prüfen)
+    REALTIME_RENDER_CPUS = None          # Kerne für den Render-Thread, z. B. [3] (None = letzter Kern, [] = nicht festlegen)
+    REALTIME_AUDIO_CPUS = None           # Kerne für die Audio-Initialisierung (None = alle außer den Render-Kernen)
+    REALTIME_POLICY = 'fifo'             # 'fifo', 'rr' oder None; benötigt root bzw. CAP_SYS_NICE
+    REALTIME_PRIORITY = 50               # Echtzeit-Priorität 1-99
+    REALTIME_GC_FREEZE = True            # Nach dem Start gc.freeze() aufrufen
+    REALTIME_GC_IDLE = True              # Garbage Collection nur in der Wartezeit zwischen zwei Frames
     # Audio-Visualisierungs-Einstellungen
     AUDIO_SMOOTHING = 0.3                 # Glättungsfaktor für Audio-Visualisierung (0.3)
     AUDIO_FORMAT = 'int16'                # Audioformat für die Aufnahme (16-bit Integer)     
@@ -21,13 +34,84 @@ class Config:
     AUDIO_RATE = 44100                    # Audio-Abtastrate (44.1kHz, CD-Qualität)  
     AUDIO_CHUNK = 1024                    #   Größe der Audio-Chunks für die Verarbeitung
                                         # Kleinere Werte erhöhen die Reaktionsgeschwindigkeit, erhöhen aber auch CPU-Last
+    AUDIO_DEVICE_NAME = None              # Audiogerät über (Teil des) Namen festlegen, z. B. 'USB' (None = automatisch)
+    AUDIO_DEVICE_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'state', 'audio_device.json')
+                                        # Zuletzt verwendetes Audiogerät, damit beim Start nicht alle Geräte durchsucht werden
+    AUDIO_IDLE_TIMEOUT = 60               # Sekunden ohne Audio-Modus, nach denen das Audiogerät freigegeben wird (None = nie)
+    # Stille-Erkennung im Audio-Modus (Audio wird weiter gelesen, damit das Signal sofort erkannt wird)
+    SILENCE_MODE = 'blank'                # 'blank' = LEDs aus, kein show(); 'throttle' = Bildrate SILENCE_FPS; None = aus
+    SILENCE_THRESHOLD = 2.0               # Pegel in Prozent, unter dem das Signal als still gilt
+    SILENCE_RESUME_THRESHOLD = 4.0        # Pegel in Prozent, ab dem sofort wieder normal visualisiert wird
+    SILENCE_SECONDS = 30                  # Sekunden unter SILENCE_THRESHOLD bis zur Stille
+    SILENCE_FPS = 2                       # Bildrate bei Stille im Modus 'throttle'
+    # Adaptive Qualität im Audio-Modus (siehe utils/quality.py, Status unter /quality)
+    QUALITY_ADAPTIVE = True               # Analyse und Bildrate bei Überlast automatisch reduzieren
+    QUALITY_HIGH_LOAD = 0.9               # Anteil am Frame-Budget (Chunk-Dauer minus FRAME_PAUSE), ab dem reduziert wird
+    QUALITY_LOW_LOAD = 0.5                # Anteil, unter dem die Qualität wieder angehoben wird
+    QUALITY_WINDOW = 30                   # Frames pro Bewertung
+    # Steuer-Socket für lokale Automatisierung (Zeilenprotokoll, siehe utils/control_socket.py)
+    CONTROL_SOCKET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'state', 'control.sock')
+                                        # Pfad des Unix-Sockets (None = aus)
+    CONTROL_SOCKET_MODE = 0o660           # Zugriffsrechte des Sockets
+    # OSC über UDP für Lichtpulte (Adressen siehe utils/osc_server.py)
+    OSC_PORT = None                       # UDP-Port, z. B. 9000 (None = aus)
+    OSC_PREFIX = '/pivoltmeter'           # Präfix aller OSC-Adressen
+    OSC_COALESCE_SECONDS = 0.02           # Nachrichten innerhalb dieser Zeit ergeben eine Konfigurationsversion
+    # Externe Frames (rohe RGB-Bytes, siehe led_controllers/frame_ingest.py)
+    INGEST_ENABLED = False                # POST /frames, UDP und Unix-Socket; externe Frames haben Vorrang vor jedem Modus
+    INGEST_TIMEOUT = 2.0                  # Sekunden ohne Frame, bis wieder das konfigurierte Muster läuft
+    INGEST_UDP_PORT = 7777                # Ein Frame pro Datagramm (None = aus)
+    INGEST_UNIX_SOCKET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'state', 'frames.sock')
+                                        # Unix-Datagram-Socket für lokale Programme (None = aus)
+    SHARED_FRAMES_NAME = None             # Frame-Puffer als Shared Memory /dev/shm/<name>, z. B. 'pivoltmeter-frames' (siehe led_controllers/shared_frames.py)
+    SHARED_FRAMES_MODE = 0o660            # Zugriffsrechte des Segments (Schreibrecht = LEDs steuern)
+    SHARED_FRAMES_GROUP = None            # Gruppe des Segments, z. B. 'video' (None = Gruppe des Prozesses)
     # Muster-Visualisierungs-Einstellungen
+    VISUALIZATION_MODES = ['audio', 'static', 'off']
+    AUDIO_PATTERNS = ['audio_pattern_01', 'audio_pattern_02', 'audio_pattern_03', 'audio_pattern_04', 'audio_pattern_05', 'audio_pattern_06']
+    STATIC_PATTERNS = ['static_pattern_01', 'static_pattern_02', 'static_pattern_03', 'static_pattern_04']
     VISUALIZATION_MODE = 'audio'        # Standardmodus = audio, static, off
     AUDIO_PATTERN = 'audio_pattern_06'   # LED Modus wenn Audiosynchronsierung ausgewählt ist
     STATIC_PATTERN = 'static_pattern_01' # LED Modus wenn KEINE Audiosynchronsierung ausgewählt ist
+    # Einstellbare Parameter je Muster: {muster: {name: (minimum, maximum, standard)}}
+    # gain = Verstärkung, decay = Anteil des neuen Pegels pro Chunk (höher = schnelleres Abklingen),
+    # width = Länge der Anzeige, hue_speed / hue_offset = Bewegung und Verschiebung im Verlauf
+    PATTERN_PARAMETERS = {
+        'audio_pattern_01': {'gain': (0.5, 50.0, 5.0), 'decay': (0.01, 1.0, AUDIO_SMOOTHING), 'width': (0.1, 4.0, 1.0)},
+        'audio_pattern_02': {'gain': (0.5, 50.0, 5.0), 'decay': (0.01, 1.0, AUDIO_SMOOTHING),
+                             'hue_speed': (-2.0, 2.0, 0.1), 'hue_offset': (0.0, 1.0, 0.0)},
+        'audio_pattern_03': {'gain': (0.5, 50.0, 5.0), 'decay': (0.01, 1.0, AUDIO_SMOOTHING), 'width': (0.1, 4.0, 1.0),
+                             'hue_speed': (-2.0, 2.0, 0.2), 'hue_offset': (0.0, 1.0, 0.0)},
+        'audio_pattern_04': {'gain': (0.5, 50.0, 5.0), 'decay': (0.01, 1.0, AUDIO_SMOOTHING), 'width': (0.1, 4.0, 1.0)},
+        'audio_pattern_05': {'gain': (0.5, 50.0, 5.0), 'decay': (0.01, 1.0, AUDIO_SMOOTHING),
+                             'hue_speed': (-2.0, 2.0, 0.1), 'hue_offset': (0.0, 1.0, 0.0)},
+        'audio_pattern_06': {'gain': (0.5, 50.0, 5.0), 'decay': (0.01, 1.0, AUDIO_SMOOTHING), 'width': (0.1, 4.0, 1.0),
+                             'hue_speed': (-2.0, 2.0, 0.2), 'hue_offset': (0.0, 1.0, 0.0)},
+        'static_pattern_01': {'speed': (0.1, 10.0, 1.0)},
+        'static_pattern_02': {'speed': (0.1, 10.0, 1.0)},
+        'static_pattern_03': {'speed': (0.1, 10.0, 1.0)},
+        'static_pattern_04': {'speed': (0.1, 10.0, 1.0), 'density': (0.0, 1.0, 0.1)},
+    }
+    PATTERN_PARAMS = {}                  # Vom Standard abweichende Werte, {muster: {name: wert}}
+    MODULATION = []                      # Audio-Merkmale -> Muster-Parameter (siehe led_controllers/modulation.py)
+    ZONES = []                           # Zonen mit eigenem Muster, Farbe und Bildrate (leer = ein Muster auf beiden Streifen, siehe utils/zones.py)
 
-    LED_COLOR = 'rainbow'                      # hier werden namen verwendet z. B. GREEN = nur Grün, RAINBOW = verschiedene REGENB Bogen Farben
+    LED_COLOR = 'rainbow'                      # Palettenname (z. B. green, rainbow, fire) oder Hex-Farbe wie '#ff8800'
+    PALETTE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'state', 'palettes.json')
+                                        # Über /palettes hochgeladene Paletten
+    CONFIG_STORE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'state', 'config.json')
+                                        # Zuletzt gewählte Einstellungen, werden beim Start geladen (None = nicht speichern)
+    CONFIG_STORE_DEBOUNCE = 1.0          # Sekunden ohne weitere Änderung, bevor gespeichert wird
 
+    # Versionsnummer der angewendeten Konfiguration (wird bei jeder Änderung erhöht)
+    CONFIG_VERSION = 0
+
+    # Netzwerk-Einstellungen
+    NETWORK_INFO_TTL = 60                 # Maximales Alter der zwischengespeicherten IP-Adressen in Sekunden
+
+    _network_info = None
+    _network_info_lock = threading.Lock()
+    _settings_lock = threading.Lock()
     
     @classmethod
     def set_visualization_mode(cls, mode):
@@ -36,7 +120,7 @@ class Config:
         
         :param mode: Einer der unterstützten Modi ('audio', 'static', 'off')
         """
-        if mode in ['audio', 'static', 'off']:
+        if mode in cls.VISUALIZATION_MODES:
             cls.VISUALIZATION_MODE = mode
         else:
             raise ValueError(f"Ungültiger Visualisierungsmodus: {mode}")
@@ -45,12 +129,12 @@ class Config:
     def set_pattern_per_mode(cls, pattern):
         # Prüfen, welcher Modus aktiv ist und entsprechend das Muster setzen
         if cls.VISUALIZATION_MODE == 'audio':
-            if pattern in ['audio_pattern_01', 'audio_pattern_02', 'audio_pattern_03','audio_pattern_04','audio_pattern_05','audio_pattern_06']:
+            if pattern in cls.AUDIO_PATTERNS:
                 cls.AUDIO_PATTERN = pattern
             else:
                 raise ValueError(f"Ungültiges Audio-Muster: {pattern}")
         elif cls.VISUALIZATION_MODE == 'static':
-            if pattern in ['static_pattern_01', 'static_pattern_02', 'static_pattern_03', 'static_pattern_04']:
+            if pattern in cls.STATIC_PATTERNS:
                 cls.STATIC_PATTERN = pattern
             else:
                 raise ValueError(f"Ungültiges Static-Muster: {pattern}")
@@ -60,6 +144,178 @@ class Config:
         else:
             raise ValueError(f"Ungültiger Visualisierungsmodus: {cls.VISUALIZATION_MODE}")
     
+    @classmethod
+    def snapshot(cls):
+        """
+        Liefert die zur Laufzeit änderbaren Einstellungen als Dictionary.
+        
+        :return: Dictionary mit den aktuellen Einstellungen
+        """
+        with cls._settings_lock:
+            return {
+                "visualization_mode": cls.VISUALIZATION_MODE,
+                "audio_pattern": cls.AUDIO_PATTERN,
+                "static_pattern": cls.STATIC_PATTERN,
+                "led_color": cls.LED_COLOR,
+                "led_brightness": cls.LED_BRIGHTNESS,
+                "pattern_params": {pattern: dict(params) for pattern, params in cls.PATTERN_PARAMS.items()},
+                "modulation": [dict(route) for route in cls.MODULATION],
+                "zones": [dict(zone) for zone in cls.ZONES],
+            }
+    
+    @classmethod
+    def validate_settings(cls, settings, base=None):
+        """
+        Prüft eine (Teil-)Menge von Einstellungen, ohne die Konfiguration zu verändern.
+        Der Schlüssel 'pattern' wird abhängig vom Modus auf 'audio_pattern' bzw.
+        'static_pattern' abgebildet.
+        
+        :param settings: Dictionary mit den zu ändernden Einstellungen
+        :param base: Einstellungen, auf die sich die Änderung bezieht (Standard: snapshot())
+        :return: Normalisiertes Dictionary mit den geprüften Einstellungen
+        :raises ValueError: Wenn eine Einstellung ungültig ist
+        """
+        if not isinstance(settings, dict):
+            raise ValueError("Einstellungen müssen als Objekt übergeben werden")
+        
+        state = dict(base if base is not None else cls.snapshot())
+        result = {}
+        
+        for key in settings:
+            if key not in ('visualization_mode', 'audio_pattern', 'static_pattern', 'pattern', 'led_color', 'led_brightness', 'pattern_params', 'modulation', 'zones'):
+                raise ValueError(f"Unbekannte Einstellung: {key}")
+        
+        if 'visualization_mode' in settings:
+            mode = settings['visualization_mode']
+            if mode not in cls.VISUALIZATION_MODES:
+                raise ValueError(f"Ungültiger Visualisierungsmodus: {mode}")
+            result['visualization_mode'] = state['visualization_mode'] = mode
+        
+        if 'audio_pattern' in settings:
+            if settings['audio_pattern'] not in cls.AUDIO_PATTERNS:
+                raise ValueError(f"Ungültiges Audio-Muster: {settings['audio_pattern']}")
+            result['audio_pattern'] = settings['audio_pattern']
+        
+        if 'static_pattern' in settings:
+            if settings['static_pattern'] not in cls.STATIC_PATTERNS:
+                raise ValueError(f"Ungültiges Static-Muster: {settings['static_pattern']}")
+            result['static_pattern'] = settings['static_pattern']
+        
+        if 'pattern' in settings:
+            # Muster bezieht sich auf den (ggf. gleichzeitig geänderten) Modus
+            pattern = settings['pattern']
+            if state['visualization_mode'] == 'audio':
+                if pattern not in cls.AUDIO_PATTERNS:
+                    raise ValueError(f"Ungültiges Audio-Muster: {pattern}")
+                result['audio_pattern'] = pattern
+            elif state['visualization_mode'] == 'static':
+                if pattern not in cls.STATIC_PATTERNS:
+                    raise ValueError(f"Ungültiges Static-Muster: {pattern}")
+                result['static_pattern'] = pattern
+        
+        if 'led_color' in settings:
+            from led_controllers.palette import palettes
+            color = settings['led_color']
+            if not isinstance(color, str) or not color:
+                raise ValueError(f"Ungültige Farbe: {color}")
+            result['led_color'] = palettes.normalize(color)
+        
+        if 'led_brightness' in settings:
+            brightness = settings['led_brightness']
+            if isinstance(brightness, bool) or not isinstance(brightness, (int, float)) or not 0 <= brightness <= 255:
+                raise ValueError(f"Ungültige Helligkeit: {brightness}")
+            result['led_brightness'] = int(brightness)
+        
+        if 'pattern_params' in settings:
+            result['pattern_params'] = cls._merge_pattern_params(state['pattern_params'], settings['pattern_params'])
+        
+        if 'modulation' in settings:
+            # Ersetzt alle Routen auf einmal
+            from led_controllers.modulation import validate_routes
+            result['modulation'] = validate_routes(settings['modulation'], cls)
+        
+        if 'zones' in settings:
+            # Ersetzt alle Zonen auf einmal
+            from utils.zones import validate_zones
+            result['zones'] = validate_zones(settings['zones'], cls)
+        
+        return result
+    
+    @classmethod
+    def _merge_pattern_params(cls, current, changes):
+        """
+        Prüft Parameteränderungen und führt sie mit den bisherigen Werten zusammen.
+        Ein Wert None setzt den Parameter auf den Standard zurück.
+        
+        :param current: Bisherige Werte {muster: {name: wert}}
+        :param changes: Änderungen im selben Format
+        :return: Neues, vollständiges Dictionary (current bleibt unverändert)
+        :raises ValueError: Bei unbekanntem Muster, Parameter oder Wert außerhalb des Bereichs
+        """
+        if not isinstance(changes, dict):
+            raise ValueError("pattern_params muss ein Objekt {muster: {name: wert}} sein")
+        merged = {pattern: dict(params) for pattern, params in current.items()}
+        for pattern, params in changes.items():
+            specs = cls.PATTERN_PARAMETERS.get(pattern)
+            if specs is None:
+                raise ValueError(f"Muster ohne Parameter: {pattern}")
+            if not isinstance(params, dict):
+                raise ValueError(f"Parameter für {pattern} müssen ein Objekt sein")
+            values = merged.setdefault(pattern, {})
+            for name, value in params.items():
+                if name not in specs:
+                    raise ValueError(f"Unbekannter Parameter für {pattern}: {name}")
+                if value is None:
+                    values.pop(name, None)
+                    continue
+                minimum, maximum, _ = specs[name]
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not minimum <= value <= maximum:
+                    raise ValueError(f"{pattern}.{name} muss zwischen {minimum} und {maximum} liegen: {value}")
+                values[name] = float(value)
+            if not values:
+                del merged[pattern]
+        return merged
+    
+    @classmethod
+    def pattern_param(cls, pattern, name):
+        """
+        Aktueller Wert eines Muster-Parameters (Standard aus PATTERN_PARAMETERS, wenn nicht gesetzt).
+        Wird pro Frame im Render-Thread aufgerufen.
+        """
+        params = cls.PATTERN_PARAMS.get(pattern)
+        if params is not None and name in params:
+            return params[name]
+        return cls.PATTERN_PARAMETERS[pattern][name][2]
+    
+    @classmethod
+    def apply_settings(cls, settings, version=None):
+        """
+        Übernimmt bereits geprüfte Einstellungen als eine gemeinsame Konfigurationsversion.
+        
+        :param settings: Dictionary aus validate_settings()
+        :param version: Neue Versionsnummer (Standard: aktuelle Version + 1)
+        :return: Die neue Versionsnummer
+        """
+        with cls._settings_lock:
+            if 'visualization_mode' in settings:
+                cls.VISUALIZATION_MODE = settings['visualization_mode']
+            if 'audio_pattern' in settings:
+                cls.AUDIO_PATTERN = settings['audio_pattern']
+            if 'static_pattern' in settings:
+                cls.STATIC_PATTERN = settings['static_pattern']
+            if 'led_color' in settings:
+                cls.LED_COLOR = settings['led_color']
+            if 'led_brightness' in settings:
+                cls.LED_BRIGHTNESS = settings['led_brightness']
+            if 'pattern_params' in settings:
+                cls.PATTERN_PARAMS = settings['pattern_params']
+            if 'modulation' in settings:
+                cls.MODULATION = settings['modulation']
+            if 'zones' in settings:
+                cls.ZONES = settings['zones']
+            cls.CONFIG_VERSION = version if version is not None else cls.CONFIG_VERSION + 1
+            return cls.CONFIG_VERSION
+    
     @classmethod
     def get_ip_addresses(cls):
         """
@@ -102,20 +358,44 @@ class Config:
         return ip_addresses
 
     @classmethod
-    def to_json(cls):
+    def get_cached_ip_addresses(cls):
+        """
+        Gibt die zwischengespeicherten IP-Adressen zurück, ohne zu blockieren.
+        Die Ermittlung über get_ip_addresses() läuft im Hintergrund und wird nach
+        Ablauf von NETWORK_INFO_TTL oder bei Adressänderungen (Netlink) wiederholt.
+        
+        :return: Liste mit IP-Adressen
+        """
+        if cls._network_info is None:
+            with cls._network_info_lock:
+                if cls._network_info is None:
+                    cls._network_info = NetworkInfoCache(cls.get_ip_addresses, ttl=cls.NETWORK_INFO_TTL)
+                    cls._network_info.start()
+        return cls._network_info.get()
+
+    @classmethod
+    def to_json(cls, pending=None, version=None):
         """
         Konvertiert die aktuelle Konfiguration in ein JSON-kompatibles Dictionary.
         Dies ermöglicht es, die vollständige Konfiguration an den Client zu senden.
         
+        Args:
+            pending (dict): Noch nicht angewendete Einstellungen, die bereits berücksichtigt werden sollen
+            version (int): Versionsnummer, die zurückgegeben werden soll (Standard: CONFIG_VERSION)
+        
         Returns:
             dict: Ein Dictionary mit allen relevanten Konfigurationsparametern
         """
+        state = cls.snapshot()
+        if pending:
+            state.update(pending)
+        
         # Hole passenden Pattern-Namen basierend auf dem aktiven Modus
         pattern_name = ""
         pattern_id = ""
         
-        if cls.VISUALIZATION_MODE == 'audio':
-            pattern_id = cls.AUDIO_PATTERN
+        if state['visualization_mode'] == 'audio':
+            pattern_id = state['audio_pattern']
             if pattern_id == 'audio_pattern_01':
                 pattern_name = "Spektrum"
             elif pattern_id == 'audio_pattern_02':
@@ -124,8 +404,8 @@ class Config:
                 pattern_name = "Beat"
             elif pattern_id == 'audio_pattern_04':
                 pattern_name = "Stereo 01"
-        elif cls.VISUALIZATION_MODE == 'static':
-            pattern_id = cls.STATIC_PATTERN
+        elif state['visualization_mode'] == 'static':
+            pattern_id = state['static_pattern']
             if pattern_id == 'static_pattern_01':
                 pattern_name = "Simple Pulse"
             elif pattern_id == 'static_pattern_02':
@@ -138,27 +418,15 @@ class Config:
             pattern_name = "Aus"
         
         # Hole den Farbnamen in benutzerfreundlichem Format
-        color_name = ""
-        if cls.LED_COLOR.lower() == 'rainbow':
-            color_name = "Regenbogen"
-        elif cls.LED_COLOR.lower() == 'green':
-            color_name = "Grün"
-        elif cls.LED_COLOR.lower() == 'blue':
-            color_name = "Blau"
-        elif cls.LED_COLOR.lower() == 'red':
-            color_name = "Rot"
-        elif cls.LED_COLOR.lower() == 'purple':
-            color_name = "Lila"
-        elif cls.LED_COLOR.lower() == 'yellow':
-            color_name = "Gelb"
-        else:
-            color_name = cls.LED_COLOR
+        from led_controllers.palette import palettes
+        led_color = state['led_color'].lower()
+        color_name = palettes.label(led_color)
         
         # Modus-Name in benutzerfreundlichem Format
         mode_name = ""
-        if cls.VISUALIZATION_MODE == 'audio':
+        if state['visualization_mode'] == 'audio':
             mode_name = "Audio"
-        elif cls.VISUALIZATION_MODE == 'static':
+        elif state['visualization_mode'] == 'static':
             mode_name = "Statisch"
         else:
             mode_name = "Aus"
@@ -166,19 +434,23 @@ class Config:
         # Erstelle das Config-Dictionary
         config_dict = {
             # Technische Werte (für die Logik)
-            "visualization_mode": cls.VISUALIZATION_MODE,
-            "audio_pattern": cls.AUDIO_PATTERN,
-            "static_pattern": cls.STATIC_PATTERN,
+            "visualization_mode": state['visualization_mode'],
+            "audio_pattern": state['audio_pattern'],
+            "static_pattern": state['static_pattern'],
             "current_pattern": pattern_id,
-            "led_color": cls.LED_COLOR.lower(),
-            "led_brightness": cls.LED_BRIGHTNESS,
+            "led_color": led_color,
+            "led_brightness": state['led_brightness'],
+            "pattern_params": state['pattern_params'],
+            "modulation": state['modulation'],
+            "zones": state['zones'],
+            "config_version": version if version is not None else cls.CONFIG_VERSION,
             
             # Benutzerfreundliche Werte (für die Anzeige)
             "display": {
                 "mode_name": mode_name,
                 "color_name": color_name,
                 "pattern_name": pattern_name,
-                "ip_addresses": cls.get_ip_addresses()
+                "ip_addresses": cls.get_cached_ip_addresses()
             }
         }
         
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+import time
+from utils.metrics import metrics
+
+
+CONFIG_WRITES = metrics.counter(
+    'pivoltmeter_config_writes',
+    'Geschriebene Konfigurationsdateien (nach Entprellung)'
+)
+CONFIG_WRITES_SKIPPED = metrics.counter(
+    'pivoltmeter_config_writes_skipped',
+    'Ausgelassene Schreibvorgänge, weil sich der gespeicherte Stand nicht geändert hat'
+)
+
+
+def _migrate_v0(document):
+    """Version 0: Einstellungen direkt auf oberster Ebene, ohne Schema-Angabe"""
+    return {"settings": {key: value for key, value in document.items() if key != 'schema'}}
+
+
+class ConfigStore:
+    """
+    Speichert die zur Laufzeit änderbaren Einstellungen (Config.snapshot()) als JSON.
+
+    Änderungen werden entprellt: Erst wenn debounce Sekunden lang nichts mehr
+    geändert wurde, spätestens aber nach max_delay Sekunden, wird einmal
+    geschrieben - vollständig in eine temporäre Datei und dann per os.replace(),
+    damit ein Stromausfall nie eine halbe Datei hinterlässt. Geschrieben wird in
+    einem Timer-Thread, nicht im Render-Thread.
+
+    Dateiformat: {"schema": 1, "settings": {...}}. Ältere Schemata werden beim
+    Laden über MIGRATIONS schrittweise auf SCHEMA_VERSION gebracht.
+    """
+
+    SCHEMA_VERSION = 1
+    # Schema-Version -> Funktion, die ein Dokument dieser Version in die nächste überführt
+    MIGRATIONS = {
+        0: _migrate_v0,
+    }
+
+    def __init__(self, path, debounce=1.0, max_delay=10.0):
+        """
+        :param path: Pfad der JSON-Datei
+        :param debounce: Ruhezeit in Sekunden vor dem Schreiben
+        :param max_delay: Maximale Verzögerung in Sekunden bei ständigen Änderungen
+        """
+        self.path = path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._pending = None
+        self._first_pending = None
+        self._generation = 0
+        self._written = None
+        self._written_generation = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Erzeugt den Speicher aus den CONFIG_STORE_*-Einstellungen.
+
+        :return: ConfigStore oder None, wenn config.CONFIG_STORE_FILE nicht gesetzt ist
+        """
+        if not config.CONFIG_STORE_FILE:
+            return None
+        return cls(config.CONFIG_STORE_FILE, debounce=config.CONFIG_STORE_DEBOUNCE)
+
+    def _migrate(self, document):
+        """
+        Bringt ein gelesenes Dokument auf SCHEMA_VERSION.
+
+        :raises ValueError: Bei unbekannter oder zu neuer Schema-Version
+        """
+        if not isinstance(document, dict):
+            raise ValueError("Konfigurationsdatei muss ein Objekt enthalten")
+        schema = document.get('schema', 0)
+        if isinstance(schema, bool) or not isinstance(schema, int) or schema > self.SCHEMA_VERSION:
+            raise ValueError(f"Unbekannte Schema-Version: {schema}")
+        while schema < self.SCHEMA_VERSION:
+            migration = self.MIGRATIONS.get(schema)
+            if migration is None:
+                raise ValueError(f"Keine Migration für Schema-Version {schema}")
+            document = migration(document)
+            schema += 1
+            document['schema'] = schema
+        if not isinstance(document.get('settings'), dict):
+            raise ValueError("Konfigurationsdatei enthält keine Einstellungen")
+        return document
+
+    def load(self, config):
+        """
+        Liest die gespeicherten Einstellungen und prüft sie einzeln mit
+        config.validate_settings(), damit ein ungültiger Wert (z. B. ein
+        gelöschtes Muster) nicht alle anderen verwirft.
+
+        :param config: Config-Klasse
+        :return: Geprüfte Einstellungen (leer, wenn keine Datei vorhanden ist)
+        """
+        try:
+            with open(self.path, 'r') as f:
+                document = self._migrate(json.load(f))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Gespeicherte Konfiguration {self.path} nicht lesbar: {e}")
+            return {}
+
+        settings = {}
+        for key, value in document['settings'].items():
+            try:
+                settings.update(config.validate_settings({key: value}))
+            except ValueError as e:
+                print(f"Gespeicherte Einstellung '{key}' wird ignoriert: {e}")
+        with self._write_lock:
+            self._written = dict(settings)
+        return settings
+
+    def restore(self, config):
+        """
+        Übernimmt die gespeicherten Einstellungen in die Konfiguration, ohne die
+        Versionsnummer zu erhöhen. Muss vor dem Erzeugen des LED-Managers laufen.
+
+        :return: Die übernommenen Einstellungen
+        """
+        settings = self.load(config)
+        if settings:
+            config.apply_settings(settings, config.CONFIG_VERSION)
+            print(f"Gespeicherte Konfiguration geladen: {settings}")
+        return settings
+
+    def schedule(self, settings):
+        """
+        Merkt die Einstellungen zum Speichern vor und startet bzw. verlängert
+        die Entprellung. Kehrt sofort zurück.
+
+        :param settings: Vollständige Einstellungen (Config.snapshot())
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._pending = dict(settings)
+            self._generation += 1
+            if self._first_pending is None:
+                self._first_pending = now
+            delay = min(self.debounce, max(0.0, self._first_pending + self.max_delay - now))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.name = "config-store"
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Schreibt vorgemerkte Einstellungen sofort (z. B. beim Beenden)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            settings = self._pending
+            generation = self._generation
+            self._pending = None
+            self._first_pending = None
+        if settings is None:
+            return
+        # Schreiben ohne self._lock, damit schedule() im Render-Thread nie auf fsync wartet
+        with self._write_lock:
+            if generation < self._written_generation:
+                # Ein gleichzeitiger flush() hat bereits einen neueren Stand geschrieben
+                return
+            if settings == self._written:
+                CONFIG_WRITES_SKIPPED.inc()
+                return
+            if self._write(settings):
+                self._written = settings
+                self._written_generation = generation
+
+    def _write(self, settings):
+        """Schreibt die Datei atomar; True bei Erfolg"""
+        document = {"schema": self.SCHEMA_VERSION, "settings": settings}
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(document, f, indent=2)
+                f.flush()
+                # Inhalt auf die SD-Karte bringen, bevor die alte Datei ersetzt wird
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Konfiguration konnte nicht gespeichert werden ({self.path}): {e}")
+            return False
+        CONFIG_WRITES.inc()
+        return True
@@ -0,0 +1,153 @@
+"""
+Merkmale des Audiosignals als Quellen für die Modulationsmatrix (led_controllers/modulation.py).
+
+Alle Werte liegen zwischen 0.0 und 1.0 und werden einmal pro Chunk berechnet:
+
+    rms, rms_left, rms_right   Ungeglätteter Pegel (wie die Amplitude in Prozent / 100, mit gain)
+    low, mid, high             Pegel der Frequenzbänder bis 250 Hz, 250 Hz - 2 kHz und darüber
+    beat                       1.0 im Chunk eines erkannten Schlags, danach abklingend
+    bpm                        Geschätztes Tempo, 60 - 180 BPM auf 0.0 - 1.0 abgebildet
+
+Die Bänder kosten eine FFT pro Chunk und werden nur berechnet, wenn eine
+Modulation sie verwendet.
+"""
+from collections import deque
+import numpy as np
+
+
+FEATURES = ('rms', 'rms_left', 'rms_right', 'low', 'mid', 'high', 'beat', 'bpm')
+BAND_FEATURES = ('low', 'mid', 'high')
+# Bandgrenzen in Hz (obere Grenze None = bis zur halben Sampling-Rate)
+BANDS = ((0.0, 250.0), (250.0, 2000.0), (2000.0, None))
+BPM_RANGE = (60.0, 180.0)
+
+
+class AudioFeatures:
+    """
+    Berechnet die Merkmale aus FEATURES für aufeinanderfolgende Chunks.
+
+    Schläge werden erkannt, wenn die Energie des Chunks beat_threshold-mal über
+    ihrem gleitenden Mittel (history_seconds) liegt; nach einem Schlag wird
+    refractory_seconds lang kein weiterer erkannt. Das Tempo ist der Median der
+    letzten Abstände zwischen Schlägen, in BPM_RANGE gefaltet.
+    """
+
+    def __init__(self, beat_threshold=1.5, history_seconds=1.0, refractory_seconds=0.25, beat_decay=0.5):
+        """
+        :param beat_threshold: Verhältnis Energie / gleitendes Mittel für einen Schlag
+        :param history_seconds: Zeitkonstante des gleitenden Mittels in Sekunden
+        :param refractory_seconds: Mindestabstand zweier Schläge in Sekunden
+        :param beat_decay: Faktor, mit dem 'beat' pro Chunk nach einem Schlag abklingt
+        """
+        self.beat_threshold = beat_threshold
+        self.history_seconds = history_seconds
+        self.refractory_seconds = refractory_seconds
+        self.beat_decay = beat_decay
+        self.values = np.zeros(len(FEATURES))
+        self._energy_avg = None
+        self._last_update = None
+        self._last_beat = None
+        self._intervals = deque(maxlen=8)
+        # Fenster und Bandmasken je Chunk-Länge und Sampling-Rate (siehe _band_masks())
+        self._band_key = None
+        self._window = None
+        self._masks = None
+        self._window_power = 1.0
+
+    def update(self, level_left, level_right, now, left=None, right=None, rate=44100, scale=1.0 / 32768, bands=False):
+        """
+        Berechnet die Merkmale für einen Chunk.
+
+        :param level_left: Ungeglätteter Pegel links (0.0 - 1.0)
+        :param level_right: Ungeglätteter Pegel rechts (0.0 - 1.0)
+        :param now: Zeitpunkt des Chunks in Sekunden
+        :param left: Samples links bzw. mono als float-Array (None = keine Bänder)
+        :param right: Samples rechts (None bei Mono)
+        :param rate: Sampling-Rate der übergebenen Samples (nach dem Ausdünnen)
+        :param scale: Faktor von Sample-Werten auf Pegel (Verstärkung / 32768)
+        :param bands: Bänder berechnen (nur nötig, wenn eine Modulation sie nutzt)
+        :return: self.values (Reihenfolge wie FEATURES)
+        """
+        values = self.values
+        values[0] = max(level_left, level_right)
+        values[1] = level_left
+        values[2] = level_right
+
+        if bands and left is not None and len(left) > 1:
+            samples = left if right is None else (left + right) * 0.5
+            values[3:6] = self._band_levels(samples, rate, scale)
+        else:
+            values[3:6] = 0.0
+
+        self._detect_beat(values[0] * values[0], now)
+        return values
+
+    def _band_levels(self, samples, rate, scale):
+        """
+        Pegel je Band über das Parseval-Theorem: Wurzel der Leistung im Band,
+        im selben Maßstab wie rms (gleiche Verstärkung), begrenzt auf 1.0.
+        """
+        window, masks = self._band_masks(len(samples), rate)
+        power = np.square(np.abs(np.fft.rfft(samples * window)))
+        normalization = 2.0 / (len(samples) * len(samples) * self._window_power)
+        levels = np.sqrt(np.array([power[mask].sum() for mask in masks]) * normalization) * scale
+        return np.minimum(levels, 1.0)
+
+    def _band_masks(self, size, rate):
+        """Hann-Fenster und Bandmasken, zwischengespeichert bis sich Chunk-Länge oder Rate ändern"""
+        key = (size, rate)
+        if self._band_key != key:
+            frequencies = np.fft.rfftfreq(size, 1.0 / rate)
+            self._window = np.hanning(size)
+            self._window_power = float(np.mean(np.square(self._window)))
+            self._masks = [(frequencies >= low) & (frequencies < (high if high is not None else np.inf))
+                           for low, high in BANDS]
+            self._band_key = key
+        return self._window, self._masks
+
+    def _detect_beat(self, energy, now):
+        values = self.values
+        values[6] *= self.beat_decay
+        if self._last_update is None or self._energy_avg is None:
+            self._energy_avg = energy
+            self._last_update = now
+            return
+        dt = max(0.0, now - self._last_update)
+        self._last_update = now
+
+        refractory = self._last_beat is not None and now - self._last_beat < self.refractory_seconds
+        if not refractory and energy > 1e-6 and energy > self.beat_threshold * self._energy_avg:
+            values[6] = 1.0
+            if self._last_beat is not None:
+                self._intervals.append(now - self._last_beat)
+                values[7] = self._tempo()
+            self._last_beat = now
+
+        # Gleitendes Mittel mit Zeitkonstante history_seconds, unabhängig von der Chunk-Länge
+        alpha = min(1.0, dt / self.history_seconds) if self.history_seconds > 0 else 1.0
+        self._energy_avg += (energy - self._energy_avg) * alpha
+
+    def _tempo(self):
+        """Median der letzten Schlagabstände als BPM, in BPM_RANGE gefaltet und auf 0.0 - 1.0 abgebildet"""
+        interval = float(np.median(self._intervals))
+        if interval <= 0:
+            return self.values[7]
+        bpm = 60.0 / interval
+        low, high = BPM_RANGE
+        while bpm < low:
+            bpm *= 2
+        while bpm > high:
+            bpm /= 2
+        return (bpm - low) / (high - low)
+
+    @property
+    def bpm(self):
+        """Geschätztes Tempo in BPM (None, solange keine zwei Schläge erkannt wurden)"""
+        if not self._intervals:
+            return None
+        low, high = BPM_RANGE
+        return low + self.values[7] * (high - low)
+
+    def to_json(self):
+        """Aktuelle Merkmale als Dictionary {name: wert}"""
+        return {name: round(float(value), 4) for name, value in zip(FEATURES, self.values)}
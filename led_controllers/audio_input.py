@@ -0,0 +1,346 @@
+import json
+import math
+import os
+import random
+import time
+from array import array
+
+
+class AudioInput:
+    """
+    Audioeingang über PyAudio mit automatischer Geräteerkennung.
+
+    PyAudio wird erst in open() importiert und initialisiert, damit der Audio-Eingang
+    nur dann Ressourcen belegt, wenn der Audio-Modus tatsächlich aktiv ist. Das
+    zuletzt erfolgreich geöffnete Gerät wird gemerkt (im Speicher und optional in
+    einer Zustandsdatei); ein erneutes Öffnen prüft nur dieses Gerät, statt alle
+    Geräte aufzuzählen.
+    """
+
+    # Zuletzt erfolgreich geöffnetes Gerät (prozessweit): index, name, host_api, max_input_channels, rate.
+    # max_input_channels ist die Fähigkeit des Geräts, nicht die genutzte Kanalzahl: Programme mit
+    # unterschiedlichem max_channels (main.py Stereo, only_led.py Mono) teilen sich den Cache.
+    _cached_device = None
+
+    def __init__(self, chunk=1024, rate=44100, max_channels=2, device_name=None, cache_file=None):
+        """
+        :param chunk: Anzahl der Audio-Samples pro Lesevorgang
+        :param rate: Sampling-Rate in Hz
+        :param max_channels: Maximal genutzte Kanäle (1 für Mono, 2 für Stereo)
+        :param device_name: Nur Geräte verwenden, deren Name diesen Text enthält (None = automatisch)
+        :param cache_file: Datei, in der das gewählte Gerät über Neustarts hinweg gespeichert wird
+        """
+        self.chunk = chunk
+        self.rate = rate
+        self.max_channels = max_channels
+        self.device_name_filter = device_name
+        self.cache_file = cache_file
+        self.channels = max_channels
+        self.device_name = None
+        self.p = None
+        self.stream = None
+
+    @property
+    def is_open(self):
+        return self.stream is not None
+
+    def open(self):
+        """
+        Öffnet den Audiostream.
+
+        :return: True, wenn ein Stream geöffnet wurde, sonst False (simulierte Daten verwenden)
+        """
+        if self.stream is not None:
+            return True
+
+        try:
+            import pyaudio
+        except ImportError as e:
+            print(f"PyAudio nicht verfügbar ({e}). Verwende simulierte Daten.")
+            return False
+
+        try:
+            if self.p is None:
+                self.p = pyaudio.PyAudio()
+
+            # Schneller Weg: zuletzt verwendetes Gerät direkt öffnen
+            device = self._find_cached_device()
+            if device is not None:
+                if self._open_stream(pyaudio, device):
+                    return True
+                AudioInput._cached_device = None
+                print("Gespeichertes Audiogerät nicht verfügbar, durchsuche alle Geräte...")
+
+            # Langsamer Weg: alle Geräte durchsuchen
+            device = self._probe_devices()
+            if device is None:
+                print("Kein geeignetes Audiogerät gefunden! Verwende simulierte Daten.")
+                return False
+
+            return self._open_stream(pyaudio, device)
+
+        except Exception as e:
+            print(f"Fehler beim Starten des Audiostreams: {e}")
+            self.stream = None
+            return False
+
+    def _matches_filter(self, name):
+        return not self.device_name_filter or self.device_name_filter.lower() in (name or '').lower()
+
+    def _load_cache_file(self):
+        """Liest das gespeicherte Gerät aus der Zustandsdatei (None, wenn nicht vorhanden)"""
+        if not self.cache_file:
+            return None
+        try:
+            with open(self.cache_file, 'r') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Audiogeräte-Cache {self.cache_file} nicht lesbar: {e}")
+            return None
+
+        # Ältere Dateien ohne max_input_channels enthielten die genutzte Kanalzahl und werden neu ermittelt
+        if not isinstance(cached, dict) or not all(key in cached for key in ('index', 'name', 'host_api', 'max_input_channels', 'rate')):
+            return None
+        return cached
+
+    def _save_cache_file(self, device):
+        """Schreibt das Gerät atomar in die Zustandsdatei"""
+        if not self.cache_file:
+            return
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(device, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            print(f"Audiogeräte-Cache {self.cache_file} konnte nicht geschrieben werden: {e}")
+
+    def _host_api_name(self, device_info):
+        try:
+            return self.p.get_host_api_info_by_index(device_info.get('hostApi', 0)).get('name')
+        except Exception:
+            return None
+
+    def _find_cached_device(self):
+        """
+        Prüft, ob das gemerkte Gerät noch existiert. Zuerst wird nur der gespeicherte
+        Index geprüft; hat sich die Nummerierung geändert, wird das Gerät über Namen
+        und Host-API gesucht, ohne die Geräteliste auszugeben.
+        """
+        cached = AudioInput._cached_device or self._load_cache_file()
+        if cached is None or cached['rate'] != self.rate or not self._matches_filter(cached['name']):
+            return None
+
+        def matches(device_info):
+            return (device_info.get('name') == cached['name']
+                    and int(device_info.get('maxInputChannels', 0)) >= cached['max_input_channels']
+                    and self._host_api_name(device_info) == cached['host_api'])
+
+        try:
+            if matches(self.p.get_device_info_by_index(cached['index'])):
+                return cached
+        except Exception:
+            pass
+
+        try:
+            for i in range(self.p.get_device_count()):
+                if i != cached['index'] and matches(self.p.get_device_info_by_index(i)):
+                    return dict(cached, index=i)
+        except Exception:
+            pass
+        return None
+
+    def _probe_devices(self):
+        """Sucht das Gerät mit den meisten Eingangskanälen"""
+        # Liste verfügbare Geräte auf
+        info = self.p.get_host_api_info_by_index(0)
+        num_devices = info.get('deviceCount')
+
+        # Ausgabe der verfügbaren Geräte für Debugging
+        print(f"Verfügbare Audiogeräte: {num_devices}")
+
+        # Standardgerät finden, das mindestens 1 Eingangskanal hat
+        default_device_index = None
+        max_input_channels = 0
+
+        for i in range(num_devices):
+            device_info = self.p.get_device_info_by_index(i)
+            input_channels = int(device_info.get('maxInputChannels', 0))
+
+            print(f"Gerät {i}: {device_info.get('name')}, Eingangskanäle: {input_channels}")
+
+            # Suche nach dem Gerät mit den meisten Eingangskanälen (ggf. nur passende Namen)
+            if not self._matches_filter(device_info.get('name')):
+                continue
+            if input_channels > max_input_channels:
+                max_input_channels = input_channels
+                default_device_index = i
+
+        if default_device_index is None or max_input_channels == 0:
+            if self.device_name_filter:
+                print(f"Kein Audiogerät mit \"{self.device_name_filter}\" im Namen gefunden.")
+            return None
+
+        device_info = self.p.get_device_info_by_index(default_device_index)
+        return {
+            'index': default_device_index,
+            'name': device_info.get('name'),
+            'host_api': self._host_api_name(device_info),
+            # Eingangskanäle des Geräts; genutzt werden höchstens max_channels (siehe _open_stream())
+            'max_input_channels': max_input_channels,
+            'rate': self.rate,
+        }
+
+    def _open_stream(self, pyaudio, device):
+        # Bestimme die genutzte Anzahl an Kanälen (1 für Mono, 2 für Stereo)
+        channels = min(self.max_channels, device['max_input_channels'])
+        try:
+            self.stream = self.p.open(
+                format=pyaudio.paInt16,
+                channels=channels,
+                rate=self.rate,
+                input=True,
+                input_device_index=device['index'],
+                frames_per_buffer=self.chunk
+            )
+        except Exception as e:
+            print(f"Audiogerät {device['name']} konnte nicht geöffnet werden: {e}")
+            self.stream = None
+            return False
+
+        self.channels = channels
+        self.device_name = device['name']
+        if AudioInput._cached_device != device:
+            AudioInput._cached_device = device
+            self._save_cache_file(device)
+        print(f"Audiostream erfolgreich gestartet: {device['name']} mit {self.channels} Kanal(en)")
+        return True
+
+    def read(self):
+        """Liest einen Chunk (int16, bei Stereo verschachtelt) als Bytes"""
+        return self.stream.read(self.chunk, exception_on_overflow=False)
+
+    def get_read_available(self):
+        """Anzahl der bereits gepufferten Frames"""
+        return self.stream.get_read_available()
+
+    def close(self):
+        """Schließt den Stream und gibt PyAudio (und damit das Audiogerät) frei"""
+        if self.stream is not None:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                print(f"Fehler beim Schließen des Audiostreams: {e}")
+            self.stream = None
+
+        if self.p is not None:
+            self.p.terminate()
+            self.p = None
+
+
+class SyntheticAudioInput:
+    """
+    Synthetischer Audioeingang mit derselben Schnittstelle wie AudioInput
+    (für Benchmarks und den Betrieb ohne Audiogerät).
+
+    Erzeugt beim Öffnen einmalig eine reproduzierbare Schleife aus Beats, Tönen und
+    Rauschen mit unterschiedlichem Pegel links und rechts. read() liefert daraus
+    fortlaufend Chunks; mit realtime=True wartet read() wie ein echtes Gerät, bis
+    der Chunk "aufgenommen" wurde.
+    """
+
+    def __init__(self, chunk=1024, rate=44100, max_channels=2, seed=0, realtime=False, seconds=4.0, bpm=120):
+        """
+        :param chunk: Anzahl der Audio-Samples pro Lesevorgang
+        :param rate: Sampling-Rate in Hz
+        :param max_channels: Anzahl der Kanäle (1 für Mono, 2 für Stereo)
+        :param seed: Startwert für das Rauschen (gleiche Werte = gleiche Daten)
+        :param realtime: read() im Takt der Sampling-Rate ausliefern
+        :param seconds: Länge der Schleife in Sekunden
+        :param bpm: Tempo der Beats
+        """
+        self.chunk = chunk
+        self.rate = rate
+        self.channels = max_channels
+        self.device_name = 'synthetic'
+        self.seed = seed
+        self.realtime = realtime
+        self.seconds = seconds
+        self.bpm = bpm
+        self._buffer = None
+        self._position = 0
+        self._frames_read = 0
+        self._start_time = None
+
+    @property
+    def is_open(self):
+        return self._buffer is not None
+
+    def open(self):
+        if self._buffer is None:
+            self._buffer = self._generate()
+            self._position = 0
+            self._frames_read = 0
+            self._start_time = time.perf_counter()
+        return True
+
+    def _generate(self):
+        rng = random.Random(self.seed)
+        frames = int(self.seconds * self.rate)
+        beat_frames = int(self.rate * 60 / self.bpm)
+        samples = array('h')
+
+        for n in range(frames):
+            t = n / self.rate
+            # Abklingender Beat (60 Hz) mit Ton (440 Hz) darunter, Pegel schwankt langsam
+            beat = math.exp(-(n % beat_frames) / (self.rate * 0.08))
+            swell = 0.5 + 0.5 * math.sin(2 * math.pi * 0.25 * t)
+            base = 0.6 * beat * math.sin(2 * math.pi * 60 * t) + 0.25 * swell * math.sin(2 * math.pi * 440 * t)
+            noise = rng.uniform(-0.05, 0.05)
+
+            left = base + noise
+            samples.append(int(max(-1.0, min(1.0, left)) * 32767))
+            if self.channels == 2:
+                # Rechter Kanal leiser und gegenphasig schwankend, damit Stereo-Muster etwas zeigen
+                right = base * (1.0 - 0.6 * swell) + noise
+                samples.append(int(max(-1.0, min(1.0, right)) * 32767))
+
+        return samples.tobytes()
+
+    def read(self):
+        """Liest einen Chunk (int16, bei Stereo verschachtelt) als Bytes"""
+        if self.realtime:
+            due = self._start_time + (self._frames_read + self.chunk) / self.rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self._frames_read += self.chunk
+
+        frame_bytes = 2 * self.channels
+        size = self.chunk * frame_bytes
+        start = self._position
+        end = start + size
+        if end <= len(self._buffer):
+            data = self._buffer[start:end]
+        else:
+            # Am Ende der Schleife von vorne beginnen
+            end -= len(self._buffer)
+            data = self._buffer[start:] + self._buffer[:end]
+        self._position = end
+        return data
+
+    def get_read_available(self):
+        """Anzahl der bereits "aufgenommenen", noch nicht gelesenen Frames (0 ohne realtime)"""
+        if not self.realtime:
+            return 0
+        recorded = int((time.perf_counter() - self._start_time) * self.rate)
+        return max(0, recorded - self._frames_read)
+
+    def close(self):
+        self._buffer = None
@@ -1,142 +1,320 @@
 import time
-import random
 import numpy as np
-import pyaudio
-from rpi_ws281x import Color
+from led_controllers.output import Color
 from config.config import Config
-from led_controllers.base_controller import BaseLEDController
+from led_controllers.audio_input import AudioInput
+from led_controllers.audio_features import AudioFeatures
+from led_controllers.base_controller import BaseLEDController, PATTERN_RENDER_SECONDS
+from led_controllers.modulation import ModulationMatrix
+from led_controllers.silence_detector import SilenceDetector
+from utils.metrics import metrics
+
+
+AUDIO_READ_SECONDS = metrics.histogram(
+    'pivoltmeter_audio_read_seconds',
+    'Dauer von stream.read() für einen Audio-Chunk (inkl. Warten auf Daten)'
+)
+AUDIO_ANALYSIS_SECONDS = metrics.histogram(
+    'pivoltmeter_audio_analysis_seconds',
+    'Dauer der Amplitudenberechnung für einen Audio-Chunk'
+)
+AUDIO_BACKLOG_FRAMES = metrics.gauge(
+    'pivoltmeter_audio_backlog_frames',
+    'Vor dem Lesen bereits gepufferte Audio-Frames'
+)
+AUDIO_OVERRUNS = metrics.counter(
+    'pivoltmeter_audio_overruns',
+    'Lesevorgänge, bei denen bereits mindestens ein ganzer Chunk im Puffer wartete (Render-Schleife zu langsam)'
+)
+AUDIO_READ_ERRORS = metrics.counter(
+    'pivoltmeter_audio_read_errors',
+    'Fehler beim Lesen vom Audiostream'
+)
+AUDIO_SIMULATED_CHUNKS = metrics.counter(
+    'pivoltmeter_audio_simulated_chunks',
+    'Frames mit simulierten statt gemessenen Audiowerten'
+)
+AUDIO_AMPLITUDE_PERCENT = metrics.gauge(
+    'pivoltmeter_audio_amplitude_percent',
+    'Geglättete Audioamplitude in Prozent',
+    labelnames=('channel',)
+)
+AUDIO_AMPLITUDE_LEFT = AUDIO_AMPLITUDE_PERCENT.labels(channel='left')
+AUDIO_AMPLITUDE_RIGHT = AUDIO_AMPLITUDE_PERCENT.labels(channel='right')
+SILENCE_ACTIVE = metrics.gauge(
+    'pivoltmeter_silence_active',
+    '1, wenn das Audiosignal als still erkannt wurde (siehe Config.SILENCE_MODE)'
+)
+SILENCE_SECONDS = metrics.counter(
+    'pivoltmeter_silence_seconds',
+    'Im Stille-Zustand verbrachte Zeit in Sekunden'
+)
+SILENCE_SKIPPED_FRAMES = metrics.counter(
+    'pivoltmeter_silence_skipped_frames',
+    'Wegen Stille nicht berechnete und nicht ausgegebene Frames'
+)
+SILENCE_SAVED_SECONDS = metrics.counter(
+    'pivoltmeter_silence_saved_seconds',
+    'Geschätzte eingesparte Rechenzeit (übersprungene Frames mal mittlere Dauer für Berechnung und Ausgabe)'
+)
 
 class AudioVisualizer(BaseLEDController):
-    def __init__(self):
-        """Initialisiert den Audio-Visualizer mit Audioverarbeitung"""
-        super().__init__()
+    def __init__(self, strips=None, audio_input=None, start_stream=True, context=None):
+        """
+        Initialisiert den Audio-Visualizer mit Audioverarbeitung
+        
+        :param strips: Mitzubenutzende LED-Streifen eines anderen Controllers (optional)
+        :param context: RenderContext für update() (Standard: Systemzeit, nicht reproduzierbarer Zufall)
+        :param audio_input: Audioeingang (Standard: AudioInput über PyAudio)
+        :param start_stream: Audiostream sofort öffnen (sonst über start_audio_stream())
+        """
+        super().__init__(strips=strips, context=context)
         
         # Audioverarbeitungs-Parameter
-        self.CHUNK = 1024  # Anzahl der Audio-Samples pro Frame
-        self.FORMAT = pyaudio.paInt16  # Audio-Format
+        self.CHUNK = Config.AUDIO_CHUNK  # Anzahl der Audio-Samples pro Frame
         self.CHANNELS = 2  # Stereo
-        self.RATE = 44100  # Sampling-Rate in Hz
-        
-        # PyAudio-Instanz initialisieren
-        self.p = pyaudio.PyAudio()
+        self.RATE = Config.AUDIO_RATE  # Sampling-Rate in Hz
+        
+        # Audioeingang (PyAudio wird erst beim Öffnen geladen)
+        self.audio_input = audio_input or AudioInput(
+            self.CHUNK, self.RATE, self.CHANNELS,
+            device_name=Config.AUDIO_DEVICE_NAME,
+            cache_file=Config.AUDIO_DEVICE_CACHE_FILE
+        )
         self.stream = None
+        # Zeitpunkte (perf_counter) des letzten Lesevorgangs und der letzten Analyse, für Latenzmessungen
+        self.capture_timestamp = None
+        self.analysis_timestamp = None
+        # Dauer des letzten stream.read() (Warten auf Audio zählt nicht zur Rechenzeit)
+        self.last_read_seconds = 0.0
+        
+        # Qualitätsstufe (siehe utils/quality.py): jedes n-te Sample auswerten, jeden n-ten Chunk ausgeben
+        self.analysis_step = 1
+        self.render_divisor = 1
+        self._render_count = 0
         
         # Parameter für die Visualisierung
         self.amplitude_smooth_left = 0  # Geglätteter Amplitudenwert für linken Kanal
         self.amplitude_smooth_right = 0  # Geglätteter Amplitudenwert für rechten Kanal
-        self.smoothing_factor = 0.3  # Glättungsfaktor für flüssigere Übergänge
+        self._positions = None  # Siehe _led_positions()
+        self.current_amplitude = 0  # Ungeglätteter Pegel des letzten Chunks (lauterer Kanal) für die Stille-Erkennung
+        
+        # Modulationsmatrix: Audio-Merkmale steuern Muster-Parameter (Config.MODULATION)
+        self.features = AudioFeatures()
+        self.modulation = ModulationMatrix()
+        self._modulated = {}  # Modulierte Parameter des aktuellen Musters, siehe _param()
+        
+        # Stille-Erkennung: bei Stille weniger oder gar keine Frames ausgeben
+        self.silence = SilenceDetector.from_config(Config)
+        self._silence_last_update = None
+        self._silence_last_render = None
+        # Mittlere Dauer von Berechnung und Ausgabe eines Frames (für die Einsparungsschätzung)
+        self._frame_seconds_avg = None
         
         # Audiostream starten
-        self._start_audio_stream()
+        if start_stream:
+            self.start_audio_stream()
     
-    def _start_audio_stream(self):
+    def start_audio_stream(self):
         """Startet den Audio-Stream für die Echtzeit-Analyse mit automatischer Geräteerkennung"""
-        try:
-            # Liste verfügbare Geräte auf
-            info = self.p.get_host_api_info_by_index(0)
-            num_devices = info.get('deviceCount')
-            
-            # Ausgabe der verfügbaren Geräte für Debugging
-            print(f"Verfügbare Audiogeräte: {num_devices}")
-            
-            # Standardgerät finden, das mindestens 1 Eingangskanal hat
-            default_device_index = None
-            max_input_channels = 0
-            
-            for i in range(num_devices):
-                device_info = self.p.get_device_info_by_index(i)
-                input_channels = int(device_info.get('maxInputChannels', 0))
-                
-                print(f"Gerät {i}: {device_info.get('name')}, Eingangskanäle: {input_channels}")
-                
-                # Suche nach dem Gerät mit den meisten Eingangskanälen
-                if input_channels > max_input_channels:
-                    max_input_channels = input_channels
-                    default_device_index = i
-            
-            if default_device_index is None or max_input_channels == 0:
-                print("Kein geeignetes Audiogerät gefunden! Verwende simulierte Daten.")
-                self.stream = None
-                return
-                
-            # Bestimme die maximale Anzahl an Kanälen (1 für Mono, 2 für Stereo)
-            channel_count = min(2, max_input_channels)
-            self.CHANNELS = channel_count  # Update der Klassenattribute
-            
-            device_info = self.p.get_device_info_by_index(default_device_index)
-            print(f"Verwende Audiogerät: {device_info.get('name')} mit {channel_count} Kanal(en)")
-            
-            # Stream mit der korrekten Kanalanzahl erstellen
-            self.stream = self.p.open(
-                format=self.FORMAT,
-                channels=channel_count,
-                rate=self.RATE,
-                input=True,
-                input_device_index=default_device_index,
-                frames_per_buffer=self.CHUNK
-            )
-            
-            print(f"Audiostream erfolgreich gestartet mit {channel_count} Kanal(en)")
-            
-        except Exception as e:
-            print(f"Fehler beim Starten des Audiostreams: {e}")
+        if self.audio_input.open():
+            # Kanalanzahl des gewählten Geräts übernehmen (1 für Mono, 2 für Stereo)
+            self.stream = self.audio_input
+            self.CHANNELS = self.audio_input.channels
+        else:
             # Fallback auf simulierte Werte
             self.stream = None
     
-    def update(self):
+    def stop_audio_stream(self):
+        """Schließt den Audio-Stream und gibt das Audiogerät frei"""
+        self.stream = None
+        self.audio_input.close()
+    
+    def update(self, ctx=None):
         """
         Aktualisiert die LED-Anzeige basierend auf der Audioamplitude.
         Diese Methode wird regelmäßig vom LED-Manager aufgerufen.
+        
+        :param ctx: RenderContext mit Uhr und Zufallsgenerator (Standard: self.context)
+        """
+        ctx = ctx or self.context
+        
+        # Audioamplitude erfassen (aktualisiert auch amplitude_smooth_left und amplitude_smooth_right)
+        amplitude_percent = self.analyze(ctx)
+        
+        self.frame_delay = 0
+        self.last_show_seconds = 0.0
+        if self._skip_silent_frame(ctx):
+            return
+        if self.render_divisor > 1:
+            # Nur jeden n-ten Chunk darstellen, die Streifen zeigen solange den letzten Frame
+            self._render_count = (self._render_count + 1) % self.render_divisor
+            if self._render_count != 0:
+                return
+        self.render(ctx, amplitude_percent)
+    
+    def analyze(self, ctx):
+        """
+        Liest einen Audio-Chunk und berechnet Pegel und Modulation, ohne die LEDs zu setzen.
+        
+        :return: Mittlere geglättete Amplitude in Prozent
+        """
+        amplitude_percent = self._get_audio_amplitude(ctx)
+        AUDIO_AMPLITUDE_LEFT.set(self.amplitude_smooth_left)
+        AUDIO_AMPLITUDE_RIGHT.set(self.amplitude_smooth_right)
+        return amplitude_percent
+    
+    def follow(self, source):
         """
-        # Bestimme das aktuelle Muster aus der Config
-        pattern = Config.AUDIO_PATTERN
+        Übernimmt Pegel und Modulation eines anderen Audio-Visualizers, statt selbst
+        vom Audiostream zu lesen (Audio-Zonen teilen sich eine Analyse).
         
-        # Audioamplitude erfassen (diese Methode aktualisiert bereits amplitude_smooth_left und amplitude_smooth_right)
-        amplitude_percent = self._get_audio_amplitude()
+        :param source: AudioVisualizer, dessen analyze() für den aktuellen Chunk gelaufen ist
+        :return: Mittlere geglättete Amplitude in Prozent
+        """
+        self.amplitude_smooth_left = source.amplitude_smooth_left
+        self.amplitude_smooth_right = source.amplitude_smooth_right
+        self.current_amplitude = source.current_amplitude
+        self._modulated = source.modulation.pattern_values(self.pattern) if Config.MODULATION else {}
+        return (self.amplitude_smooth_left + self.amplitude_smooth_right) / 2
+    
+    @property
+    def pattern(self):
+        """Aktuelles Muster (Config.AUDIO_PATTERN bzw. Muster der Zone)"""
+        return Config.AUDIO_PATTERN if self.zone is None else self.zone.pattern
+    
+    def render(self, ctx, amplitude_percent):
+        """
+        Zeichnet das aktuelle Muster für bereits analysierte Pegel und gibt es aus.
+        
+        :param ctx: RenderContext mit Uhr und Zufallsgenerator
+        :param amplitude_percent: Mittlere geglättete Amplitude in Prozent
+        """
+        pattern = self.pattern
+        self.frame_delay = 0
+        self.last_show_seconds = 0.0
+        start = time.perf_counter()
         
         # Aktualisiere Animation basierend auf dem Muster
         if pattern == 'audio_pattern_01':
-            self._visualize_mono_vu_meter(amplitude_percent)
+            self._visualize_mono_vu_meter(ctx, amplitude_percent)
         elif pattern == 'audio_pattern_02':
-            self._visualize_mono_pulse(amplitude_percent)
+            self._visualize_mono_pulse(ctx, amplitude_percent)
         elif pattern == 'audio_pattern_03':
-            self._visualize_mono_center_bloom(amplitude_percent)
+            self._visualize_mono_center_bloom(ctx, amplitude_percent)
         elif pattern == 'audio_pattern_04':
             # Neues Stereo-Muster
-            self._visualize_stereo_vu_meter()
+            self._visualize_stereo_vu_meter(ctx)
         elif pattern == 'audio_pattern_05':
             # Neues Stereo-Muster
-            self._visualize_stereo_pulse()
+            self._visualize_stereo_pulse(ctx)
         elif pattern == 'audio_pattern_06':
             # Neues Stereo-Muster
-            self._visualize_stereo_center_bloom()
+            self._visualize_stereo_center_bloom(ctx)
         else:
             # Fallback: Audioreaktive Volltonfarbe
-            self._visualize_reactive_solid_color(amplitude_percent)
+            self._visualize_reactive_solid_color(ctx, amplitude_percent)
+        
+        duration = time.perf_counter() - start
+        PATTERN_RENDER_SECONDS.labels(pattern=pattern).observe(duration - self.last_show_seconds)
+        if self._frame_seconds_avg is None:
+            self._frame_seconds_avg = duration
+        else:
+            self._frame_seconds_avg += (duration - self._frame_seconds_avg) * 0.05
     
-    def _get_audio_amplitude(self):
+    def apply_quality(self, settings):
+        """
+        Übernimmt eine Qualitätsstufe.
+        
+        :param settings: Dictionary mit analysis_step und render_divisor (siehe utils/quality.py)
+        """
+        self.analysis_step = settings['analysis_step']
+        self.render_divisor = settings['render_divisor']
+        self._render_count = 0
+    
+    def _skip_silent_frame(self, ctx):
+        """
+        Führt die Stille-Erkennung für den aktuellen Chunk durch.
+        
+        :return: True, wenn der Frame wegen Stille weder berechnet noch ausgegeben werden soll
+        """
+        mode = Config.SILENCE_MODE
+        now = ctx.now()
+        if not mode:
+            if self.silence.silent:
+                self._set_silent(False)
+            self.silence.reset()
+            return False
+        
+        if self.silence.silent and self._silence_last_update is not None:
+            SILENCE_SECONDS.inc(max(0.0, now - self._silence_last_update))
+        self._silence_last_update = now
+        
+        if self.silence.update(self.current_amplitude, now):
+            self._set_silent(self.silence.silent)
+            if self.silence.silent and mode == 'blank':
+                # Einmal ausschalten, danach kein show() mehr bis zum nächsten Signal
+                self.clear_leds()
+                return True
+        
+        if not self.silence.silent:
+            return False
+        if mode == 'throttle' and (self._silence_last_render is None
+                                   or now - self._silence_last_render >= 1.0 / Config.SILENCE_FPS):
+            self._silence_last_render = now
+            return False
+        
+        SILENCE_SKIPPED_FRAMES.inc()
+        if self._frame_seconds_avg is not None:
+            SILENCE_SAVED_SECONDS.inc(self._frame_seconds_avg)
+        return True
+    
+    def _set_silent(self, silent):
+        SILENCE_ACTIVE.set(1 if silent else 0)
+        self._silence_last_render = None
+        if silent:
+            print(f"Stille erkannt, Modus '{Config.SILENCE_MODE}'")
+        else:
+            print("Audiosignal erkannt, Visualisierung fortgesetzt")
+    
+    def _get_audio_amplitude(self, ctx):
         """
         Erfasst die aktuelle Audioamplitude und gibt sie als Prozentwert zurück.
         Bei Problemen mit dem Audiostream wird ein simulierter Wert zurückgegeben.
         
         Bei Stereo-Signalen werden linker und rechter Kanal getrennt verarbeitet.
         """
+        self.last_read_seconds = 0.0
         if self.stream:
             try:
+                # Rückstau vor dem Lesen: ein ganzer Chunk im Puffer bedeutet, dass die Schleife nicht nachkommt
+                backlog = self.stream.get_read_available()
+                AUDIO_BACKLOG_FRAMES.set(backlog)
+                if backlog >= self.CHUNK:
+                    AUDIO_OVERRUNS.inc()
+                
                 # Audiodaten vom Stream lesen
-                data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-                # Umwandlung in NumPy-Array
+                read_start = time.perf_counter()
+                data = self.stream.read()
+                analysis_start = time.perf_counter()
+                self.capture_timestamp = analysis_start
+                self.last_read_seconds = analysis_start - read_start
+                AUDIO_READ_SECONDS.observe(self.last_read_seconds)
+                # Umwandlung in NumPy-Array (ohne Kopie; float erst nach dem Ausdünnen)
                 audio_data = np.frombuffer(data, dtype=np.int16)
+                step = self.analysis_step
+                # Verstärkungsfaktor des Musters (Parameter gain, Standard 5)
+                gain = self._param('gain')
                 
                 # Zum Loggen
                 # print(audio_data)
                 
                 # Stereo-Daten separieren in linken und rechten Kanal
                 if self.CHANNELS == 2:
-                    # Linker Kanal (gerade Indizes)
-                    left_channel = audio_data[0::2]
+                    # Linker Kanal (gerade Indizes), als float, da das Quadrieren von int16 überläuft
+                    left_channel = audio_data[0::2 * step].astype(np.float64)
                     # Rechter Kanal (ungerade Indizes)
-                    right_channel = audio_data[1::2]
+                    right_channel = audio_data[1::2 * step].astype(np.float64)
                     
                     # Berechne RMS für jeden Kanal
                     rms_left = np.sqrt(np.mean(np.square(left_channel)))
@@ -145,57 +323,77 @@ class AudioVisualizer(BaseLEDController):
                     # Normalisiere auf Prozentwerte (0-100%)
                     max_possible_amplitude = 32768.0
                     
-                    current_amplitude_left = min(100, (rms_left / max_possible_amplitude) * 100 * 5)  # Verstärkungsfaktor 5
-                    current_amplitude_right = min(100, (rms_right / max_possible_amplitude) * 100 * 5)  # Verstärkungsfaktor 5
+                    current_amplitude_left = min(100, (rms_left / max_possible_amplitude) * 100 * gain)
+                    current_amplitude_right = min(100, (rms_right / max_possible_amplitude) * 100 * gain)
+                    self.current_amplitude = max(current_amplitude_left, current_amplitude_right)
+                    self._modulate(ctx, current_amplitude_left, current_amplitude_right, left_channel, right_channel,
+                                   step, gain / max_possible_amplitude)
                     
-                    # Glätte die Werte für sanftere Übergänge
-                    self.amplitude_smooth_left = self.smoothing_factor * current_amplitude_left + (1 - self.smoothing_factor) * self.amplitude_smooth_left
-                    self.amplitude_smooth_right = self.smoothing_factor * current_amplitude_right + (1 - self.smoothing_factor) * self.amplitude_smooth_right
+                    # Glätte die Werte für sanftere Übergänge (Parameter decay, Standard Config.AUDIO_SMOOTHING)
+                    decay = self._param('decay')
+                    self.amplitude_smooth_left = decay * current_amplitude_left + (1 - decay) * self.amplitude_smooth_left
+                    self.amplitude_smooth_right = decay * current_amplitude_right + (1 - decay) * self.amplitude_smooth_right
                     
                     # Ausgabe der Amplituden in der Konsole
                     # print(f"Audio-Amplitude: Links: {self.amplitude_smooth_left:.2f}% | Rechts: {self.amplitude_smooth_right:.2f}%")
                     
+                    self.analysis_timestamp = time.perf_counter()
+                    AUDIO_ANALYSIS_SECONDS.observe(self.analysis_timestamp - analysis_start)
+                    
                     # Durchschnitt für Funktionen zurückgeben, die nur einen Wert verwenden
                     return (self.amplitude_smooth_left + self.amplitude_smooth_right) / 2
                 
                 else:  # Mono-Verarbeitung als Fallback
                     # Berechne die RMS-Amplitude (Root Mean Square)
-                    rms = np.sqrt(np.mean(np.square(audio_data)))
+                    samples = audio_data[::step].astype(np.float64)
+                    rms = np.sqrt(np.mean(np.square(samples)))
                     
                     # Normalisiere auf einen Prozentwert (0-100%)
                     max_possible_amplitude = 32768.0
-                    current_amplitude = min(100, (rms / max_possible_amplitude) * 100 * 5)  # Verstärkungsfaktor 5
+                    current_amplitude = min(100, (rms / max_possible_amplitude) * 100 * gain)
+                    self.current_amplitude = current_amplitude
+                    self._modulate(ctx, current_amplitude, current_amplitude, samples, None,
+                                   step, gain / max_possible_amplitude)
                     
                     # Setze beide Kanäle auf den gleichen Wert
-                    self.amplitude_smooth_left = self.amplitude_smooth_right = self.smoothing_factor * current_amplitude + (1 - self.smoothing_factor) * self.amplitude_smooth_left
+                    decay = self._param('decay')
+                    self.amplitude_smooth_left = self.amplitude_smooth_right = decay * current_amplitude + (1 - decay) * self.amplitude_smooth_left
                     
-                    print(f"Audio-Amplitude (Mono): {self.amplitude_smooth_left:.2f}%")
+                    # Ausgabe der Amplitude über /metrics (pivoltmeter_audio_amplitude_percent)
+                    # print(f"Audio-Amplitude (Mono): {self.amplitude_smooth_left:.2f}%")
+                    self.analysis_timestamp = time.perf_counter()
+                    AUDIO_ANALYSIS_SECONDS.observe(self.analysis_timestamp - analysis_start)
                     
                     return self.amplitude_smooth_left
                 
             except Exception as e:
+                AUDIO_READ_ERRORS.inc()
                 print(f"Fehler bei der Audioerfassung: {e}")
-                return self._simulate_audio_amplitude()
+                return self._simulate_audio_amplitude(ctx)
         else:
             # Fallback auf simulierte Werte
-            return self._simulate_audio_amplitude()
+            return self._simulate_audio_amplitude(ctx)
     
-    def _simulate_audio_amplitude(self):
+    def _simulate_audio_amplitude(self, ctx):
         """
         Simuliert eine Audioamplitude für den Fall, dass keine echte Audioquelle vorhanden ist.
         Gibt für Stereo zwei leicht unterschiedliche Werte zurück.
         """
+        AUDIO_SIMULATED_CHUNKS.inc()
+        
         # Einfache Simulation mit etwas Zufall für einen natürlicheren Effekt
         base_amplitude = 30
-        time_factor = abs(np.sin(time.time() * 2)) 
+        time_factor = abs(np.sin(ctx.now() * 2)) 
         
         # Leicht unterschiedliche Werte für linken und rechten Kanal
-        random_left = 40 * time_factor + random.uniform(0, 30)
-        random_right = 40 * time_factor + random.uniform(0, 30) * 0.8  # Leicht andere Charakteristik
+        random_left = 40 * time_factor + ctx.random.uniform(0, 30)
+        random_right = 40 * time_factor + ctx.random.uniform(0, 30) * 0.8  # Leicht andere Charakteristik
         
         # Werte speichern
         self.amplitude_smooth_left = min(100, base_amplitude + random_left)
         self.amplitude_smooth_right = min(100, base_amplitude + random_right)
+        self.current_amplitude = max(self.amplitude_smooth_left, self.amplitude_smooth_right)
+        self._modulate(ctx, self.amplitude_smooth_left, self.amplitude_smooth_right)
         
         # Ausgabe der simulierten Amplituden
         # print(f"Simulierte Audio-Amplitude: Links: {self.amplitude_smooth_left:.2f}% | Rechts: {self.amplitude_smooth_right:.2f}%")
@@ -203,6 +401,36 @@ class AudioVisualizer(BaseLEDController):
         # Durchschnitt für Einzelwert-Funktionen zurückgeben
         return (self.amplitude_smooth_left + self.amplitude_smooth_right) / 2
     
+    def _modulate(self, ctx, level_left, level_right, left=None, right=None, step=1, scale=1.0 / 32768):
+        """
+        Berechnet die Audio-Merkmale des Chunks und wertet die Modulationsmatrix aus.
+        Ohne Routen in Config.MODULATION entfällt beides.
+        
+        :param level_left: Ungeglätteter Pegel links in Prozent
+        :param level_right: Ungeglätteter Pegel rechts in Prozent
+        :param left: Samples links bzw. mono (für die Frequenzbänder, optional)
+        :param right: Samples rechts (None bei Mono)
+        :param step: Ausdünnung der Samples (analysis_step)
+        :param scale: Faktor von Sample-Werten auf Pegel (Verstärkung / 32768)
+        """
+        if not Config.MODULATION:
+            if self._modulated:
+                self._modulated = {}
+            return
+        matrix = self.modulation
+        matrix.sync(Config)
+        features = self.features.update(level_left / 100.0, level_right / 100.0, ctx.now(), left, right,
+                                        rate=self.RATE / step, scale=scale, bands=matrix.needs_bands)
+        matrix.evaluate(features)
+        self._modulated = matrix.pattern_values(self.pattern)
+    
+    def _param(self, name):
+        """Wert eines Parameters des aktuellen Musters, moduliert oder aus Config.pattern_param()"""
+        value = self._modulated.get(name)
+        if value is None:
+            return Config.pattern_param(self.pattern, name)
+        return value
+    
     def configure_from_config(self):
         """
         Konfiguriert den Controller basierend auf der aktuellen Config.
@@ -216,66 +444,27 @@ class AudioVisualizer(BaseLEDController):
         """
         Bereinigt Ressourcen und bereitet den Controller auf das Beenden vor.
         """
-        # Audio-Stream schließen
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        
-        # PyAudio-Instanz beenden
-        self.p.terminate()
+        # Audio-Stream schließen und PyAudio-Instanz beenden
+        self.stop_audio_stream()
         
         # LEDs ausschalten
         self.clear_all_leds()
     
-    def _get_color_from_config(self):
-        """
-        Gibt die in der Config konfigurierte Farbe zurück.
-        """
-        color_name = Config.LED_COLOR.lower()
-        
-        if color_name == 'rainbow':
-            # Regenbogenfarben werden in den spezifischen Visualisierungen behandelt
-            return Color(255, 255, 255)  # Weiß als Fallback
-        elif color_name == 'red':
-            return Color(255, 0, 0)
-        elif color_name == 'green':
-            return Color(0, 255, 0)
-        elif color_name == 'blue':
-            return Color(0, 0, 255)
-        elif color_name == 'purple':
-            return Color(128, 0, 128)
-        elif color_name == 'yellow':
-            return Color(255, 255, 0)
-        else:
-            return Color(255, 255, 255)  # Weiß als Fallback
+    def _led_positions(self):
+        """
+        Index und Position (0.0 - 1.0) jeder LED im Streifen als NumPy-Arrays,
+        zwischengespeichert bis sich die LED-Anzahl ändert.
+        """
+        count = self.led_count
+        if self._positions is None or len(self._positions[0]) != count:
+            indices = np.arange(count)
+            self._positions = (indices, indices / float(count))
+        return self._positions
     
-    def _get_rainbow_color(self, position, intensity=255):
-        """
-        Erzeugt eine Regenbogenfarbe basierend auf der Position (0.0 - 1.0)
-        und der Intensität (0-255).
-        """
-        position = position * 6  # Skalieren auf 6 Farbbereiche
-        
-        # Berechne Farbkomponenten
-        if position < 1:
-            r, g, b = 255, int(position * 255), 0
-        elif position < 2:
-            r, g, b = int((2 - position) * 255), 255, 0
-        elif position < 3:
-            r, g, b = 0, 255, int((position - 2) * 255)
-        elif position < 4:
-            r, g, b = 0, int((4 - position) * 255), 255
-        elif position < 5:
-            r, g, b = int((position - 4) * 255), 0, 255
-        else:
-            r, g, b = 255, 0, int((6 - position) * 255)
-        
-        # Intensität anwenden
-        r = int(r * intensity / 255)
-        g = int(g * intensity / 255)
-        b = int(b * intensity / 255)
-        
-        return Color(r, g, b)
+    def _set_pixels(self, strip, colors):
+        """Setzt die LEDs eines Streifens der Reihe nach auf die übergebenen Farben"""
+        for i, color in enumerate(colors):
+            strip.setPixelColor(i, color)
     
     def clear_all_leds(self):
         """
@@ -291,46 +480,35 @@ class AudioVisualizer(BaseLEDController):
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
         # Strips aktualisieren
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
     
     # Muster 1: VU-Meter-ähnliche Visualisierung
-    def _visualize_mono_vu_meter(self, amplitude_percent):
+    def _visualize_mono_vu_meter(self, ctx, amplitude_percent):
         """
         Visualisiert die Audioamplitude als VU-Meter.
         Bei höherer Amplitude leuchten mehr LEDs.
         """
         # Berechne, wie viele LEDs basierend auf der Amplitude leuchten sollen
-        num_leds = int((amplitude_percent / 100.0) * Config.LED_PER_STRIP)
-        base_color = self._get_color_from_config()
+        num_leds = min(self.led_count, int((amplitude_percent / 100.0) * self.led_count * self._param('width')))
+        palette = self._palette()
+        
+        # Farben der leuchtenden LEDs
+        if palette.gradient:
+            # Verlauf über die Position im Strip (z.B. Regenbogen)
+            _, positions = self._led_positions()
+            colors = palette.sample_array(positions[:num_leds]) if num_leds > 0 else []
+        else:
+            colors = [palette.color] * num_leds
         
-        # Setze die LEDs entsprechend der Amplitude
-        for i in range(Config.LED_PER_STRIP):
-            if i < num_leds:
-                # Farbe basierend auf Position - rot für hohe Pegel, grün für niedrige
-                if Config.LED_COLOR.lower() == 'rainbow':
-                    # Hellere Farben für aktivierte LEDs
-                    pos = i / float(Config.LED_PER_STRIP)
-                    color = self._get_rainbow_color(pos)
-                else:
-                    # Bei anderen Farben: Helligkeit basierend auf Position
-                    intensity = min(255, int(255 * (0.5 + 0.5 * i / Config.LED_PER_STRIP)))
-                    r = min(255, int((base_color >> 16) & 0xFF))
-                    g = min(255, int((base_color >> 8) & 0xFF))
-                    b = min(255, int(base_color & 0xFF))
-                    color = Color(r, g, b)
-            else:
-                # Ausgeschaltete LEDs
-                color = Color(0, 0, 0)
-            
-            self.strip_one.setPixelColor(i, color)
-            self.strip_two.setPixelColor(i, color)
+        # Restliche LEDs ausschalten
+        colors += [Color(0, 0, 0)] * (self.led_count - len(colors))
+        self._set_pixels(self.strip_one, colors)
+        self._set_pixels(self.strip_two, colors)
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
     
     # Muster 2: Pulsierender Effekt
-    def _visualize_mono_pulse(self, amplitude_percent):
+    def _visualize_mono_pulse(self, ctx, amplitude_percent):
         """
         Visualisiert die Audioamplitude als pulsierender Effekt.
         Die gesamte LED-Leiste pulst mit der Musik.
@@ -339,41 +517,42 @@ class AudioVisualizer(BaseLEDController):
         brightness = int((amplitude_percent / 100.0) * 255)
         
         # Farbe basierend auf Config
-        base_color = self._get_color_from_config()
-        
-        # Skala für RGB-Werte basierend auf Amplitude
-        scale = max(0.1, amplitude_percent / 100.0)
-        
-        for i in range(Config.LED_PER_STRIP):
-            if Config.LED_COLOR.lower() == 'rainbow':
-                # Rainbow-Effekt mit amplitudenabhängiger Helligkeit
-                hue = (i / float(Config.LED_PER_STRIP) + time.time() * 0.1) % 1.0
-                color = self._get_rainbow_color(hue, brightness)
-            else:
-                # Skaliere die Farbe basierend auf der Amplitude
-                r = min(255, int(((base_color >> 16) & 0xFF) * scale))
-                g = min(255, int(((base_color >> 8) & 0xFF) * scale))
-                b = min(255, int((base_color & 0xFF) * scale))
-                color = Color(r, g, b)
-            
-            self.strip_one.setPixelColor(i, color)
-            self.strip_two.setPixelColor(i, color)
+        palette = self._palette()
         
-        self.strip_one.show()
-        self.strip_two.show()
+        if palette.gradient:
+            # Wandernder Verlauf mit amplitudenabhängiger Helligkeit
+            _, positions = self._led_positions()
+            colors = palette.sample_array((positions + ctx.now() * self._param('hue_speed') + self._param('hue_offset')) % 1.0, brightness)
+        else:
+            # Skaliere die Farbe basierend auf der Amplitude
+            base_color = palette.color
+            scale = max(0.1, amplitude_percent / 100.0)
+            r = min(255, int(((base_color >> 16) & 0xFF) * scale))
+            g = min(255, int(((base_color >> 8) & 0xFF) * scale))
+            b = min(255, int((base_color & 0xFF) * scale))
+            colors = [Color(r, g, b)] * self.led_count
+        
+        self._set_pixels(self.strip_one, colors)
+        self._set_pixels(self.strip_two, colors)
+        
+        self.show_strips()
     
     # Muster 3: Symmetrisches zentrales Muster
-    def _visualize_mono_center_bloom(self, amplitude_percent):
+    def _visualize_mono_center_bloom(self, ctx, amplitude_percent):
         """
         Visualisiert die Audioamplitude als symmetrisches Muster, 
         das von der Mitte nach außen wächst.
         """
         # Berechne, wie viele LEDs insgesamt leuchten sollen (von der Mitte aus)
-        center = Config.LED_PER_STRIP // 2
-        radius = int((amplitude_percent / 100.0) * (Config.LED_PER_STRIP // 2))
+        center = self.led_count // 2
+        radius = min(center, int((amplitude_percent / 100.0) * (self.led_count // 2) * self._param('width')))
+        
+        palette = self._palette()
+        hue_speed = self._param('hue_speed')
+        hue_offset = self._param('hue_offset')
         
         # Setze alle LEDs zunächst auf aus
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
@@ -384,15 +563,15 @@ class AudioVisualizer(BaseLEDController):
             right = center + offset
             
             # Intensität basierend auf Entfernung vom Zentrum
-            intensity = 255 - int(255 * (offset / (Config.LED_PER_STRIP / 2)))
+            intensity = 255 - int(255 * (offset / (self.led_count / 2)))
             intensity = max(50, intensity)
             
-            if Config.LED_COLOR.lower() == 'rainbow':
-                # Zeit-basierte Farbänderung für pulsierenden Regenbogeneffekt
-                hue = (offset / float(Config.LED_PER_STRIP) + time.time() * 0.2) % 1.0
-                color = self._get_rainbow_color(hue, intensity)
+            if palette.gradient:
+                # Zeit-basierte Farbänderung für pulsierenden Verlauf
+                hue = (offset / float(self.led_count) + ctx.now() * hue_speed + hue_offset) % 1.0
+                color = palette.sample(hue, intensity)
             else:
-                base_color = self._get_color_from_config()
+                base_color = palette.color
                 # Skaliere die Farbe basierend auf der Intensität
                 r = min(255, int(((base_color >> 16) & 0xFF) * intensity / 255))
                 g = min(255, int(((base_color >> 8) & 0xFF) * intensity / 255))
@@ -400,19 +579,18 @@ class AudioVisualizer(BaseLEDController):
                 color = Color(r, g, b)
             
             # Setze die Farben links und rechts vom Zentrum
-            if 0 <= left < Config.LED_PER_STRIP:
+            if 0 <= left < self.led_count:
                 self.strip_one.setPixelColor(left, color)
                 self.strip_two.setPixelColor(left, color)
             
-            if 0 <= right < Config.LED_PER_STRIP and right != left:
+            if 0 <= right < self.led_count and right != left:
                 self.strip_one.setPixelColor(right, color)
                 self.strip_two.setPixelColor(right, color)
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
     
     # Hilfsmuster: Reaktive Volltonfarbe
-    def _visualize_reactive_solid_color(self, amplitude_percent):
+    def _visualize_reactive_solid_color(self, ctx, amplitude_percent):
         """
         Zeigt eine einheitliche Farbe an, deren Helligkeit von der Audioamplitude abhängt.
         """
@@ -430,15 +608,14 @@ class AudioVisualizer(BaseLEDController):
         color = Color(r, g, b)
         
         # Setze alle LEDs auf die gleiche Farbe
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, color)
             self.strip_two.setPixelColor(i, color)
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
         
     # Neues Stereo-Muster
-    def _visualize_stereo_vu_meter(self):
+    def _visualize_stereo_vu_meter(self, ctx):
         """
         Stereo-Visualisierung: Linker und rechter Kanal werden separat auf den LED-Strips angezeigt.
         Strip_one zeigt den linken Kanal, strip_two zeigt den rechten Kanal.
@@ -448,45 +625,36 @@ class AudioVisualizer(BaseLEDController):
         right_amplitude = self.amplitude_smooth_right
 
         # Berechne, wie viele LEDs pro Strip basierend auf der Amplitude leuchten sollen
-        left_leds = int((left_amplitude / 100.0) * Config.LED_PER_STRIP)
-        right_leds = int((right_amplitude / 100.0) * Config.LED_PER_STRIP)
+        width = self._param('width')
+        left_leds = min(self.led_count, int((left_amplitude / 100.0) * self.led_count * width))
+        right_leds = min(self.led_count, int((right_amplitude / 100.0) * self.led_count * width))
         
         # Farben für jeden Kanal definieren - unterschiedliche Farben für Links/Rechts
+        palette = self._palette()
         base_color = self._get_color_from_config()
         
-        # Spezielle Behandlung für den Regenbogenmodus
-        if Config.LED_COLOR.lower() == 'rainbow':
-            # Linker Kanal: Blau-zu-Rot Spektrum (kühle zu warmen Farben)
-            for i in range(Config.LED_PER_STRIP):
-                if i < left_leds:
-                    # Farbverlauf von blau (niedrig) zu rot (hoch)
-                    pos = i / float(Config.LED_PER_STRIP)
-                    hue = 0.7 - pos * 0.7  # 0.7 (blau) bis 0.0 (rot)
-                    intensity = min(255, int(255 * (0.5 + 0.5 * i / Config.LED_PER_STRIP)))
-                    color = self._get_rainbow_color(hue, intensity)
-                else:
-                    color = Color(0, 0, 0)  # Aus
-                self.strip_one.setPixelColor(i, color)
+        # Spezielle Behandlung für Verläufe (z.B. Regenbogen)
+        if palette.gradient:
+            indices, positions = self._led_positions()
+            # Hellere LEDs zum Ende des Streifens
+            intensities = np.minimum(255, (255 * (0.5 + 0.5 * indices / self.led_count)).astype(np.int64))
+            off = Color(0, 0, 0)
             
-            # Rechter Kanal: Grün-zu-Gelb Spektrum
-            for i in range(Config.LED_PER_STRIP):
-                if i < right_leds:
-                    # Farbverlauf von grün (niedrig) zu gelb (hoch)
-                    pos = i / float(Config.LED_PER_STRIP)
-                    hue = 0.3 - pos * 0.15  # 0.3 (grün) bis 0.15 (gelb)
-                    intensity = min(255, int(255 * (0.5 + 0.5 * i / Config.LED_PER_STRIP)))
-                    color = self._get_rainbow_color(hue, intensity)
-                else:
-                    color = Color(0, 0, 0)  # Aus
-                self.strip_two.setPixelColor(i, color)
+            # Linker Kanal: 0.7 bis 0.0 im Verlauf (beim Regenbogen blau zu rot)
+            colors = palette.sample_array(0.7 - positions[:left_leds] * 0.7, intensities[:left_leds]) if left_leds > 0 else []
+            self._set_pixels(self.strip_one, colors + [off] * (self.led_count - len(colors)))
+            
+            # Rechter Kanal: 0.3 bis 0.15 im Verlauf (beim Regenbogen grün zu gelb)
+            colors = palette.sample_array(0.3 - positions[:right_leds] * 0.15, intensities[:right_leds]) if right_leds > 0 else []
+            self._set_pixels(self.strip_two, colors + [off] * (self.led_count - len(colors)))
                 
         else:
-            # Bei nicht-Regenbogen Farben
+            # Bei Einzelfarben
             # Links: Original-Farbe mit variabler Intensität
-            for i in range(Config.LED_PER_STRIP):
+            for i in range(self.led_count):
                 if i < left_leds:
                     # Intensität basierend auf Position
-                    scale = max(0.1, (0.5 + 0.5 * i / Config.LED_PER_STRIP) * (left_amplitude / 100.0))
+                    scale = max(0.1, (0.5 + 0.5 * i / self.led_count) * (left_amplitude / 100.0))
                     r = min(255, int(((base_color >> 16) & 0xFF) * scale))
                     g = min(255, int(((base_color >> 8) & 0xFF) * scale))
                     b = min(255, int((base_color & 0xFF) * scale))
@@ -500,10 +668,10 @@ class AudioVisualizer(BaseLEDController):
             complement_g = 255 - ((base_color >> 8) & 0xFF)
             complement_b = 255 - (base_color & 0xFF)
             
-            for i in range(Config.LED_PER_STRIP):
+            for i in range(self.led_count):
                 if i < right_leds:
                     # Intensität basierend auf Position
-                    scale = max(0.1, (0.5 + 0.5 * i / Config.LED_PER_STRIP) * (right_amplitude / 100.0))
+                    scale = max(0.1, (0.5 + 0.5 * i / self.led_count) * (right_amplitude / 100.0))
                     r = min(255, int(complement_r * scale))
                     g = min(255, int(complement_g * scale))
                     b = min(255, int(complement_b * scale))
@@ -513,12 +681,11 @@ class AudioVisualizer(BaseLEDController):
                 self.strip_two.setPixelColor(i, color)
         
         # Aktualisiere die Strips
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
 
 
 
-    def _visualize_stereo_pulse(self):
+    def _visualize_stereo_pulse(self, ctx):
         """
         Visualisiert die Audioamplitude als pulsierender Stereo-Effekt.
         Jeder LED-Strip pulst individuell mit der Musik des entsprechenden Kanals.
@@ -533,59 +700,44 @@ class AudioVisualizer(BaseLEDController):
         right_brightness = int((right_amplitude / 100.0) * 255)
         
         # Farbe basierend auf Config
-        base_color = self._get_color_from_config()
-        
-        # Skalierungsfaktoren für RGB-Werte basierend auf Amplitude
-        left_scale = max(0.1, left_amplitude / 100.0)
-        right_scale = max(0.1, right_amplitude / 100.0)
-        
-        # Linker Kanal - alle LEDs im linken Strip pulsieren gleichmäßig
-        for i in range(Config.LED_PER_STRIP):
-            if Config.LED_COLOR.lower() == 'rainbow':
-                # Rainbow-Effekt mit amplitudenabhängiger Helligkeit für linken Kanal
-                # Farbverlauf von blau (niedrig) zu rot (hoch)
-                hue = (i / float(Config.LED_PER_STRIP) + time.time() * 0.1) % 1.0
-                # Modifiziere Farbton leicht für linken Kanal (kühler)
-                hue = (hue + 0.7) % 1.0
-                color = self._get_rainbow_color(hue, left_brightness)
-            else:
-                # Skaliere die Farbe basierend auf der Amplitude
-                r = min(255, int(((base_color >> 16) & 0xFF) * left_scale))
-                g = min(255, int(((base_color >> 8) & 0xFF) * left_scale))
-                b = min(255, int((base_color & 0xFF) * left_scale))
-                color = Color(r, g, b)
+        palette = self._palette()
+        
+        if palette.gradient:
+            # Wandernder Verlauf mit amplitudenabhängiger Helligkeit, je Kanal verschoben
+            _, positions = self._led_positions()
+            hues = (positions + ctx.now() * self._param('hue_speed') + self._param('hue_offset')) % 1.0
+            # Linker Kanal kühler, rechter Kanal wärmer (beim Regenbogen)
+            left_colors = palette.sample_array((hues + 0.7) % 1.0, left_brightness)
+            right_colors = palette.sample_array((hues + 0.3) % 1.0, right_brightness)
+        else:
+            # Skalierungsfaktoren für RGB-Werte basierend auf Amplitude
+            base_color = palette.color
+            left_scale = max(0.1, left_amplitude / 100.0)
+            right_scale = max(0.1, right_amplitude / 100.0)
             
-            self.strip_one.setPixelColor(i, color)
-        
-        # Rechter Kanal - alle LEDs im rechten Strip pulsieren gleichmäßig
-        for i in range(Config.LED_PER_STRIP):
-            if Config.LED_COLOR.lower() == 'rainbow':
-                # Rainbow-Effekt mit amplitudenabhängiger Helligkeit für rechten Kanal
-                # Farbverlauf von grün (niedrig) zu gelb (hoch)
-                hue = (i / float(Config.LED_PER_STRIP) + time.time() * 0.1) % 1.0
-                # Modifiziere Farbton leicht für rechten Kanal (wärmer)
-                hue = (hue + 0.3) % 1.0
-                color = self._get_rainbow_color(hue, right_brightness)
-            else:
-                # Bei nicht-Regenbogen Farben - Komplementärfarbe für rechten Kanal
-                complement_r = 255 - ((base_color >> 16) & 0xFF)
-                complement_g = 255 - ((base_color >> 8) & 0xFF)
-                complement_b = 255 - (base_color & 0xFF)
-                
-                # Skaliere die Farbe basierend auf der Amplitude
-                r = min(255, int(complement_r * right_scale))
-                g = min(255, int(complement_g * right_scale))
-                b = min(255, int(complement_b * right_scale))
-                color = Color(r, g, b)
+            # Linker Kanal: Grundfarbe, alle LEDs pulsieren gleichmäßig
+            r = min(255, int(((base_color >> 16) & 0xFF) * left_scale))
+            g = min(255, int(((base_color >> 8) & 0xFF) * left_scale))
+            b = min(255, int((base_color & 0xFF) * left_scale))
+            left_colors = [Color(r, g, b)] * self.led_count
             
-            self.strip_two.setPixelColor(i, color)
+            # Rechter Kanal: Komplementärfarbe
+            complement_r = 255 - ((base_color >> 16) & 0xFF)
+            complement_g = 255 - ((base_color >> 8) & 0xFF)
+            complement_b = 255 - (base_color & 0xFF)
+            r = min(255, int(complement_r * right_scale))
+            g = min(255, int(complement_g * right_scale))
+            b = min(255, int(complement_b * right_scale))
+            right_colors = [Color(r, g, b)] * self.led_count
+        
+        self._set_pixels(self.strip_one, left_colors)
+        self._set_pixels(self.strip_two, right_colors)
         
         # Aktualisiere die Strips
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
 
 
-    def _visualize_stereo_center_bloom(self):
+    def _visualize_stereo_center_bloom(self, ctx):
         """
         Stereo-Visualisierung: Symmetrisches Muster, das von der Mitte nach außen wächst.
         Jeder LED-Strip zeigt einen eigenen Kanal an.
@@ -596,17 +748,21 @@ class AudioVisualizer(BaseLEDController):
         right_amplitude = self.amplitude_smooth_right
         
         # Berechne, wie viele LEDs für jeden Kanal leuchten sollen (von der Mitte aus)
-        center = Config.LED_PER_STRIP // 2
-        left_radius = int((left_amplitude / 100.0) * (Config.LED_PER_STRIP // 2))
-        right_radius = int((right_amplitude / 100.0) * (Config.LED_PER_STRIP // 2))
+        center = self.led_count // 2
+        width = self._param('width')
+        left_radius = min(center, int((left_amplitude / 100.0) * (self.led_count // 2) * width))
+        right_radius = min(center, int((right_amplitude / 100.0) * (self.led_count // 2) * width))
         
         # Setze alle LEDs zunächst auf aus
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
         # Farbe basierend auf Config
+        palette = self._palette()
         base_color = self._get_color_from_config()
+        hue_speed = self._param('hue_speed')
+        hue_offset = self._param('hue_offset')
         
         # Linker Kanal - strip_one
         for offset in range(left_radius + 1):
@@ -615,15 +771,15 @@ class AudioVisualizer(BaseLEDController):
             right = center + offset
             
             # Intensität basierend auf Entfernung vom Zentrum
-            intensity = 255 - int(255 * (offset / (Config.LED_PER_STRIP / 2)))
+            intensity = 255 - int(255 * (offset / (self.led_count / 2)))
             intensity = max(50, intensity)
             
-            if Config.LED_COLOR.lower() == 'rainbow':
-                # Zeit-basierte Farbänderung für pulsierenden Regenbogeneffekt
+            if palette.gradient:
+                # Zeit-basierte Farbänderung für pulsierenden Verlauf
                 # Modifiziere Farbton leicht für linken Kanal (kühler)
-                hue = (offset / float(Config.LED_PER_STRIP) + time.time() * 0.2) % 1.0
+                hue = (offset / float(self.led_count) + ctx.now() * hue_speed + hue_offset) % 1.0
                 hue = (hue + 0.7) % 1.0  # Blau-Bereich
-                color = self._get_rainbow_color(hue, intensity)
+                color = palette.sample(hue, intensity)
             else:
                 # Skaliere die Farbe basierend auf der Intensität
                 r = min(255, int(((base_color >> 16) & 0xFF) * intensity / 255))
@@ -632,10 +788,10 @@ class AudioVisualizer(BaseLEDController):
                 color = Color(r, g, b)
             
             # Setze die Farben links und rechts vom Zentrum für linken Kanal
-            if 0 <= left < Config.LED_PER_STRIP:
+            if 0 <= left < self.led_count:
                 self.strip_one.setPixelColor(left, color)
             
-            if 0 <= right < Config.LED_PER_STRIP and right != left:
+            if 0 <= right < self.led_count and right != left:
                 self.strip_one.setPixelColor(right, color)
         
         # Rechter Kanal - strip_two
@@ -645,17 +801,17 @@ class AudioVisualizer(BaseLEDController):
             right = center + offset
             
             # Intensität basierend auf Entfernung vom Zentrum
-            intensity = 255 - int(255 * (offset / (Config.LED_PER_STRIP / 2)))
+            intensity = 255 - int(255 * (offset / (self.led_count / 2)))
             intensity = max(50, intensity)
             
-            if Config.LED_COLOR.lower() == 'rainbow':
-                # Zeit-basierte Farbänderung für pulsierenden Regenbogeneffekt
+            if palette.gradient:
+                # Zeit-basierte Farbänderung für pulsierenden Verlauf
                 # Modifiziere Farbton leicht für rechten Kanal (wärmer)
-                hue = (offset / float(Config.LED_PER_STRIP) + time.time() * 0.2) % 1.0
+                hue = (offset / float(self.led_count) + ctx.now() * hue_speed + hue_offset) % 1.0
                 hue = (hue + 0.3) % 1.0  # Grün-Gelb-Bereich
-                color = self._get_rainbow_color(hue, intensity)
+                color = palette.sample(hue, intensity)
             else:
-                # Bei nicht-Regenbogen Farben - Komplementärfarbe für rechten Kanal
+                # Bei Einzelfarben - Komplementärfarbe für rechten Kanal
                 complement_r = 255 - ((base_color >> 16) & 0xFF)
                 complement_g = 255 - ((base_color >> 8) & 0xFF)
                 complement_b = 255 - (base_color & 0xFF)
@@ -667,12 +823,11 @@ class AudioVisualizer(BaseLEDController):
                 color = Color(r, g, b)
             
             # Setze die Farben links und rechts vom Zentrum für rechten Kanal
-            if 0 <= left < Config.LED_PER_STRIP:
+            if 0 <= left < self.led_count:
                 self.strip_two.setPixelColor(left, color)
             
-            if 0 <= right < Config.LED_PER_STRIP and right != left:
+            if 0 <= right < self.led_count and right != left:
                 self.strip_two.setPixelColor(right, color)
         
         # Aktualisiere die Strips
-        self.strip_one.show()
-        self.strip_two.show()
\ No newline at end of file
+        self.show_strips()
\ No newline at end of file
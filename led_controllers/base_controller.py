@@ -1,47 +1,94 @@
-from rpi_ws281x import PixelStrip, Color
+from led_controllers.output import Color, create_strips
+from led_controllers.palette import palettes
+from led_controllers.render_context import RenderContext
 from config.config import Config
+from utils.metrics import metrics
 import time
 import math
 
 
+STRIP_SHOW_SECONDS = metrics.histogram(
+    'pivoltmeter_strip_show_seconds',
+    'Dauer der Ausgabe eines Frames an beide LED-Streifen (show())'
+)
+PATTERN_RENDER_SECONDS = metrics.histogram(
+    'pivoltmeter_pattern_render_seconds',
+    'Berechnungsdauer eines Frames pro Muster (ohne Ausgabe an die Streifen)',
+    labelnames=('pattern',)
+)
+
+
 class BaseLEDController:
-    def __init__(self, config=None):
+    def __init__(self, config=None, strips=None, context=None):
         """
         Initialisiert den Basis-LED-Controller
         
         :param config: Konfigurationsobjekt (optional)
+        :param strips: Bereits gestartete LED-Streifen (strip_one, strip_two) eines
+                       anderen Controllers, die mitbenutzt werden sollen (optional)
+        :param context: RenderContext mit Uhr und Zufallsgenerator für die Muster (optional)
         """
         # Verwende Standardkonfiguration, wenn keine übergeben wird
         self.config = config or Config
+        self.context = context or RenderContext()
+        
+        # Wartezeit, die das aktuelle Muster bis zum nächsten Frame wünscht (Sekunden)
+        self.frame_delay = 0
+        # Dauer der letzten Ausgabe an die Streifen (für die Render-Zeitmessung)
+        self.last_show_seconds = 0.0
+        # Zone mit eigenem Muster, eigener Farbe und LED-Anzahl (None = Einstellungen aus Config, siehe utils/zones.py)
+        self.zone = None
+        
+        if strips is not None:
+            # Streifen mitbenutzen: kein zweites begin() auf denselben DMA-Kanälen
+            # und kein Löschen einer gerade laufenden Animation
+            self.strip_one, self.strip_two = strips
+            return
         
-        # Initialisiere LED-Streifen
-        self.strip_one = PixelStrip(
-            self.config.LED_PER_STRIP, 
-            self.config.LED_PIN_ONE, 
-            self.config.LED_FREQ_HZ, 
-            self.config.LED_DMA_ONE, 
-            self.config.LED_INVERT, 
-            self.config.LED_BRIGHTNESS, 
-            self.config.LED_CHANNEL_ONE
-        )
-        
-        self.strip_two = PixelStrip(
-            self.config.LED_PER_STRIP, 
-            self.config.LED_PIN_TWO, 
-            self.config.LED_FREQ_HZ, 
-            self.config.LED_DMA_TWO, 
-            self.config.LED_INVERT, 
-            self.config.LED_BRIGHTNESS, 
-            self.config.LED_CHANNEL_TWO
-        )
-        
-        # Starte LED-Streifen
-        self.strip_one.begin()
-        self.strip_two.begin()
+        # Initialisiere und starte LED-Streifen (echt oder virtuell, siehe Config.LED_OUTPUT)
+        self.strip_one, self.strip_two = create_strips(self.config)
         
         # Alle LEDs initial ausschalten - verwende die tatsächliche Anzahl
         self.clear_leds_with_margin()
 
+    @property
+    def strips(self):
+        """Die beiden LED-Streifen als Tupel (zum Mitbenutzen durch andere Controller)"""
+        return (self.strip_one, self.strip_two)
+
+    @property
+    def led_count(self):
+        """Anzahl der LEDs, über die das Muster läuft (Config.LED_PER_STRIP bzw. Länge der Zone)"""
+        zone = self.zone
+        return self.config.LED_PER_STRIP if zone is None else zone.length
+
+    def show_strips(self):
+        """
+        Gibt den aktuellen Frame auf beiden LED-Streifen aus und misst die Dauer.
+        In einer Zone gibt der Zonen-Scheduler alle Zonen gemeinsam aus.
+        """
+        if self.zone is not None:
+            return
+        start = time.perf_counter()
+        self.strip_one.show()
+        self.strip_two.show()
+        self.last_show_seconds = time.perf_counter() - start
+        STRIP_SHOW_SECONDS.observe(self.last_show_seconds)
+
+    def _palette(self):
+        """Palette zur konfigurierten Farbe (Config.LED_COLOR bzw. Farbe der Zone)"""
+        return palettes.resolve(Config.LED_COLOR if self.zone is None else self.zone.color)
+
+    def _get_color_from_config(self):
+        """
+        Gibt die Grundfarbe der konfigurierten Palette zurück.
+        Verläufe werden in den Mustern über self._palette() abgetastet.
+        """
+        palette = self._palette()
+        if palette.gradient:
+            return Color(255, 255, 255)  # Weiß als Fallback
+        return palette.color
+
     def clear_leds_with_margin(self):
         """
         Schaltet alle LEDs aus und fügt einen Sicherheitspuffer hinzu,
@@ -54,19 +101,17 @@ class BaseLEDController:
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
 
     def clear_leds(self):
         """
         Schaltet alle konfigurierten LEDs aus
         """
-        for i in range(self.config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
 
     def set_color(self, color):
         """
@@ -84,8 +129,7 @@ class BaseLEDController:
             self.strip_one.setPixelColor(i, Color(r, g, b))
             self.strip_two.setPixelColor(i, Color(r, g, b))
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
 
     def _hex_to_rgb(self, hex_color):
         """
@@ -97,10 +141,13 @@ class BaseLEDController:
         hex_color = hex_color.lstrip('#')
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
     
-    def play_transition_animation(self):
+    def transition_sequence(self):
         """
-        Spielt eine kurze Übergangsanimation ab:
-        Schnelles Aufblitzen aller LEDs in Regenbogenfarben und dann 0,5 Sekunden aus.
+        Kurze Übergangsanimation als Folge einzelner Frames:
+        Schnelles Aufblitzen aller LEDs in Regenbogenfarben und dann eine Sekunde aus.
+        
+        Liefert nach jedem Frame die gewünschte Wartezeit in Sekunden, damit der
+        LED-Manager die Animation zwischen zwei Frames abbrechen kann.
         """
         # Anzahl der Frames für die Animation
         blink_frames = 5  # Wenige Frames für schnelles Blinken
@@ -130,19 +177,17 @@ class BaseLEDController:
                 self.strip_two.setPixelColor(i, Color(r, g, b))
             
             # Aktualisiere die LED-Streifen
-            self.strip_one.show()
-            self.strip_two.show()
+            self.show_strips()
             
             # Kurze Pause für sichtbare Animation (sehr kurz für schnelles Blinken)
-            time.sleep(0.05)
+            yield 0.05
         
         # 2. Phase: Alle LEDs ausschalten
         for i in range(Config.LED_PER_STRIP):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
         
-        # 3. Phase: Pause von 0,5 Sekunden
-        time.sleep(1)
\ No newline at end of file
+        # 3. Phase: Pause von einer Sekunde
+        yield 1
\ No newline at end of file
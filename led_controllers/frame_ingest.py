@@ -0,0 +1,354 @@
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+
+from led_controllers import shared_frames
+from led_controllers.base_controller import BaseLEDController
+from utils.metrics import metrics
+
+
+INGEST_FRAMES = metrics.counter(
+    'pivoltmeter_ingest_frames',
+    'Von außen empfangene Frames',
+    labelnames=('source',)
+)
+INGEST_REJECTED = metrics.counter(
+    'pivoltmeter_ingest_rejected',
+    'Verworfene externe Frames mit falscher Größe',
+    labelnames=('source',)
+)
+INGEST_TORN_FRAMES = metrics.counter(
+    'pivoltmeter_ingest_torn_frames',
+    'Frames aus dem Shared Memory, die während des Lesens wiederholt überschrieben wurden'
+)
+INGEST_ACTIVE = metrics.gauge(
+    'pivoltmeter_ingest_active',
+    '1, solange externe Frames statt des konfigurierten Musters angezeigt werden'
+)
+
+
+class FrameBuffer:
+    """
+    Nimmt externe Frames als rohe RGB-Bytes entgegen.
+
+    Format eines Frames: erst Streifen 1, dann Streifen 2, je LED R, G, B
+    (2 * LED_PER_STRIP * 3 Bytes, wie bei tools/golden). Ein halb so großer
+    Frame wird auf beiden Streifen gleich angezeigt.
+
+    Die Bytes werden direkt in einen von zwei vorab angelegten Slots kopiert,
+    dann wird der Slot veröffentlicht, ohne Zwischenlisten. Der Render-Thread
+    liest immer den vorderen Slot. Speicheraufbau und Protokoll sind in
+    led_controllers/shared_frames.py beschrieben; mit shared_name liegt der
+    Puffer in einem Shared-Memory-Segment, in das genau ein anderer Prozess
+    schreibt (SharedFrameClient). Frames aus diesem Prozess (HTTP, UDP,
+    Unix-Socket) werden dann abgelehnt, da sich die Schreiber sonst beim
+    Veröffentlichen in die Quere kämen.
+    """
+
+    # Abfrageintervall für Frames aus anderen Prozessen (kein Event über Prozessgrenzen)
+    SHARED_POLL_SECONDS = 0.002
+
+    def __init__(self, led_count, timeout=2.0, shared_name=None, shared_mode=0o600, shared_group=None):
+        """
+        :param led_count: LEDs pro Streifen
+        :param timeout: Sekunden ohne neuen Frame, nach denen wieder das konfigurierte Muster läuft
+        :param shared_name: Name des Shared-Memory-Segments (None = nur im Prozess)
+        :param shared_mode: Dateirechte des Segments unter /dev/shm
+        :param shared_group: Gruppe, die das Segment erhält (None = unverändert)
+        """
+        self.led_count = led_count
+        self.timeout = timeout
+        self.strip_bytes = led_count * 3
+        self.frame_bytes = 2 * self.strip_bytes
+        self.shared_name = shared_name
+        self._shm = None
+        if shared_name:
+            self._shm = self._create_shared(shared_name, shared_mode, shared_group)
+            self._memory = self._shm.buf
+        else:
+            self._memory = memoryview(bytearray(shared_frames.segment_size(led_count)))
+        shared_frames.write_header(self._memory, led_count)
+        start = shared_frames.HEADER_SIZE
+        self._slots = (
+            self._memory[start:start + self.frame_bytes],
+            self._memory[start + self.frame_bytes:start + 2 * self.frame_bytes],
+        )
+        self._local_sequence = 0
+        self._local_source = None
+        # _write_lock: nur ein Schreiber im Prozess zur Zeit
+        self._write_lock = threading.Lock()
+        self._new_frame = threading.Event()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        :return: FrameBuffer oder None, wenn config.INGEST_ENABLED nicht gesetzt ist
+        """
+        if not config.INGEST_ENABLED:
+            return None
+        return cls(
+            config.LED_PER_STRIP,
+            timeout=config.INGEST_TIMEOUT,
+            shared_name=config.SHARED_FRAMES_NAME,
+            shared_mode=config.SHARED_FRAMES_MODE,
+            shared_group=config.SHARED_FRAMES_GROUP,
+        )
+
+    def _create_shared(self, name, mode, group):
+        """Legt das Segment an (ein übrig gebliebenes wird ersetzt) und setzt die Zugriffsrechte"""
+        from multiprocessing import shared_memory
+        size = shared_frames.segment_size(self.led_count)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Segment eines abgestürzten Laufs
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        path = os.path.join('/dev/shm', name.lstrip('/'))
+        try:
+            if group is not None:
+                import grp
+                os.chown(path, -1, grp.getgrnam(group).gr_gid)
+            os.chmod(path, mode)
+        except (OSError, KeyError) as e:
+            print(f"Rechte für Shared Memory {name} konnten nicht gesetzt werden: {e}")
+        print(f"Frame-Puffer im Shared Memory: {path} ({size} Bytes, Rechte {mode:o})")
+        return shm
+
+    @property
+    def sequence(self):
+        """Sequenznummer des zuletzt veröffentlichten Frames"""
+        return shared_frames.SEQUENCE.unpack_from(self._memory, shared_frames.SEQUENCE_OFFSET)[0]
+
+    @property
+    def updated_at(self):
+        """time.monotonic() der letzten Veröffentlichung (None vor dem ersten Frame)"""
+        if self.sequence == 0:
+            return None
+        return shared_frames.TIMESTAMP.unpack_from(self._memory, shared_frames.TIMESTAMP_OFFSET)[0]
+
+    @property
+    def source(self):
+        """Quelle des letzten Frames ('shm' für Frames aus anderen Prozessen)"""
+        return self._local_source if self._local_sequence == self.sequence else 'shm'
+
+    def write(self, payload, source):
+        """
+        Übernimmt einen Frame.
+
+        :param payload: bytes, bytearray oder memoryview mit frame_bytes oder strip_bytes Bytes
+        :param source: Name der Quelle für Metriken ('http', 'udp', 'unix', ...)
+        :return: Sequenznummer des Frames
+        :raises ValueError: Bei falscher Größe
+        :raises RuntimeError: Wenn der Puffer im Shared Memory liegt (dort schreibt nur SharedFrameClient)
+        """
+        if self._shm is not None:
+            raise RuntimeError(f"Frames werden über das Shared Memory {self.shared_name} empfangen, "
+                               f"nicht über {source}")
+        size = len(payload)
+        if size != self.frame_bytes and size != self.strip_bytes:
+            INGEST_REJECTED.labels(source=source).inc()
+            raise ValueError(f"Frame muss {self.frame_bytes} Bytes (beide Streifen) oder "
+                             f"{self.strip_bytes} Bytes (gespiegelt) lang sein, nicht {size}")
+
+        with self._write_lock:
+            slot = 1 - shared_frames.FRONT.unpack_from(self._memory, shared_frames.FRONT_OFFSET)[0]
+            back = self._slots[slot]
+            back[:size] = payload
+            if size == self.strip_bytes:
+                back[size:] = back[:size]
+            self._local_source = source
+            self._local_sequence = sequence = shared_frames.publish(self._memory, slot)
+        INGEST_FRAMES.labels(source=source).inc()
+        self._new_frame.set()
+        return sequence
+
+    def is_active(self, now=None):
+        """True, solange der letzte Frame jünger als timeout ist"""
+        updated_at = self.updated_at
+        if updated_at is None:
+            return False
+        return (now if now is not None else time.monotonic()) - updated_at < self.timeout
+
+    def read(self, out, since=None):
+        """
+        Schreibt den aktuellen Frame als Farbwerte (0x00RRGGBB) in ein vorhandenes Array.
+
+        :param out: NumPy-Array uint32 der Form (2, led_count)
+        :param since: Sequenznummer des zuletzt gelesenen Frames; ist sie noch aktuell,
+                      bleibt out unverändert
+        :return: Sequenznummer des gelesenen Frames (0, wenn noch keiner empfangen wurde)
+        """
+        for _ in range(3):
+            sequence = self.sequence
+            if sequence == since:
+                return sequence
+            front = shared_frames.FRONT.unpack_from(self._memory, shared_frames.FRONT_OFFSET)[0]
+            rgb = np.frombuffer(self._slots[front], dtype=np.uint8).reshape(2, self.led_count, 3)
+            # In-place im Zielarray, ohne temporäre Arrays
+            out[:] = rgb[:, :, 0]
+            out <<= 8
+            out |= rgb[:, :, 1]
+            out <<= 8
+            out |= rgb[:, :, 2]
+            # Nach der nächsten Veröffentlichung ist der gelesene Slot der hintere und
+            # wird wieder beschrieben: nur ein Frame ohne Veröffentlichung dazwischen ist sicher
+            if self.sequence == sequence:
+                return sequence
+        INGEST_TORN_FRAMES.inc()
+        return sequence
+
+    def wait(self, timeout):
+        """
+        Wartet auf den nächsten Frame (mit Shared Memory höchstens SHARED_POLL_SECONDS).
+
+        :return: True, wenn ein neuer Frame aus diesem Prozess eingetroffen ist
+        """
+        if self._shm is not None:
+            timeout = min(timeout, self.SHARED_POLL_SECONDS)
+        received = self._new_frame.wait(timeout)
+        self._new_frame.clear()
+        return received
+
+    def close(self):
+        """Gibt das Shared-Memory-Segment frei und entfernt es"""
+        if self._shm is None:
+            return
+        self._slots = None
+        self._memory = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+class ExternalFrameVisualizer(BaseLEDController):
+    """Gibt die Frames eines FrameBuffer auf den (mitbenutzten) Streifen aus"""
+
+    def __init__(self, frame_buffer, strips, config=None):
+        """
+        :param frame_buffer: Quelle der Frames
+        :param strips: Gestartete LED-Streifen (strip_one, strip_two)
+        """
+        super().__init__(config=config, strips=strips)
+        self.frame_buffer = frame_buffer
+        self.shown_sequence = 0
+        self._colors = np.zeros((2, frame_buffer.led_count), dtype=np.uint32)
+
+    def update(self):
+        """
+        Gibt den aktuellen Frame aus, falls seit dem letzten Aufruf ein neuer eingetroffen ist.
+
+        :return: True, wenn ein Frame ausgegeben wurde
+        """
+        sequence = self.frame_buffer.read(self._colors, since=self.shown_sequence)
+        if sequence == self.shown_sequence:
+            return False
+        self.shown_sequence = sequence
+        # rpi_ws281x bietet nur setPixelColor() pro LED; memoryview liefert die Werte ohne Liste
+        for strip, colors in zip(self.strips, self._colors):
+            for i, color in enumerate(memoryview(colors)):
+                strip.setPixelColor(i, color)
+        self.show_strips()
+        return True
+
+
+class FrameIngestServer:
+    """
+    Empfängt Frames über UDP und/oder einen Unix-Datagram-Socket.
+    Jedes Datagramm ist genau ein Frame im Format von FrameBuffer.
+    """
+
+    # Größtes mögliches UDP-Datagramm
+    MAX_DATAGRAM = 65507
+
+    def __init__(self, frame_buffer, udp_port=None, unix_path=None, host='0.0.0.0', unix_mode=0o660):
+        """
+        :param frame_buffer: Ziel der Frames
+        :param udp_port: UDP-Port (None = kein UDP)
+        :param unix_path: Pfad des Unix-Sockets (None = kein Unix-Socket)
+        :param host: Adresse für UDP
+        :param unix_mode: Dateirechte des Unix-Sockets (Zugriff nur für Benutzer und Gruppe)
+        """
+        self.frame_buffer = frame_buffer
+        self.udp_port = udp_port
+        self.unix_path = unix_path
+        self.host = host
+        self.unix_mode = unix_mode
+        self._sockets = []
+        self._threads = []
+        self._running = False
+
+    @classmethod
+    def from_config(cls, config, frame_buffer):
+        """
+        :return: FrameIngestServer oder None, ohne FrameBuffer bzw. ohne konfigurierten Socket
+                 oder wenn der FrameBuffer im Shared Memory liegt
+        """
+        if frame_buffer is None or (config.INGEST_UDP_PORT is None and not config.INGEST_UNIX_SOCKET):
+            return None
+        if frame_buffer.shared_name:
+            print(f"Frame-Eingang über UDP/Unix-Socket aus: Frames kommen über das Shared Memory {frame_buffer.shared_name}")
+            return None
+        return cls(frame_buffer, udp_port=config.INGEST_UDP_PORT, unix_path=config.INGEST_UNIX_SOCKET)
+
+    def start(self):
+        """Öffnet die Sockets und startet je einen Empfangs-Thread"""
+        self._running = True
+        if self.udp_port is not None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Großer Empfangspuffer, damit Frames bei kurzen Verzögerungen nicht verloren gehen
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            sock.bind((self.host, self.udp_port))
+            self._start_thread(sock, 'udp')
+            print(f"Frame-Eingang (UDP) auf Port {self.udp_port}")
+
+        if self.unix_path:
+            directory = os.path.dirname(self.unix_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(self.unix_path)
+            os.chmod(self.unix_path, self.unix_mode)
+            self._start_thread(sock, 'unix')
+            print(f"Frame-Eingang (Unix-Socket) unter {self.unix_path}")
+
+    def _start_thread(self, sock, source):
+        self._sockets.append(sock)
+        thread = threading.Thread(target=self._serve, args=(sock, source), name=f"ingest-{source}")
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+
+    def _serve(self, sock, source):
+        # Ein Empfangspuffer pro Socket, Datagramme werden direkt hineingelesen
+        buffer = bytearray(self.MAX_DATAGRAM)
+        view = memoryview(buffer)
+        while self._running:
+            try:
+                size = sock.recv_into(buffer)
+            except OSError:
+                if not self._running:
+                    break
+                raise
+            try:
+                self.frame_buffer.write(view[:size], source)
+            except ValueError:
+                # Bereits in INGEST_REJECTED gezählt
+                pass
+
+    def stop(self):
+        """Schließt alle Sockets"""
+        self._running = False
+        for sock in self._sockets:
+            sock.close()
+        self._sockets = []
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
@@ -0,0 +1,187 @@
+"""
+Modulationsmatrix: Audio-Merkmale steuern Muster-Parameter.
+
+Eine Route (Einstellung 'modulation', über /modulation oder /settings änderbar):
+
+    {"source": "low", "target": "audio_pattern_06.width", "curve": "square",
+     "depth": 0.8, "smoothing": 0.5}
+
+    source     Merkmal aus led_controllers/audio_features.py (0.0 - 1.0)
+    target     <muster>.<parameter> aus Config.PATTERN_PARAMETERS (nur Audio-Muster)
+    curve      linear, square, sqrt, smoothstep, invert (Standard linear)
+    depth      -1.0 - 1.0, Anteil am Wertebereich des Parameters (Standard 1.0)
+    smoothing  0.0 - 0.99, Anteil des vorherigen Werts pro Frame (Standard 0.0)
+
+Wert = eingestellter Parameterwert + Summe aller Routen auf das Ziel von
+depth * curve(source) * (maximum - minimum), begrenzt auf den Bereich des
+Parameters. Alle Routen werden pro Frame gemeinsam mit NumPy ausgewertet.
+"""
+import numpy as np
+from led_controllers.audio_features import FEATURES, BAND_FEATURES
+
+
+def _smoothstep(x):
+    return x * x * (3.0 - 2.0 * x)
+
+
+def _invert(x):
+    return 1.0 - x
+
+
+# Kurven für Werte zwischen 0.0 und 1.0 (Ergebnis ebenfalls 0.0 - 1.0)
+CURVES = {
+    'linear': None,
+    'square': np.square,
+    'sqrt': np.sqrt,
+    'smoothstep': _smoothstep,
+    'invert': _invert,
+}
+MAX_ROUTES = 32
+
+
+def modulation_targets(config):
+    """
+    Parameter, die moduliert werden können.
+
+    :return: Dictionary {'<muster>.<parameter>': (minimum, maximum, standard)}
+    """
+    return {
+        f"{pattern}.{name}": spec
+        for pattern in config.AUDIO_PATTERNS
+        for name, spec in config.PATTERN_PARAMETERS.get(pattern, {}).items()
+    }
+
+
+def _number(route, key, default, minimum, maximum):
+    value = route.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not minimum <= value <= maximum:
+        raise ValueError(f"{key} muss zwischen {minimum} und {maximum} liegen: {value}")
+    return float(value)
+
+
+def validate_routes(routes, config):
+    """
+    Prüft eine vollständige Liste von Routen.
+
+    :param routes: Liste von Routen (siehe Modulbeschreibung)
+    :param config: Config-Klasse (für Muster und Parameterbereiche)
+    :return: Liste normalisierter Routen mit allen Feldern
+    :raises ValueError: Bei unbekannter Quelle, Ziel oder Kurve bzw. Werten außerhalb des Bereichs
+    """
+    if not isinstance(routes, list):
+        raise ValueError("modulation muss eine Liste von Routen sein")
+    if len(routes) > MAX_ROUTES:
+        raise ValueError(f"Höchstens {MAX_ROUTES} Modulationen erlaubt")
+    targets = modulation_targets(config)
+    result = []
+    for route in routes:
+        if not isinstance(route, dict):
+            raise ValueError("Eine Route muss ein Objekt sein")
+        unknown = set(route) - {'source', 'target', 'curve', 'depth', 'smoothing'}
+        if unknown:
+            raise ValueError(f"Unbekannte Felder in der Route: {', '.join(sorted(unknown))}")
+        if route.get('source') not in FEATURES:
+            raise ValueError(f"Unbekannte Quelle: {route.get('source')} (möglich: {', '.join(FEATURES)})")
+        if route.get('target') not in targets:
+            raise ValueError(f"Unbekanntes Ziel: {route.get('target')}")
+        curve = route.get('curve', 'linear')
+        if curve not in CURVES:
+            raise ValueError(f"Unbekannte Kurve: {curve} (möglich: {', '.join(CURVES)})")
+        result.append({
+            "source": route['source'],
+            "target": route['target'],
+            "curve": curve,
+            "depth": _number(route, 'depth', 1.0, -1.0, 1.0),
+            "smoothing": _number(route, 'smoothing', 0.0, 0.0, 0.99),
+        })
+    return result
+
+
+class ModulationMatrix:
+    """
+    Wertet die Routen aus config.MODULATION pro Frame aus.
+
+    Quellen, Kurven, Tiefen und Ziele liegen als NumPy-Arrays vor und werden
+    nur neu aufgebaut, wenn sich config.MODULATION ändert (apply_settings()
+    ersetzt die Liste, daher genügt ein Vergleich der Identität). Der Zustand
+    der Glättung bleibt dabei nicht erhalten.
+    """
+
+    def __init__(self):
+        self._routes = None
+        self._params = None
+        self._targets = []
+        self._by_pattern = {}
+        self._result = ([], np.zeros(0))
+        self.needs_bands = False
+
+    def sync(self, config):
+        """Baut die Arrays neu auf, wenn sich Routen oder Parameterwerte geändert haben"""
+        if config.MODULATION is not self._routes:
+            self._build(config.MODULATION, config)
+        if config.PATTERN_PARAMS is not self._params:
+            # Eingestellte Werte als Basis (ändern sich nur mit einer neuen Konfigurationsversion)
+            self._params = config.PATTERN_PARAMS
+            self._base = np.array([config.pattern_param(pattern, name) for pattern, name in self._targets])
+
+    def _build(self, routes, config):
+        self._routes = routes
+        self._params = None
+        self._targets = sorted({tuple(route['target'].split('.', 1)) for route in routes})
+        index = {target: n for n, target in enumerate(self._targets)}
+        specs = [config.PATTERN_PARAMETERS[pattern][name] for pattern, name in self._targets]
+        self._minimum = np.array([spec[0] for spec in specs])
+        self._maximum = np.array([spec[1] for spec in specs])
+
+        route_targets = [tuple(route['target'].split('.', 1)) for route in routes]
+        self._sources = np.array([FEATURES.index(route['source']) for route in routes], dtype=np.intp)
+        self._target_index = np.array([index[target] for target in route_targets], dtype=np.intp)
+        # Tiefe bereits mit dem Wertebereich des Ziels multipliziert
+        self._scale = np.array([route['depth'] for route in routes]) * (
+            self._maximum[self._target_index] - self._minimum[self._target_index])
+        self._smoothing = np.array([route['smoothing'] for route in routes])
+        self._state = np.zeros(len(routes))
+        self._curves = [
+            (CURVES[curve], np.array([route['curve'] == curve for route in routes]))
+            for curve in sorted({route['curve'] for route in routes})
+            if CURVES[curve] is not None
+        ]
+        self._by_pattern = {}
+        for n, (pattern, name) in enumerate(self._targets):
+            self._by_pattern.setdefault(pattern, []).append((name, n))
+        self.needs_bands = any(route['source'] in BAND_FEATURES for route in routes)
+        self._result = (self._targets, np.zeros(len(self._targets)))
+
+    def evaluate(self, features):
+        """
+        Berechnet die modulierten Parameterwerte. Vorher sync() aufrufen.
+
+        :param features: Merkmale als Array in der Reihenfolge von FEATURES
+        """
+        if not self._targets:
+            return
+        values = np.clip(features[self._sources], 0.0, 1.0)
+        for curve, mask in self._curves:
+            values[mask] = curve(values[mask])
+        # Glättung je Route: state = s * state + (1 - s) * wert
+        self._state += (1.0 - self._smoothing) * (values - self._state)
+        offsets = np.zeros(len(self._targets))
+        np.add.at(offsets, self._target_index, self._state * self._scale)
+        self._result = (self._targets, np.clip(self._base + offsets, self._minimum, self._maximum))
+
+    def pattern_values(self, pattern):
+        """
+        Modulierte Parameter eines Musters.
+
+        :return: Dictionary {parameter: wert}, leer ohne Routen auf dieses Muster
+        """
+        entries = self._by_pattern.get(pattern)
+        if not entries:
+            return {}
+        values = self._result[1]
+        return {name: float(values[n]) for name, n in entries}
+
+    def to_json(self):
+        """Zuletzt berechnete Werte als {'<muster>.<parameter>': wert} (auch aus anderen Threads lesbar)"""
+        targets, values = self._result
+        return {f"{pattern}.{name}": round(float(value), 4) for (pattern, name), value in zip(targets, values)}
@@ -0,0 +1,110 @@
+from config.config import Config
+from led_controllers.audio_input import SyntheticAudioInput
+from led_controllers.output import VirtualStrip
+from led_controllers.render_context import ManualClock, RenderContext
+
+
+class OfflineRenderer:
+    """
+    Rendert ein Muster ohne Hardware und ohne Warten, also so schnell wie möglich.
+
+    Die Uhr wird nach jedem Frame um die Zeit weitergestellt, die der LED-Manager
+    im Betrieb warten würde (feste Pause + frame_delay des Musters), oder um 1/fps.
+    Audio-Muster erhalten synthetisches Audio. Bei gleichem Muster, gleicher
+    Farbe, LED-Anzahl und seed sind die Frames bitgenau gleich.
+
+    Die Muster lesen ihre Einstellungen aus Config; der Renderer setzt diese für
+    jeden Frame und stellt sie danach wieder her. Er darf daher nicht parallel zum
+    laufenden LED-Manager im selben Prozess verwendet werden.
+    """
+
+    def __init__(self, pattern, led_count=None, color=None, seed=0, fps=None, start_time=0.0):
+        """
+        :param pattern: Name eines Musters aus Config.AUDIO_PATTERNS oder Config.STATIC_PATTERNS
+        :param led_count: LEDs pro Streifen (Standard: Config.LED_PER_STRIP)
+        :param color: Farbe (Standard: Config.LED_COLOR)
+        :param seed: Startwert für Zufall und synthetisches Audio
+        :param fps: Feste Bildrate für die Uhr (Standard: Taktung wie im LED-Manager)
+        :param start_time: Startwert der Uhr in Sekunden
+        :raises ValueError: Bei unbekanntem Muster oder ungültigen Werten
+        """
+        if pattern in Config.AUDIO_PATTERNS:
+            self.kind = 'audio'
+        elif pattern in Config.STATIC_PATTERNS:
+            self.kind = 'static'
+        else:
+            raise ValueError(f"Unbekanntes Muster: {pattern}")
+        if fps is not None and fps <= 0:
+            raise ValueError("fps muss größer als 0 sein")
+
+        self.pattern = pattern
+        self.led_count = led_count or Config.LED_PER_STRIP
+        self.color = color or Config.LED_COLOR
+        self.seed = seed
+        self.fps = fps
+        self.clock = ManualClock(start_time)
+        self.context = RenderContext(self.clock, seed)
+        self.strips = (VirtualStrip(self.led_count), VirtualStrip(self.led_count))
+
+        with self._config():
+            if self.kind == 'audio':
+                # Import erst hier, da numpy nur für Audio-Muster benötigt wird
+                from led_controllers.audio_visualizer import AudioVisualizer
+                self.visualizer = AudioVisualizer(
+                    strips=self.strips,
+                    audio_input=SyntheticAudioInput(seed=seed),
+                    context=self.context
+                )
+            else:
+                from led_controllers.pattern_visualizer import PatternVisualizer
+                self.visualizer = PatternVisualizer(strips=self.strips, context=self.context)
+
+    def _config(self):
+        overrides = {'LED_PER_STRIP': self.led_count, 'LED_COLOR': self.color}
+        overrides['AUDIO_PATTERN' if self.kind == 'audio' else 'STATIC_PATTERN'] = self.pattern
+        return _ConfigOverride(overrides)
+
+    def render_frame(self):
+        """
+        Berechnet den nächsten Frame und stellt die Uhr weiter.
+
+        :return: Tupel (Zeitpunkt, Pixel Streifen 1, Pixel Streifen 2) mit Pixeln als 0xWWRRGGBB
+        """
+        timestamp = self.clock.now()
+        with self._config():
+            self.visualizer.update(self.context)
+        if self.fps:
+            self.clock.advance(1.0 / self.fps)
+        else:
+            self.clock.advance(Config.FRAME_PAUSE + self.visualizer.frame_delay)
+        return timestamp, self.strips[0].getPixels(), self.strips[1].getPixels()
+
+    def frames(self, count):
+        """Erzeugt count Frames nacheinander (siehe render_frame())"""
+        for _ in range(count):
+            yield self.render_frame()
+
+    def close(self):
+        if self.kind == 'audio':
+            self.visualizer.stop_audio_stream()
+        else:
+            self.visualizer.states.release()
+
+
+class _ConfigOverride:
+    """Setzt Config-Attribute vorübergehend und stellt sie danach wieder her"""
+
+    def __init__(self, overrides):
+        self.overrides = overrides
+        self.saved = {}
+
+    def __enter__(self):
+        for name, value in self.overrides.items():
+            self.saved[name] = getattr(Config, name)
+            setattr(Config, name, value)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for name, value in self.saved.items():
+            setattr(Config, name, value)
+        return False
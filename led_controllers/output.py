@@ -0,0 +1,153 @@
+try:
+    from rpi_ws281x import PixelStrip, Color
+except ImportError:
+    # Ohne rpi_ws281x (z.B. auf dem Entwicklungsrechner) nur virtuelle Streifen möglich
+    PixelStrip = None
+
+    def Color(red, green, blue, white=0):
+        """Farbwert im selben Format wie rpi_ws281x.Color (0xWWRRGGBB)"""
+        return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+class VirtualStrip:
+    """
+    LED-Streifen ohne Hardware mit derselben Schnittstelle wie rpi_ws281x.PixelStrip.
+
+    Die Pixelwerte werden nur im Speicher gehalten. Wie bei rpi_ws281x werden
+    Zugriffe außerhalb des Streifens ignoriert.
+    """
+
+    def __init__(self, num, brightness=255, on_show=None):
+        """
+        :param num: Anzahl der LEDs
+        :param brightness: Helligkeit (0-255)
+        :param on_show: Funktion, die bei jedem show() mit dem Streifen aufgerufen wird (optional)
+        """
+        self._pixels = [0] * num
+        self._brightness = brightness
+        self.on_show = on_show
+        self.show_count = 0
+
+    def begin(self):
+        pass
+
+    def show(self):
+        self.show_count += 1
+        if self.on_show is not None:
+            self.on_show(self)
+
+    def numPixels(self):
+        return len(self._pixels)
+
+    def setPixelColor(self, n, color):
+        if 0 <= n < len(self._pixels):
+            self._pixels[n] = color
+
+    def setPixelColorRGB(self, n, red, green, blue, white=0):
+        self.setPixelColor(n, Color(red, green, blue, white))
+
+    def getPixelColor(self, n):
+        return self._pixels[n]
+
+    def getPixels(self):
+        """Kopie aller Pixelwerte (0xWWRRGGBB)"""
+        return list(self._pixels)
+
+    def setBrightness(self, brightness):
+        self._brightness = brightness
+
+    def getBrightness(self):
+        return self._brightness
+
+
+class SegmentStrip:
+    """
+    Ausschnitt eines LED-Streifens mit der Schnittstelle von rpi_ws281x.PixelStrip.
+
+    LED n des Ausschnitts ist LED start + n des Streifens; Zugriffe außerhalb
+    des Ausschnitts werden ignoriert. show() gibt nichts aus: Der Zonen-Scheduler
+    (utils/zones.py) gibt die Streifen einmal pro Takt für alle Zonen gemeinsam aus.
+    """
+
+    def __init__(self, strip, start, length):
+        """
+        :param strip: Zugrundeliegender Streifen
+        :param start: Index der ersten LED im Streifen
+        :param length: Anzahl der LEDs
+        """
+        self.strip = strip
+        self.start = start
+        self.length = length
+
+    def begin(self):
+        pass
+
+    def show(self):
+        pass
+
+    def numPixels(self):
+        return self.length
+
+    def setPixelColor(self, n, color):
+        if 0 <= n < self.length:
+            self.strip.setPixelColor(self.start + n, color)
+
+    def setPixelColorRGB(self, n, red, green, blue, white=0):
+        self.setPixelColor(n, Color(red, green, blue, white))
+
+    def getPixelColor(self, n):
+        return self.strip.getPixelColor(self.start + n)
+
+    def getPixels(self):
+        """Kopie der Pixelwerte des Ausschnitts (0xWWRRGGBB)"""
+        return [self.strip.getPixelColor(self.start + n) for n in range(self.length)]
+
+    def setBrightness(self, brightness):
+        # Die Helligkeit gilt für den ganzen Streifen (Config.LED_BRIGHTNESS)
+        pass
+
+    def getBrightness(self):
+        return self.strip.getBrightness()
+
+
+def create_strips(config):
+    """
+    Erzeugt und startet die beiden LED-Streifen gemäß config.LED_OUTPUT.
+
+    :param config: Konfiguration (Config oder kompatibles Objekt)
+    :return: Tupel (strip_one, strip_two)
+    :raises ImportError: Wenn echte Streifen gewünscht sind, rpi_ws281x aber fehlt
+    """
+    if config.LED_OUTPUT == 'virtual':
+        return (
+            VirtualStrip(config.LED_PER_STRIP, config.LED_BRIGHTNESS),
+            VirtualStrip(config.LED_PER_STRIP, config.LED_BRIGHTNESS),
+        )
+
+    if PixelStrip is None:
+        raise ImportError("rpi_ws281x ist nicht installiert - ohne Raspberry Pi LED_OUTPUT = 'virtual' verwenden")
+
+    strip_one = PixelStrip(
+        config.LED_PER_STRIP,
+        config.LED_PIN_ONE,
+        config.LED_FREQ_HZ,
+        config.LED_DMA_ONE,
+        config.LED_INVERT,
+        config.LED_BRIGHTNESS,
+        config.LED_CHANNEL_ONE
+    )
+
+    strip_two = PixelStrip(
+        config.LED_PER_STRIP,
+        config.LED_PIN_TWO,
+        config.LED_FREQ_HZ,
+        config.LED_DMA_TWO,
+        config.LED_INVERT,
+        config.LED_BRIGHTNESS,
+        config.LED_CHANNEL_TWO
+    )
+
+    # Starte LED-Streifen
+    strip_one.begin()
+    strip_two.begin()
+    return strip_one, strip_two
@@ -0,0 +1,363 @@
+import json
+import os
+import re
+import threading
+from led_controllers.output import Color
+from config.config import Config
+
+
+# Anzahl der Einträge pro Farbtabelle; Positionen 0.0 - 1.0 werden auf 0 - 255 abgebildet
+LUT_SIZE = 256
+
+_HEX_PATTERN = re.compile(r'^#?([0-9a-f]{3}|[0-9a-f]{6})$')
+_NAME_PATTERN = re.compile(r'^[a-z0-9_-]{1,32}$')
+
+
+def parse_hex(value):
+    """
+    Wandelt eine Hex-Farbe ('#ff8800', 'ff8800' oder '#f80') in (r, g, b) um.
+
+    :raises ValueError: Wenn value keine gültige Hex-Farbe ist
+    """
+    match = _HEX_PATTERN.match(value.strip().lower()) if isinstance(value, str) else None
+    if match is None:
+        raise ValueError(f"Ungültige Hex-Farbe: {value}")
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = "".join(d * 2 for d in digits)
+    return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16)
+
+
+def format_hex(rgb):
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+def _rainbow_rgb(position):
+    """Regenbogen in 6 Farbbereichen (wie bisher in den Mustern berechnet)"""
+    position = position * 6
+    if position < 1:
+        return 255, int(position * 255), 0
+    elif position < 2:
+        return int((2 - position) * 255), 255, 0
+    elif position < 3:
+        return 0, 255, int((position - 2) * 255)
+    elif position < 4:
+        return 0, int((4 - position) * 255), 255
+    elif position < 5:
+        return int((position - 4) * 255), 0, 255
+    else:
+        return 255, 0, int((6 - position) * 255)
+
+
+class Palette:
+    """
+    Farbpalette, einmalig in eine Tabelle mit LUT_SIZE RGB-Einträgen übersetzt.
+    Muster wählen Farben über den Index statt über Verzweigungen pro Pixel.
+
+    Einfarbige Paletten (solid) liefern überall dieselbe Farbe; die Muster
+    verwenden dann ihre Helligkeitsverläufe auf dieser Grundfarbe. Verläufe
+    (gradient) werden wie früher der Regenbogen über die Position abgetastet.
+    """
+
+    def __init__(self, name, rgb, label=None, stops=None, builtin=False):
+        """
+        :param name: Name, unter dem die Palette ausgewählt wird
+        :param rgb: LUT_SIZE Einträge (r, g, b)
+        :param label: Anzeigename (Standard: name)
+        :param stops: Stützstellen [(Position, (r, g, b)), ...] für die API (optional)
+        :param builtin: Eingebaute Palette (kann nicht überschrieben werden)
+        """
+        if len(rgb) != LUT_SIZE:
+            raise ValueError(f"Eine Palette benötigt genau {LUT_SIZE} Einträge")
+        self.name = name
+        self.label = label or name
+        self.rgb = tuple(tuple(entry) for entry in rgb)
+        self.lut = tuple(Color(r, g, b) for r, g, b in self.rgb)
+        self.stops = stops if stops is not None else [(0.0, self.rgb[0])]
+        self.builtin = builtin
+        self.gradient = len(set(self.rgb)) > 1
+        # Grundfarbe für einfarbige Muster
+        self.color = self.lut[0]
+        self._array = None
+
+    @classmethod
+    def solid(cls, name, rgb, label=None, builtin=False):
+        """Einfarbige Palette"""
+        return cls(name, [tuple(rgb)] * LUT_SIZE, label, [(0.0, tuple(rgb))], builtin)
+
+    @classmethod
+    def from_stops(cls, name, stops, label=None, builtin=False):
+        """
+        Verlauf mit linearer Interpolation zwischen den Stützstellen.
+
+        :param stops: [(Position 0.0 - 1.0, (r, g, b)), ...], aufsteigend sortiert
+        :raises ValueError: Bei leeren, unsortierten oder ungültigen Stützstellen
+        """
+        if not stops:
+            raise ValueError("Mindestens eine Farbe erforderlich")
+        positions = [position for position, _ in stops]
+        if positions != sorted(positions) or positions[0] < 0 or positions[-1] > 1:
+            raise ValueError("Positionen müssen aufsteigend zwischen 0 und 1 liegen")
+        if len(stops) == 1:
+            return cls.solid(name, stops[0][1], label, builtin)
+
+        rgb = []
+        segment = 0
+        for i in range(LUT_SIZE):
+            position = i / (LUT_SIZE - 1)
+            while segment < len(stops) - 2 and position > stops[segment + 1][0]:
+                segment += 1
+            (start, color_a), (end, color_b) = stops[segment], stops[segment + 1]
+            t = 0.0 if end <= start else min(1.0, max(0.0, (position - start) / (end - start)))
+            rgb.append(tuple(int(a + (b - a) * t + 0.5) for a, b in zip(color_a, color_b)))
+        return cls(name, rgb, label, list(stops), builtin)
+
+    def rgb_at(self, position):
+        """
+        (r, g, b) an einer Position des Verlaufs (bei einfarbigen Paletten überall gleich).
+
+        :param position: 0.0 - 1.0 (Werte außerhalb werden umgebrochen)
+        """
+        return self.rgb[int(position * LUT_SIZE) % LUT_SIZE]
+
+    def sample(self, position, intensity=255):
+        """
+        Farbe an einer Position des Verlaufs.
+
+        :param position: 0.0 - 1.0 (Werte außerhalb werden umgebrochen)
+        :param intensity: Helligkeit 0 - 255
+        :return: Farbwert wie Color()
+        """
+        index = int(position * LUT_SIZE) % LUT_SIZE
+        if intensity >= 255:
+            return self.lut[index]
+        r, g, b = self.rgb[index]
+        return Color(int(r * intensity / 255), int(g * intensity / 255), int(b * intensity / 255))
+
+    def array(self):
+        """Farbtabelle als NumPy-Array (LUT_SIZE x 3, uint8); numpy wird erst hier geladen"""
+        if self._array is None:
+            import numpy as np
+            self._array = np.array(self.rgb, dtype=np.uint8)
+        return self._array
+
+    def sample_array(self, positions, intensities=255):
+        """
+        Wie sample(), aber für viele Positionen auf einmal (NumPy).
+
+        :param positions: Positionen 0.0 - 1.0
+        :param intensities: Helligkeit 0 - 255 (ein Wert oder einer pro Position)
+        :return: Liste von Farbwerten wie Color()
+        """
+        import numpy as np
+        indices = (np.asarray(positions, dtype=np.float64) * LUT_SIZE).astype(np.int64) % LUT_SIZE
+        rgb = self.array()[indices].astype(np.float64)
+        # Gleiche Rechenreihenfolge wie sample(): erst multiplizieren, dann teilen
+        rgb = (rgb * np.asarray(intensities, dtype=np.float64).reshape(-1, 1) / 255).astype(np.int64)
+        return ((rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]).tolist()
+
+    def to_json(self):
+        return {
+            "name": self.name,
+            "label": self.label,
+            "gradient": self.gradient,
+            "builtin": self.builtin,
+            "stops": [{"position": position, "color": format_hex(rgb)} for position, rgb in self.stops],
+        }
+
+
+def _builtin_palettes():
+    rainbow = Palette('rainbow', [_rainbow_rgb(i / LUT_SIZE) for i in range(LUT_SIZE)], "Regenbogen", builtin=True)
+    # Stützstellen nur für die Anzeige in der API
+    rainbow.stops = [(i / 6, _rainbow_rgb(i / 6)) for i in range(6)] + [(1.0, (255, 0, 0))]
+    palettes = [
+        rainbow,
+        Palette.solid('green', (0, 255, 0), "Grün", builtin=True),
+        Palette.solid('blue', (0, 0, 255), "Blau", builtin=True),
+        Palette.solid('red', (255, 0, 0), "Rot", builtin=True),
+        Palette.solid('purple', (128, 0, 128), "Lila", builtin=True),
+        Palette.solid('yellow', (255, 255, 0), "Gelb", builtin=True),
+        Palette.solid('white', (255, 255, 255), "Weiß", builtin=True),
+        Palette.from_stops('fire', [(0.0, (255, 0, 0)), (0.5, (255, 128, 0)), (1.0, (255, 255, 0))], "Feuer", builtin=True),
+        Palette.from_stops('ocean', [(0.0, (0, 32, 255)), (0.5, (0, 192, 255)), (1.0, (0, 255, 128))], "Ozean", builtin=True),
+        Palette.from_stops('sunset', [(0.0, (255, 64, 0)), (0.5, (255, 0, 128)), (1.0, (96, 0, 255))], "Sonnenuntergang", builtin=True),
+    ]
+    return {palette.name: palette for palette in palettes}
+
+
+class PaletteRegistry:
+    """
+    Alle verfügbaren Paletten: eingebaute, hochgeladene (gespeichert in
+    Config.PALETTE_FILE) und Hex-Farben, die bei Bedarf übersetzt werden.
+    """
+
+    # Höchstzahl hochgeladener Paletten und übersetzter Hex-Farben
+    MAX_USER_PALETTES = 64
+    MAX_HEX_CACHE = 64
+
+    def __init__(self, path=None):
+        self.path = path
+        self._palettes = _builtin_palettes()
+        self._hex_cache = {}
+        self._warned = set()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            path = self.path or Config.PALETTE_FILE
+            if not path or not os.path.exists(path):
+                return
+            try:
+                with open(path) as f:
+                    documents = json.load(f)
+                for document in documents:
+                    palette = self._parse(document)
+                    if palette.name not in self._palettes:
+                        self._palettes[palette.name] = palette
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                print(f"Gespeicherte Paletten konnten nicht geladen werden ({path}): {e}")
+
+    def _save(self):
+        path = self.path or Config.PALETTE_FILE
+        if not path:
+            return
+        documents = [palette.to_json() for palette in self._palettes.values() if not palette.builtin]
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Erst vollständig schreiben, dann ersetzen, damit keine halbe Datei entsteht
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(documents, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Paletten konnten nicht gespeichert werden ({path}): {e}")
+
+    @staticmethod
+    def _parse(document):
+        """
+        Prüft eine Palette aus der API bzw. der gespeicherten Datei.
+
+        Format: {"name": "meer", "label": "Meer", "stops": ["#0020ff", "#00ff80"]}
+        oder mit Positionen: "stops": [{"position": 0, "color": "#0020ff"}, ...]
+        Ohne Positionen werden die Farben gleichmäßig verteilt.
+
+        :raises ValueError: Bei ungültigem Format
+        """
+        if not isinstance(document, dict):
+            raise ValueError("Palette muss als Objekt übergeben werden")
+        name = document.get('name')
+        if not isinstance(name, str) or not _NAME_PATTERN.match(name):
+            raise ValueError("Name muss aus 1-32 Zeichen a-z, 0-9, _ oder - bestehen")
+        if _HEX_PATTERN.match(name):
+            raise ValueError("Name darf keine Hex-Farbe sein")
+        label = document.get('label') or name
+        if not isinstance(label, str) or len(label) > 64:
+            raise ValueError("Ungültiger Anzeigename")
+
+        entries = document.get('stops')
+        if not isinstance(entries, list) or not 1 <= len(entries) <= 16:
+            raise ValueError("stops muss eine Liste mit 1 bis 16 Farben sein")
+        stops = []
+        for index, entry in enumerate(entries):
+            if isinstance(entry, dict):
+                position = entry.get('position')
+                if isinstance(position, bool) or not isinstance(position, (int, float)):
+                    raise ValueError("Jede Position muss eine Zahl zwischen 0 und 1 sein")
+                stops.append((float(position), parse_hex(entry.get('color'))))
+            else:
+                position = index / (len(entries) - 1) if len(entries) > 1 else 0.0
+                stops.append((position, parse_hex(entry)))
+        return Palette.from_stops(name, stops, label)
+
+    def get(self, spec):
+        """
+        Palette zu einem Namen oder einer Hex-Farbe.
+
+        :raises ValueError: Bei unbekanntem Namen bzw. ungültiger Farbe
+        """
+        self._ensure_loaded()
+        key = spec.strip().lower() if isinstance(spec, str) else spec
+        palette = self._palettes.get(key)
+        if palette is not None:
+            return palette
+        palette = self._hex_cache.get(key)
+        if palette is not None:
+            return palette
+        if not isinstance(key, str) or not _HEX_PATTERN.match(key):
+            raise ValueError(f"Unbekannte Farbe oder Palette: {spec}")
+        rgb = parse_hex(key)
+        palette = Palette.solid(format_hex(rgb), rgb)
+        with self._lock:
+            if len(self._hex_cache) >= self.MAX_HEX_CACHE:
+                self._hex_cache.clear()
+            self._hex_cache[key] = palette
+        return palette
+
+    def resolve(self, spec):
+        """
+        Wie get(), aber mit Weiß als Ersatz für unbekannte Angaben (für den Render-Thread).
+        Die Warnung wird pro Angabe nur einmal ausgegeben.
+        """
+        try:
+            return self.get(spec)
+        except ValueError:
+            if spec not in self._warned:
+                self._warned.add(spec)
+                print(f"Unbekannte Farbe oder Palette '{spec}', verwende Weiß")
+            return self._palettes['white']
+
+    def normalize(self, spec):
+        """
+        Prüft eine Farbangabe und gibt sie in der gespeicherten Form zurück
+        (Palettenname oder '#rrggbb').
+
+        :raises ValueError: Bei unbekanntem Namen bzw. ungültiger Farbe
+        """
+        return self.get(spec).name
+
+    def label(self, spec):
+        """Anzeigename einer Farbangabe (unbekannte Angaben unverändert)"""
+        try:
+            return self.get(spec).label
+        except ValueError:
+            return spec
+
+    def to_json(self):
+        """Alle Paletten (ohne übersetzte Hex-Farben) im Format von Palette.to_json()"""
+        self._ensure_loaded()
+        return [palette.to_json() for palette in list(self._palettes.values())]
+
+    def register(self, document):
+        """
+        Fügt eine hochgeladene Palette hinzu oder ersetzt eine hochgeladene
+        Palette gleichen Namens und speichert sie.
+
+        :return: Die übersetzte Palette
+        :raises ValueError: Bei ungültigem Format
+        :raises PaletteConflict: Wenn der Name zu einer eingebauten Palette gehört
+        """
+        self._ensure_loaded()
+        palette = self._parse(document)
+        with self._lock:
+            existing = self._palettes.get(palette.name)
+            if existing is not None and existing.builtin:
+                raise PaletteConflict(f"Eingebaute Palette kann nicht ersetzt werden: {palette.name}")
+            if existing is None and sum(1 for p in self._palettes.values() if not p.builtin) >= self.MAX_USER_PALETTES:
+                raise ValueError(f"Höchstens {self.MAX_USER_PALETTES} eigene Paletten möglich")
+            self._palettes[palette.name] = palette
+            self._save()
+        return palette
+
+
+class PaletteConflict(ValueError):
+    """Eine eingebaute Palette soll überschrieben werden"""
+
+
+# Gemeinsame Registry für Webserver und Render-Thread
+palettes = PaletteRegistry()
@@ -0,0 +1,150 @@
+"""
+Zustand der Animationen statischer Muster (Position, Richtung, Helligkeit je LED).
+
+Jeder Visualizer hält über PatternStates höchstens einen Zustand, den seines
+aktuellen Musters. Er wird beim ersten Frame des Musters angelegt und beim
+Wechsel des Musters oder der LED-Anzahl wieder abgegeben; das neue Muster
+beginnt von vorn. Abgegebene Zustände kommen in einen kleinen Pool und werden
+zurückgesetzt wiederverwendet, sodass viele Zonen (utils/zones.py) beim
+Umschalten keinen neuen Speicher anfordern.
+
+Die Zustände haben __slots__ statt eines Attribut-Dictionarys; die Helligkeit
+je LED liegt als array('B') mit einem Byte pro LED vor. Der belegte Speicher
+aktiver Zustände wird je Muster als Metrik gemeldet.
+"""
+import sys
+from array import array
+from utils.metrics import metrics
+
+
+PATTERN_STATE_BYTES = metrics.gauge(
+    'pivoltmeter_pattern_state_bytes',
+    'Speicher der aktiven Animationszustände je Muster (alle Visualizer und Zonen zusammen)',
+    labelnames=('pattern',)
+)
+PATTERN_STATES = metrics.gauge(
+    'pivoltmeter_pattern_states',
+    'Anzahl aktiver Animationszustände je Muster',
+    labelnames=('pattern',)
+)
+
+# Höchstens so viele abgegebene Zustände je Klasse aufheben (eine pro möglicher Zone)
+POOL_SIZE = 16
+_pool = {}
+
+
+class PulseState:
+    """Umlaufender Puls: Position auf dem Streifen"""
+
+    __slots__ = ('led_count', 'position')
+
+    def __init__(self, led_count):
+        self.reset(led_count)
+
+    def reset(self, led_count):
+        self.led_count = led_count
+        self.position = 0
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self)
+
+
+class BounceState:
+    """Hin- und herlaufender Puls: Position bzw. Abstand zur Mitte und Richtung (1 oder -1)"""
+
+    __slots__ = ('led_count', 'position', 'direction')
+
+    def __init__(self, led_count):
+        self.reset(led_count)
+
+    def reset(self, led_count):
+        self.led_count = led_count
+        self.position = 0
+        self.direction = 1
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self)
+
+
+class MatrixState:
+    """Matrix-Regen: aktuelle Helligkeit (0-255) je LED"""
+
+    __slots__ = ('led_count', 'intensity')
+
+    def __init__(self, led_count):
+        self.intensity = None
+        self.reset(led_count)
+
+    def reset(self, led_count):
+        self.led_count = led_count
+        if self.intensity is not None and len(self.intensity) == led_count:
+            self.intensity[:] = array('B', bytes(led_count))
+        else:
+            self.intensity = array('B', bytes(led_count))
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.intensity)
+
+
+class PatternStates:
+    """
+    Zustand des aktuellen Musters eines Visualizers.
+
+    Nur im Render-Thread verwenden (wie den Visualizer selbst).
+    """
+
+    def __init__(self):
+        self.pattern = None
+        self.state = None
+        self._nbytes = 0
+
+    def activate(self, pattern, state_class, led_count):
+        """
+        Liefert den Zustand für pattern und legt ihn bei Bedarf an.
+
+        :param pattern: Name des Musters
+        :param state_class: Klasse des Zustands (None = Muster ohne Zustand)
+        :param led_count: Anzahl der LEDs, für die das Muster rendert
+        :return: Zustand oder None
+        """
+        state = self.state
+        if state is not None and self.pattern == pattern and state.led_count == led_count:
+            return state
+        self.release()
+        if state_class is None:
+            return None
+
+        pooled = _pool.get(state_class)
+        if pooled:
+            state = pooled.pop()
+            state.reset(led_count)
+        else:
+            state = state_class(led_count)
+        self.pattern = pattern
+        self.state = state
+        self._nbytes = state.nbytes
+        PATTERN_STATE_BYTES.labels(pattern=pattern).inc(self._nbytes)
+        PATTERN_STATES.labels(pattern=pattern).inc()
+        return state
+
+    def release(self):
+        """Gibt den aktuellen Zustand ab (beim Musterwechsel oder wenn der Visualizer nicht mehr rendert)"""
+        state = self.state
+        if state is None:
+            return
+        PATTERN_STATE_BYTES.labels(pattern=self.pattern).dec(self._nbytes)
+        PATTERN_STATES.labels(pattern=self.pattern).dec()
+        pooled = _pool.setdefault(type(state), [])
+        if len(pooled) < POOL_SIZE:
+            pooled.append(state)
+        self.pattern = None
+        self.state = None
+        self._nbytes = 0
+
+    @property
+    def nbytes(self):
+        """Speicher des aktuellen Zustands in Bytes (0 ohne Zustand)"""
+        return self._nbytes
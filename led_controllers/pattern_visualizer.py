@@ -2,39 +2,72 @@ import colorsys
 import time
 import random
 import math
-from rpi_ws281x import Color
+from led_controllers.output import Color
 from config.config import Config
-from led_controllers.base_controller import BaseLEDController
+from led_controllers.base_controller import BaseLEDController, PATTERN_RENDER_SECONDS
+from led_controllers.pattern_state import PatternStates, PulseState, BounceState, MatrixState
+
+
+# Animationszustand je Muster (Muster ohne Eintrag haben keinen Zustand)
+STATE_CLASSES = {
+    'static_pattern_01': PulseState,
+    'static_pattern_02': BounceState,
+    'static_pattern_03': BounceState,
+    'static_pattern_04': MatrixState,
+}
 
 class PatternVisualizer(BaseLEDController):
-    def __init__(self):
-        """Initialisiert den Pattern-Visualizer"""
-        super().__init__()
+    def __init__(self, strips=None, context=None):
+        """
+        Initialisiert den Pattern-Visualizer
+        
+        :param strips: Mitzubenutzende LED-Streifen eines anderen Controllers (optional)
+        :param context: RenderContext für update() (Standard: Systemzeit, nicht reproduzierbarer Zufall)
+        """
+        super().__init__(strips=strips, context=context)
         
         # Interne Zustände für Animationen
         self._animation_step = 0
-        self._last_update_time = time.time()
+        self._last_update_time = self.context.now()
+        # Zustand des aktuellen Musters, wird beim Musterwechsel abgegeben (siehe led_controllers/pattern_state.py)
+        self.states = PatternStates()
     
-    def update(self):
+    def update(self, ctx=None):
         """
         Aktualisiert die LED-Anzeige basierend auf dem in der Config definierten Muster.
         Diese Methode wird regelmäßig vom LED-Manager aufgerufen.
+        
+        :param ctx: RenderContext mit Uhr und Zufallsgenerator (Standard: self.context)
         """
-        # Bestimme das aktuelle Muster aus der Config
-        pattern = Config.STATIC_PATTERN
+        ctx = ctx or self.context
+        
+        # Bestimme das aktuelle Muster aus der Config bzw. der Zone
+        pattern = self.pattern
+        
+        self.frame_delay = 0
+        self.last_show_seconds = 0.0
+        start = time.perf_counter()
+        state = self.states.activate(pattern, STATE_CLASSES.get(pattern), self.led_count)
         
         # Aktualisiere Animation basierend auf dem Muster
         if pattern == 'static_pattern_01':
-            self._visualize_simple_pulsing()
+            self._visualize_simple_pulsing(ctx, state)
         elif pattern == 'static_pattern_02':
-            self._visualize_ping_pong()
+            self._visualize_ping_pong(ctx, state)
         elif pattern == 'static_pattern_03':
-            self._visualize_dual_pulse()
+            self._visualize_dual_pulse(ctx, state)
         elif pattern == 'static_pattern_04':
-            self._visualize_matrix_rain()
+            self._visualize_matrix_rain(ctx, state)
         else:
             # Fallback: Einfach die gewählte Farbe anzeigen
-            self._visualize_solid_color()
+            self._visualize_solid_color(ctx)
+        
+        PATTERN_RENDER_SECONDS.labels(pattern=pattern).observe(time.perf_counter() - start - self.last_show_seconds)
+    
+    @property
+    def pattern(self):
+        """Aktuelles Muster (Config.STATIC_PATTERN bzw. Muster der Zone)"""
+        return Config.STATIC_PATTERN if self.zone is None else self.zone.pattern
     
     def configure_from_config(self):
         """
@@ -53,31 +86,9 @@ class PatternVisualizer(BaseLEDController):
         """
         Bereinigt Ressourcen und bereitet den Controller auf das Beenden vor.
         """
+        self.states.release()
         self.clear_all_leds()
     
-    # Hilfsmethoden für die Musterimplementierung
-    def _get_color_from_config(self):
-        """
-        Gibt die in der Config konfigurierte Farbe zurück.
-        """
-        color_name = Config.LED_COLOR.lower()
-        
-        if color_name == 'rainbow':
-            # Regenbogenfarben werden in den spezifischen Visualisierungen behandelt
-            return Color(255, 255, 255)  # Weiß als Fallback
-        elif color_name == 'red':
-            return Color(255, 0, 0)
-        elif color_name == 'green':
-            return Color(0, 255, 0)
-        elif color_name == 'blue':
-            return Color(0, 0, 255)
-        elif color_name == 'purple':
-            return Color(128, 0, 128)
-        elif color_name == 'yellow':
-            return Color(255, 255, 0)
-        else:
-            return Color(255, 255, 255)  # Weiß als Fallback
-    
     def clear_all_leds(self):
         """
         Schaltet alle LEDs aus - auch die außerhalb des normalen Bereichs
@@ -103,245 +114,177 @@ class PatternVisualizer(BaseLEDController):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
+    
+    def boot_sequence(self):
+        """
+        Start-Animation als Folge einzelner Frames: LEDs werden nacheinander mit
+        zufälligen Farben eingeschaltet und danach wieder ausgeschaltet.
+        
+        Liefert nach jedem Frame die gewünschte Wartezeit in Sekunden, damit der
+        LED-Manager die Sequenz zwischen zwei Frames abbrechen kann.
+        """
+        # Zuerst alle LEDs ausschalten
+        for i in range(Config.LED_PER_STRIP):
+            self.strip_one.setPixelColor(i, Color(0, 0, 0))
+            self.strip_two.setPixelColor(i, Color(0, 0, 0))
+        self.show_strips()
+        yield 0
+        
+        # Schalte LEDs nacheinander mit zufälligen Farben ein
+        for i in range(Config.LED_PER_STRIP):
+            self.strip_one.setPixelColor(i, Color(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
+            self.strip_two.setPixelColor(i, Color(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
+            self.show_strips()
+            yield 0.1
+        
+        # Dann nacheinander wieder ausschalten
+        for i in range(Config.LED_PER_STRIP):
+            self.strip_one.setPixelColor(i, Color(0, 0, 0))
+            self.strip_two.setPixelColor(i, Color(0, 0, 0))
+            self.show_strips()
+            yield 0.1
     
     # Musterimplementierungen - zunächst als Platzhalter
-    def _visualize_solid_color(self):
+    def _visualize_solid_color(self, ctx):
         """
         Zeigt eine Volltonfarbe auf allen LEDs an.
         """
         color = self._get_color_from_config()
         
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, color)
             self.strip_two.setPixelColor(i, color)
         
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
 
-    def _visualize_simple_pulsing(self):
+    def _visualize_simple_pulsing(self, ctx, state):
         """
         Zeigt eine einfache, pulsierende Animation, die sich von links nach rechts bewegt.
-        """
-        # Falls noch nicht vorhanden, initialisiere die Position für die Animation
-        if not hasattr(self, '_pulse_position'):
-            self._pulse_position = 0
         
+        :param state: PulseState mit der Position des Pulses
+        """
         # Alle LEDs zunächst ausschalten
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
         # Bestimme die Position des Pulses
         pulse_width = 3  # Breite des Pulses in LEDs
         
-        # Prüfe, ob Regenbogen-Modus aktiv ist
-        is_rainbow = Config.LED_COLOR.lower() == 'rainbow'
-        
-        if not is_rainbow:
-            # Normaler Farbmodus - hole die Farbe aus der Konfiguration
-            color = self._get_color_from_config()
-            base_r = (color >> 16) & 0xFF
-            base_g = (color >> 8) & 0xFF
-            base_b = color & 0xFF
+        # Farbe je LED aus der Palette (bei Einzelfarben überall gleich)
+        palette = self._palette()
         
         # Für jede LED in der Nähe des Pulses
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             # Berechne den Abstand zum Puls-Zentrum
-            distance = abs(i - self._pulse_position)
+            distance = abs(i - state.position)
             
             # Wenn die LED innerhalb der Pulsbreite liegt
             if distance < pulse_width:
                 # Intensität nimmt mit Abstand vom Zentrum ab
                 intensity = 1.0 - (distance / pulse_width)
                 
-                if is_rainbow:
-                    # Im Regenbogen-Modus: Farbe basierend auf Position im Strip
-                    hue = i / float(Config.LED_PER_STRIP)
-                    if hue < 1/6:
-                        r = 255
-                        g = int(hue * 6 * 255)
-                        b = 0
-                    elif hue < 2/6:
-                        r = int((2/6 - hue) * 6 * 255)
-                        g = 255
-                        b = 0
-                    elif hue < 3/6:
-                        r = 0
-                        g = 255
-                        b = int((hue - 2/6) * 6 * 255)
-                    elif hue < 4/6:
-                        r = 0
-                        g = int((4/6 - hue) * 6 * 255)
-                        b = 255
-                    elif hue < 5/6:
-                        r = int((hue - 4/6) * 6 * 255)
-                        g = 0
-                        b = 255
-                    else:
-                        r = 255
-                        g = 0
-                        b = int((1 - hue) * 6 * 255)
-                    
-                    # Skaliere mit der Intensität
-                    r = int(r * intensity)
-                    g = int(g * intensity)
-                    b = int(b * intensity)
-                else:
-                    # Im normalen Farbmodus: Skaliere die Basisfarbe mit der Intensität
-                    r = int(base_r * intensity)
-                    g = int(base_g * intensity)
-                    b = int(base_b * intensity)
+                # Farbe an der Position im Strip, skaliert mit der Intensität
+                r, g, b = palette.rgb_at(i / float(self.led_count))
+                r = int(r * intensity)
+                g = int(g * intensity)
+                b = int(b * intensity)
                 
                 # Setze die Farbe für beide LED-Streifen
                 self.strip_one.setPixelColor(i, Color(r, g, b))
                 self.strip_two.setPixelColor(i, Color(r, g, b))
         
         # Aktualisiere die LED-Streifen
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
         
         # Bewege den Puls für die nächste Aktualisierung
-        self._pulse_position = (self._pulse_position + 1) % Config.LED_PER_STRIP
+        state.position = (state.position + 1) % self.led_count
         
-        # Kleine Pause für gleichmäßige Animation
-        time.sleep(0.1)
+        # Kleine Pause für gleichmäßige Animation (wartet der LED-Manager ab)
+        self.frame_delay = 0.1 / Config.pattern_param('static_pattern_01', 'speed')
 
-    def _visualize_ping_pong(self):
+    def _visualize_ping_pong(self, ctx, state):
         """
         Zeigt eine pulsierende Animation, die sich hin und her bewegt (Ping-Pong-Effekt).
         Am Ende des LED-Streifens wechselt die Bewegungsrichtung.
-        """
-        # Falls noch nicht vorhanden, initialisiere die Position und Richtung für die Animation
-        if not hasattr(self, '_ping_pong_position'):
-            self._ping_pong_position = 0
-            self._ping_pong_direction = 1  # 1 = vorwärts, -1 = rückwärts
         
+        :param state: BounceState mit Position und Richtung (1 = vorwärts, -1 = rückwärts)
+        """
         # Alle LEDs zunächst ausschalten
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
         # Bestimme die Position des Pulses
         pulse_width = 3  # Breite des Pulses in LEDs
         
-        # Prüfe, ob Regenbogen-Modus aktiv ist
-        is_rainbow = Config.LED_COLOR.lower() == 'rainbow'
-        
-        if not is_rainbow:
-            # Normaler Farbmodus - hole die Farbe aus der Konfiguration
-            color = self._get_color_from_config()
-            base_r = (color >> 16) & 0xFF
-            base_g = (color >> 8) & 0xFF
-            base_b = color & 0xFF
+        # Farbe je LED aus der Palette (bei Einzelfarben überall gleich)
+        palette = self._palette()
         
         # Für jede LED in der Nähe des Pulses
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             # Berechne den Abstand zum Puls-Zentrum
-            distance = abs(i - self._ping_pong_position)
+            distance = abs(i - state.position)
             
             # Wenn die LED innerhalb der Pulsbreite liegt
             if distance < pulse_width:
                 # Intensität nimmt mit Abstand vom Zentrum ab
                 intensity = 1.0 - (distance / pulse_width)
                 
-                if is_rainbow:
-                    # Im Regenbogen-Modus: Farbe basierend auf Position im Strip
-                    hue = i / float(Config.LED_PER_STRIP)
-                    if hue < 1/6:
-                        r = 255
-                        g = int(hue * 6 * 255)
-                        b = 0
-                    elif hue < 2/6:
-                        r = int((2/6 - hue) * 6 * 255)
-                        g = 255
-                        b = 0
-                    elif hue < 3/6:
-                        r = 0
-                        g = 255
-                        b = int((hue - 2/6) * 6 * 255)
-                    elif hue < 4/6:
-                        r = 0
-                        g = int((4/6 - hue) * 6 * 255)
-                        b = 255
-                    elif hue < 5/6:
-                        r = int((hue - 4/6) * 6 * 255)
-                        g = 0
-                        b = 255
-                    else:
-                        r = 255
-                        g = 0
-                        b = int((1 - hue) * 6 * 255)
-                    
-                    # Skaliere mit der Intensität
-                    r = int(r * intensity)
-                    g = int(g * intensity)
-                    b = int(b * intensity)
-                else:
-                    # Im normalen Farbmodus: Skaliere die Basisfarbe mit der Intensität
-                    r = int(base_r * intensity)
-                    g = int(base_g * intensity)
-                    b = int(base_b * intensity)
+                # Farbe an der Position im Strip, skaliert mit der Intensität
+                r, g, b = palette.rgb_at(i / float(self.led_count))
+                r = int(r * intensity)
+                g = int(g * intensity)
+                b = int(b * intensity)
                 
                 # Setze die Farbe für beide LED-Streifen
                 self.strip_one.setPixelColor(i, Color(r, g, b))
                 self.strip_two.setPixelColor(i, Color(r, g, b))
         
         # Aktualisiere die LED-Streifen
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
         
         # Bewege den Puls für die nächste Aktualisierung
-        self._ping_pong_position += self._ping_pong_direction
+        state.position += state.direction
         
         # Richtungswechsel am Anfang oder Ende des Streifens
-        if self._ping_pong_position >= Config.LED_PER_STRIP - 1:
-            self._ping_pong_direction = -1  # Wechsel zur Rückwärtsbewegung
-        elif self._ping_pong_position <= 0:
-            self._ping_pong_direction = 1   # Wechsel zur Vorwärtsbewegung
+        if state.position >= self.led_count - 1:
+            state.direction = -1  # Wechsel zur Rückwärtsbewegung
+        elif state.position <= 0:
+            state.direction = 1   # Wechsel zur Vorwärtsbewegung
         
-        # Kleine Pause für gleichmäßige Animation
-        time.sleep(0.1)
+        # Kleine Pause für gleichmäßige Animation (wartet der LED-Manager ab)
+        self.frame_delay = 0.1 / Config.pattern_param('static_pattern_02', 'speed')
 
-    def _visualize_dual_pulse(self):
+    def _visualize_dual_pulse(self, ctx, state):
         """
         Zeigt eine Animation mit zwei Lichtpulsen, die von der Mitte aus starten und 
         sich in entgegengesetzte Richtungen bewegen. Wenn sie die Enden erreichen, 
         kehren sie zur Mitte zurück und treffen sich dort wieder.
-        """
-        # Falls noch nicht vorhanden, initialisiere die Position und Richtung für die Animation
-        if not hasattr(self, '_dual_pulse_offset'):
-            self._dual_pulse_offset = 0
-            self._dual_pulse_direction = 1  # 1 = nach außen, -1 = zur Mitte
         
+        :param state: BounceState mit dem Abstand der Pulse zur Mitte und der Richtung (1 = nach außen, -1 = zur Mitte)
+        """
         # Alle LEDs zunächst ausschalten
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             self.strip_one.setPixelColor(i, Color(0, 0, 0))
             self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
         # Mittelpunkt des LED-Streifens bestimmen
-        center = Config.LED_PER_STRIP // 2
+        center = self.led_count // 2
         
         # Bestimme die Position der beiden Pulse (links und rechts vom Zentrum)
-        left_pulse_pos = center - self._dual_pulse_offset
-        right_pulse_pos = center + self._dual_pulse_offset
+        left_pulse_pos = center - state.position
+        right_pulse_pos = center + state.position
         
         # Breite des Pulses in LEDs
         pulse_width = 3
         
-        # Prüfe, ob Regenbogen-Modus aktiv ist
-        is_rainbow = Config.LED_COLOR.lower() == 'rainbow'
-        
-        if not is_rainbow:
-            # Normaler Farbmodus - hole die Farbe aus der Konfiguration
-            color = self._get_color_from_config()
-            base_r = (color >> 16) & 0xFF
-            base_g = (color >> 8) & 0xFF
-            base_b = color & 0xFF
+        # Farbe je LED aus der Palette (bei Einzelfarben überall gleich)
+        palette = self._palette()
         
         # Für jede LED im LED-Streifen
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             # Berechne den Abstand zu beiden Pulsen
             left_distance = abs(i - left_pulse_pos)
             right_distance = abs(i - right_pulse_pos)
@@ -354,119 +297,64 @@ class PatternVisualizer(BaseLEDController):
                 # Intensität nimmt mit Abstand vom Puls-Zentrum ab
                 intensity = 1.0 - (distance / pulse_width)
                 
-                if is_rainbow:
-                    # Im Regenbogen-Modus: Farbe basierend auf Position im Strip
-                    hue = i / float(Config.LED_PER_STRIP)
-                    # Umwandlung HSV zu RGB
-                    if hue < 1/6:
-                        r, g, b = 255, int(hue * 6 * 255), 0
-                    elif hue < 2/6:
-                        r, g, b = int((2/6 - hue) * 6 * 255), 255, 0
-                    elif hue < 3/6:
-                        r, g, b = 0, 255, int((hue - 2/6) * 6 * 255)
-                    elif hue < 4/6:
-                        r, g, b = 0, int((4/6 - hue) * 6 * 255), 255
-                    elif hue < 5/6:
-                        r, g, b = int((hue - 4/6) * 6 * 255), 0, 255
-                    else:
-                        r, g, b = 255, 0, int((1 - hue) * 6 * 255)
-                    
-                    # Skaliere mit der Intensität
-                    r = int(r * intensity)
-                    g = int(g * intensity)
-                    b = int(b * intensity)
-                else:
-                    # Im normalen Farbmodus: Skaliere die Basisfarbe mit der Intensität
-                    r = int(base_r * intensity)
-                    g = int(base_g * intensity)
-                    b = int(base_b * intensity)
+                # Farbe an der Position im Strip, skaliert mit der Intensität
+                r, g, b = palette.rgb_at(i / float(self.led_count))
+                r = int(r * intensity)
+                g = int(g * intensity)
+                b = int(b * intensity)
                 
                 # Setze die Farbe für beide LED-Streifen
                 self.strip_one.setPixelColor(i, Color(r, g, b))
                 self.strip_two.setPixelColor(i, Color(r, g, b))
         
         # Aktualisiere die LED-Streifen
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
         
         # Bewege die Pulse für die nächste Aktualisierung
-        self._dual_pulse_offset += self._dual_pulse_direction
+        state.position += state.direction
         
         # Richtungswechsel an den Enden oder wenn sich die Pulse in der Mitte treffen
         max_offset = center  # Maximaler Abstand vom Zentrum
         
-        if self._dual_pulse_offset >= max_offset:
+        if state.position >= max_offset:
             # Die Pulse haben die Enden erreicht und bewegen sich nun zur Mitte
-            self._dual_pulse_direction = -1
-        elif self._dual_pulse_offset <= 0:
+            state.direction = -1
+        elif state.position <= 0:
             # Die Pulse haben sich in der Mitte getroffen und bewegen sich nun nach außen
-            self._dual_pulse_direction = 1
+            state.direction = 1
         
-        # Kleine Pause für gleichmäßige Animation
-        time.sleep(0.1)
+        # Kleine Pause für gleichmäßige Animation (wartet der LED-Manager ab)
+        self.frame_delay = 0.1 / Config.pattern_param('static_pattern_03', 'speed')
     
-    def _visualize_matrix_rain(self):
+    def _visualize_matrix_rain(self, ctx, state):
         """
         Erzeugt einen Matrix-ähnlichen Regen-Effekt mit zufällig aufleuchtenden LEDs, 
         die langsam verblassen und so den Eindruck von herabfallenden Datenströmen erzeugen.
+        
+        :param state: MatrixState mit der aktuellen Intensität (0-255) jeder LED
         """
-        # Falls noch nicht vorhanden, initialisiere die Matrix-Datenstruktur
-        if not hasattr(self, '_matrix_data'):
-            # Für jede LED speichern wir die aktuelle Intensität (0-255)
-            self._matrix_data = [0] * Config.LED_PER_STRIP
-            self._matrix_drop_chance = 0.1  # Wahrscheinlichkeit für einen neuen "Tropfen"
-        
-        # Basisfarbe für den Matrix-Effekt
-        base_color = Config.LED_COLOR.lower()
-        
-        # Bestimme die Farbwerte basierend auf der Konfiguration
-        if base_color == 'rainbow':
-            # Regenbogen-Modus - jede LED bekommt eine andere Farbe
-            colors = []
-            for i in range(Config.LED_PER_STRIP):
-                hue = i / float(Config.LED_PER_STRIP)
-                # Umwandlung HSV zu RGB
-                if hue < 1/6:
-                    r, g, b = 255, int(hue * 6 * 255), 0
-                elif hue < 2/6:
-                    r, g, b = int((2/6 - hue) * 6 * 255), 255, 0
-                elif hue < 3/6:
-                    r, g, b = 0, 255, int((hue - 2/6) * 6 * 255)
-                elif hue < 4/6:
-                    r, g, b = 0, int((4/6 - hue) * 6 * 255), 255
-                elif hue < 5/6:
-                    r, g, b = int((hue - 4/6) * 6 * 255), 0, 255
-                else:
-                    r, g, b = 255, 0, int((1 - hue) * 6 * 255)
-                colors.append((r, g, b))
-        elif base_color == 'green':
-            # Klassisches Matrix-Grün für alle LEDs
-            r, g, b = 0, 255, 0
-        else:
-            # Verwende die konfigurierte Farbe
-            color = self._get_color_from_config()
-            r = (color >> 16) & 0xFF
-            g = (color >> 8) & 0xFF
-            b = color & 0xFF
+        matrix_data = state.intensity
+        
+        # Wahrscheinlichkeit für einen neuen "Tropfen" (Parameter density)
+        drop_chance = Config.pattern_param('static_pattern_04', 'density')
+        
+        # Farbe je LED aus der Palette (bei Einzelfarben überall gleich)
+        palette = self._palette()
+        colors = [palette.rgb_at(i / float(self.led_count)) for i in range(self.led_count)]
         
         # Neue "Regentropfen" mit einer bestimmten Wahrscheinlichkeit hinzufügen
-        for i in range(Config.LED_PER_STRIP):
+        for i in range(self.led_count):
             # Zufällig neue LEDs aktivieren
-            if self._matrix_data[i] == 0 and random.random() < self._matrix_drop_chance:
-                self._matrix_data[i] = 255  # Neue LED mit maximaler Helligkeit
+            if matrix_data[i] == 0 and ctx.random.random() < drop_chance:
+                matrix_data[i] = 255  # Neue LED mit maximaler Helligkeit
         
         # LEDs aktualisieren
-        for i in range(Config.LED_PER_STRIP):
-            intensity = self._matrix_data[i]
+        for i in range(self.led_count):
+            intensity = matrix_data[i]
             
             if intensity > 0:
                 # Bestimme die Farbe für diese LED
-                if base_color == 'rainbow':
-                    # Im Regenbogen-Modus: Jede LED hat ihre eigene Farbe
-                    base_r, base_g, base_b = colors[i]
-                else:
-                    # Sonst: Standardfarbe für alle LEDs
-                    base_r, base_g, base_b = r, g, b
+                base_r, base_g, base_b = colors[i]
                 
                 # Skaliere die Grundfarbe mit der aktuellen Intensität
                 color_r = int(base_r * intensity / 255)
@@ -478,15 +366,14 @@ class PatternVisualizer(BaseLEDController):
                 self.strip_two.setPixelColor(i, Color(color_r, color_g, color_b))
                 
                 # Verringere die Intensität für den nächsten Frame (Verblassen)
-                self._matrix_data[i] = max(0, intensity - random.randint(5, 15))
+                matrix_data[i] = max(0, intensity - ctx.random.randint(5, 15))
             else:
                 # LED ist aus
                 self.strip_one.setPixelColor(i, Color(0, 0, 0))
                 self.strip_two.setPixelColor(i, Color(0, 0, 0))
         
         # Aktualisiere die LED-Streifen
-        self.strip_one.show()
-        self.strip_two.show()
+        self.show_strips()
         
-        # Kleine Pause für die Animation
-        time.sleep(0.05)
\ No newline at end of file
+        # Kleine Pause für die Animation (wartet der LED-Manager ab)
+        self.frame_delay = 0.05 / Config.pattern_param('static_pattern_04', 'speed')
\ No newline at end of file
@@ -0,0 +1,49 @@
+import random
+import time
+
+
+class SystemClock:
+    """Echte Uhrzeit (Standard im Betrieb)"""
+
+    def now(self):
+        return time.time()
+
+
+class ManualClock:
+    """
+    Uhr, die nur explizit weitergestellt wird. Damit lassen sich Frames schneller
+    als in Echtzeit und reproduzierbar berechnen.
+    """
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+
+    def now(self):
+        return self._now
+
+    def advance(self, seconds):
+        """Stellt die Uhr um seconds Sekunden weiter"""
+        self._now += seconds
+
+
+class RenderContext:
+    """
+    Zeitquelle und Zufallsgenerator für das Rendern eines Frames.
+
+    Muster verwenden ctx.now() statt time.time() und ctx.random statt des
+    random-Moduls. Mit ManualClock und festem seed ist die Ausgabe für gleiche
+    Eingaben bitgenau reproduzierbar.
+    """
+
+    def __init__(self, clock=None, seed=None):
+        """
+        :param clock: Uhr mit now() in Sekunden (Standard: SystemClock)
+        :param seed: Startwert für den Zufallsgenerator (None = nicht reproduzierbar)
+        """
+        self.clock = clock or SystemClock()
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    def now(self):
+        """Aktuelle Zeit der Uhr in Sekunden"""
+        return self.clock.now()
@@ -0,0 +1,176 @@
+"""
+Frame-Puffer im Shared Memory für lokale Programme (z. B. eigene DSP oder Video-Umsetzer).
+
+Der LED-Manager legt mit Config.SHARED_FRAMES_NAME ein Segment unter
+/dev/shm/<name> an (Rechte Config.SHARED_FRAMES_MODE, Gruppe
+Config.SHARED_FRAMES_GROUP). Aufbau, alle Werte little-endian:
+
+    Offset  Typ      Feld
+    0       4s       magic        b'PVLF'
+    4       uint16   version      1
+    6       uint16   header_size  64
+    8       uint32   led_count    LEDs pro Streifen
+    12      uint32   frame_bytes  2 * led_count * 3
+    16      uint64   sequence     Nummer des zuletzt veröffentlichten Frames
+    24      uint32   front        Slot (0 oder 1) mit dem zuletzt veröffentlichten Frame
+    28      uint32   reserviert
+    32      float64  timestamp    CLOCK_MONOTONIC (time.monotonic()) der Veröffentlichung
+    40      -        reserviert bis header_size
+    64      Slot 0   frame_bytes Bytes RGB: erst Streifen 1, dann Streifen 2, je LED R, G, B
+    64 + frame_bytes  Slot 1
+
+Schreiben (Doppelpuffer): Frame in den Slot 1 - front schreiben, dann
+timestamp, front und zuletzt sequence + 1 setzen. Der Render-Thread liest den
+Slot front direkt aus dem Segment und verwirft das Ergebnis, wenn sich sequence
+währenddessen überhaupt geändert hat: Nach einer Veröffentlichung ist der
+gelesene Slot der hintere, in den der nächste Frame geschrieben wird.
+
+Es gibt genau einen Schreiber. SharedFrameClient hält dafür eine exklusive
+flock-Sperre auf /dev/shm/<name>; ein zweiter Client scheitert. Solange das
+Segment besteht, nimmt der LED-Manager keine Frames über HTTP, UDP oder den
+Unix-Socket an.
+
+Beispiel mit SharedFrameClient (ohne numpy nutzbar):
+
+    with SharedFrameClient('pivoltmeter-frames') as client:
+        frame = client.back_buffer()        # memoryview, frame_bytes lang
+        frame[:] = rgb_bytes
+        client.publish()
+"""
+import fcntl
+import mmap
+import os
+import struct
+import time
+
+
+MAGIC = b'PVLF'
+LAYOUT_VERSION = 1
+HEADER_SIZE = 64
+HEADER = struct.Struct('<4sHHII')        # magic, version, header_size, led_count, frame_bytes
+SEQUENCE = struct.Struct('<Q')
+SEQUENCE_OFFSET = 16
+FRONT = struct.Struct('<I')
+FRONT_OFFSET = 24
+TIMESTAMP = struct.Struct('<d')
+TIMESTAMP_OFFSET = 32
+
+
+def segment_size(led_count):
+    """Größe eines Segments für led_count LEDs pro Streifen in Bytes"""
+    return HEADER_SIZE + 2 * (2 * led_count * 3)
+
+
+def write_header(buffer, led_count):
+    """Initialisiert den Kopf eines neuen Segments (sequence 0, front 0)"""
+    HEADER.pack_into(buffer, 0, MAGIC, LAYOUT_VERSION, HEADER_SIZE, led_count, 2 * led_count * 3)
+    SEQUENCE.pack_into(buffer, SEQUENCE_OFFSET, 0)
+    FRONT.pack_into(buffer, FRONT_OFFSET, 0)
+    TIMESTAMP.pack_into(buffer, TIMESTAMP_OFFSET, 0.0)
+
+
+def publish(buffer, slot):
+    """
+    Veröffentlicht den Frame in slot: erst Zeitstempel und Slot, zuletzt die Sequenznummer.
+
+    :return: Neue Sequenznummer
+    """
+    sequence = SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0] + 1
+    TIMESTAMP.pack_into(buffer, TIMESTAMP_OFFSET, time.monotonic())
+    FRONT.pack_into(buffer, FRONT_OFFSET, slot)
+    SEQUENCE.pack_into(buffer, SEQUENCE_OFFSET, sequence)
+    return sequence
+
+
+class SharedFrameClient:
+    """
+    Schreibt Frames in das Shared-Memory-Segment des laufenden LED-Managers.
+
+    Öffnet /dev/shm/<name> direkt, damit der resource_tracker von
+    multiprocessing das Segment beim Beenden des Clients nicht entfernt.
+    Bis close() hält der Client die Schreibsperre des Segments.
+    """
+
+    def __init__(self, name):
+        """
+        :param name: Config.SHARED_FRAMES_NAME des LED-Managers
+        :raises FileNotFoundError: Wenn der LED-Manager das Segment nicht angelegt hat
+        :raises PermissionError: Ohne Schreibrecht (Gruppe bzw. SHARED_FRAMES_MODE prüfen)
+        :raises ValueError: Bei unbekanntem Aufbau
+        :raises RuntimeError: Wenn bereits ein anderer Client in das Segment schreibt
+        """
+        self.name = name
+        self._map = None
+        self._fd = os.open(os.path.join('/dev/shm', name.lstrip('/')), os.O_RDWR)
+        try:
+            try:
+                # Die Sperre gilt, solange der Dateideskriptor offen ist
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError(f"In das Segment {name} schreibt bereits ein anderer Prozess")
+            self._map = mmap.mmap(self._fd, 0)
+            magic, version, header_size, led_count, frame_bytes = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != LAYOUT_VERSION:
+                raise ValueError(f"Unbekanntes Segment {name} (magic {magic!r}, Version {version})")
+        except Exception:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            os.close(self._fd)
+            raise
+        self.led_count = led_count
+        self.frame_bytes = frame_bytes
+        self._view = memoryview(self._map)
+        self._slots = (
+            self._view[header_size:header_size + frame_bytes],
+            self._view[header_size + frame_bytes:header_size + 2 * frame_bytes],
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def sequence(self):
+        """Sequenznummer des zuletzt veröffentlichten Frames"""
+        return SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+
+    def _back_slot(self):
+        return 1 - FRONT.unpack_from(self._map, FRONT_OFFSET)[0]
+
+    def back_buffer(self):
+        """Beschreibbarer Slot für den nächsten Frame (memoryview, frame_bytes lang)"""
+        return self._slots[self._back_slot()]
+
+    def publish(self):
+        """
+        Veröffentlicht den in back_buffer() geschriebenen Frame.
+
+        :return: Sequenznummer des Frames
+        """
+        return publish(self._map, self._back_slot())
+
+    def write(self, frame):
+        """
+        Kopiert einen vollständigen Frame in den hinteren Slot und veröffentlicht ihn.
+
+        :param frame: bytes-ähnliches Objekt mit frame_bytes Bytes
+        :return: Sequenznummer des Frames
+        :raises ValueError: Bei falscher Größe
+        """
+        if len(frame) != self.frame_bytes:
+            raise ValueError(f"Frame muss {self.frame_bytes} Bytes lang sein, nicht {len(frame)}")
+        self.back_buffer()[:] = frame
+        return self.publish()
+
+    def close(self):
+        """Gibt die Abbildung und die Schreibsperre frei (das Segment bleibt bestehen)"""
+        if self._map is None:
+            return
+        self._slots = None
+        self._view.release()
+        self._map.close()
+        self._map = None
+        os.close(self._fd)
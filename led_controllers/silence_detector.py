@@ -0,0 +1,70 @@
+class SilenceDetector:
+    """
+    Erkennt längere Stille im Audiosignal mit Hysterese.
+
+    Stille beginnt, wenn der Pegel quiet_seconds lang unter threshold liegt, und
+    endet sofort, sobald er resume_threshold erreicht. Pegel zwischen den beiden
+    Schwellen beenden die Stille nicht, setzen aber die Wartezeit bis zur Stille
+    zurück, damit leise Musik nicht als Stille gilt.
+    """
+
+    def __init__(self, threshold=2.0, resume_threshold=4.0, quiet_seconds=30.0):
+        """
+        :param threshold: Pegel in Prozent, unter dem das Signal als still gilt
+        :param resume_threshold: Pegel in Prozent, ab dem die Stille sofort endet
+        :param quiet_seconds: Dauer in Sekunden, die das Signal still sein muss
+        :raises ValueError: Bei ungültigen Schwellen oder negativer Dauer
+        """
+        if threshold < 0 or resume_threshold < threshold:
+            raise ValueError("Die Schwelle zum Fortsetzen muss mindestens so groß wie die Stille-Schwelle sein")
+        if quiet_seconds < 0:
+            raise ValueError("Die Dauer bis zur Stille darf nicht negativ sein")
+
+        self.threshold = threshold
+        self.resume_threshold = resume_threshold
+        self.quiet_seconds = quiet_seconds
+        self.silent = False
+        # Zeitpunkt, seit dem der Pegel unter threshold liegt bzw. seit dem Stille herrscht
+        self.quiet_since = None
+        self.silent_since = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Erzeugt den Detektor aus den SILENCE_*-Einstellungen"""
+        return cls(
+            threshold=config.SILENCE_THRESHOLD,
+            resume_threshold=config.SILENCE_RESUME_THRESHOLD,
+            quiet_seconds=config.SILENCE_SECONDS,
+        )
+
+    def update(self, level, now):
+        """
+        Verarbeitet einen neuen Pegelwert.
+
+        :param level: Aktueller (ungeglätteter) Pegel in Prozent
+        :param now: Aktuelle Zeit in Sekunden
+        :return: True, wenn sich der Zustand (still / nicht still) geändert hat
+        """
+        if self.silent:
+            if level >= self.resume_threshold:
+                self.reset()
+                return True
+            return False
+
+        if level >= self.threshold:
+            self.quiet_since = None
+            return False
+
+        if self.quiet_since is None:
+            self.quiet_since = now
+        if now - self.quiet_since >= self.quiet_seconds:
+            self.silent = True
+            self.silent_since = now
+            return True
+        return False
+
+    def reset(self):
+        """Setzt den Detektor auf "nicht still" zurück"""
+        self.silent = False
+        self.quiet_since = None
+        self.silent_since = None
@@ -0,0 +1,122 @@
+import sys
+import threading
+import time
+
+
+class LEDSimulator:
+    """
+    Zeigt die virtuellen LED-Streifen (Config.LED_OUTPUT = 'virtual') im Terminal
+    als ANSI-Farbblöcke an und stellt jeden Frame für die Browser-Ansicht
+    (/simulator) bereit.
+
+    Ein Frame gilt als fertig, wenn der zweite Streifen ausgegeben wurde
+    (show_strips() gibt immer erst strip_one, dann strip_two aus). Die Ausgabe
+    erfolgt im Render-Thread, also genau im Takt der echten Bildrate.
+    """
+
+    # Glättung der angezeigten Bildrate und Frame-Zeit (Anteil des neuen Werts)
+    SMOOTHING = 0.1
+
+    def __init__(self, terminal=False, stream=None):
+        """
+        :param terminal: Frames im Terminal ausgeben
+        :param stream: Ausgabestrom für die Terminal-Ansicht (Standard: sys.stdout)
+        """
+        self.terminal = terminal
+        self.stream = stream or sys.stdout
+        self.led_manager = None
+        self.strips = None
+        self.fps = 0.0
+        self.frame_ms = 0.0
+        self.frame_count = 0
+        self._last_frame_time = None
+        self._frame = None
+        self._condition = threading.Condition()
+        self._terminal_lines = 0
+
+    def attach(self, led_manager):
+        """
+        Verbindet den Simulator mit den Streifen des LED-Managers.
+        Wird vom LED-Manager nach dem Erzeugen der Streifen aufgerufen.
+        """
+        self.led_manager = led_manager
+        self.strips = led_manager.pattern_visualizer.strips
+        self.strips[1].on_show = self._on_frame
+
+    @staticmethod
+    def _scaled_pixels(strip):
+        """Pixel als (r, g, b) mit angewendeter Helligkeit, wie sie die echten LEDs zeigen würden"""
+        brightness = strip.getBrightness()
+        pixels = []
+        for color in strip.getPixels():
+            r = (color >> 16) & 0xFF
+            g = (color >> 8) & 0xFF
+            b = color & 0xFF
+            pixels.append((r * brightness // 255, g * brightness // 255, b * brightness // 255))
+        return pixels
+
+    def _on_frame(self, strip):
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            interval = now - self._last_frame_time
+            if interval > 0:
+                # Erster Messwert ohne Glättung, damit die Anzeige nicht bei 0 beginnt
+                self.fps += (1.0 / interval - self.fps) * (self.SMOOTHING if self.fps else 1.0)
+        self._last_frame_time = now
+
+        # Rechenzeit des letzten vollständigen Frames (ohne Wartezeit)
+        if self.led_manager is not None and self.led_manager.last_frame_seconds is not None:
+            self.frame_ms += (self.led_manager.last_frame_seconds * 1000 - self.frame_ms) * (self.SMOOTHING if self.frame_ms else 1.0)
+
+        strips = [self._scaled_pixels(s) for s in self.strips]
+        frame = {
+            "frame": self.frame_count + 1,
+            "fps": round(self.fps, 1),
+            "frame_ms": round(self.frame_ms, 3),
+            # Pro Streifen ein Hex-String mit 6 Zeichen (RRGGBB) je LED
+            "strips": ["".join(f"{r:02x}{g:02x}{b:02x}" for r, g, b in pixels) for pixels in strips],
+        }
+
+        with self._condition:
+            self.frame_count += 1
+            self._frame = frame
+            self._condition.notify_all()
+
+        if self.terminal:
+            self._draw_terminal(strips)
+
+    def _draw_terminal(self, strips):
+        lines = []
+        for index, pixels in enumerate(strips):
+            parts = [f"Streifen {index + 1} "]
+            previous = None
+            for pixel in pixels:
+                # Escape-Sequenz nur bei Farbwechsel ausgeben
+                if pixel != previous:
+                    parts.append(f"\x1b[48;2;{pixel[0]};{pixel[1]};{pixel[2]}m")
+                    previous = pixel
+                parts.append("  ")
+            parts.append("\x1b[0m\x1b[K")
+            lines.append("".join(parts))
+        lines.append(f"{self.fps:6.1f} FPS  Frame-Zeit {self.frame_ms:7.3f} ms  Frame {self.frame_count}\x1b[K")
+
+        # Vorherige Ausgabe überschreiben
+        prefix = f"\x1b[{self._terminal_lines}F" if self._terminal_lines else ""
+        self.stream.write(prefix + "\n".join(lines) + "\n")
+        self.stream.flush()
+        self._terminal_lines = len(lines)
+
+    def wait_for_frame(self, last_frame=0, timeout=1.0):
+        """
+        Wartet auf einen Frame, der neuer als last_frame ist. Zwischenzeitliche
+        Frames werden übersprungen, langsame Clients bremsen den Render-Thread nicht.
+
+        :param last_frame: Nummer des zuletzt erhaltenen Frames
+        :param timeout: Maximale Wartezeit in Sekunden
+        :return: Frame als Dictionary oder None bei Zeitüberschreitung
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame is not None and self._frame["frame"] > last_frame, timeout)
+            if self._frame is None or self._frame["frame"] <= last_frame:
+                return None
+            return self._frame
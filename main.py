@@ -9,21 +9,40 @@
 # Version:      1.0
 # Beschreibung: Modulare LED-Visualisierung mit Audio- und Muster-Unterstützung
 
+from utils.startup_timer import startup_timer
+import argparse
 import threading
 from config.config import Config
+from config.store import ConfigStore
 from utils.led_manager import LEDManager
-from only_flask import start_flask_server
-import only_led
+from utils.realtime import RealtimeProfile
 import signal
 import sys
 import atexit
 
-def cleanup(led_manager):
+def cleanup(led_manager, servers=()):
+    # Zuerst keine neuen Befehle und Frames mehr annehmen (entfernt auch die Unix-Sockets)
+    for server in servers:
+        try:
+            server.stop()
+        except Exception as e:
+            print(f"Fehler beim Beenden von {type(server).__name__}: {e}")
+    if led_manager.store is not None:
+        # Noch nicht geschriebene Änderungen nicht verlieren
+        led_manager.store.flush()
     try:
+        # Render-Thread vor dem Freigeben des Frame-Puffers beenden, er liest daraus
+        led_manager.stop_visualization()
         print("Schalte LEDs aus...")
         led_manager.turn_off_leds()
     except Exception as e:
         print(f"Fehler beim Ausschalten der LEDs: {e}")
+    try:
+        if led_manager.frame_buffer is not None:
+            # Shared-Memory-Segment nicht in /dev/shm zurücklassen
+            led_manager.frame_buffer.close()
+    except Exception as e:
+        print(f"Fehler beim Freigeben des Frame-Puffers: {e}")
 
 # Registrieren für normales Beenden
 # atexit.register(cleanup)
@@ -38,26 +57,82 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="LED-Visualisierung mit Weboberfläche")
+    parser.add_argument('--simulate', choices=['terminal', 'browser'],
+                        help="Ohne Raspberry Pi: virtuelle LED-Streifen im Terminal oder unter /simulator anzeigen")
+    parser.add_argument('--port', type=int, default=5000, help="Port des Webservers")
+    return parser.parse_args()
+
 def main():
     """Hauptfunktion des Programms"""
+    args = parse_args()
     print("Starte LED-Visualisierungssystem")
-        # LED-Manager erstellen
-    led_manager = LEDManager()
+    # Echtzeit-Profil vor allen weiteren Threads anwenden, damit diese den Render-Kern nicht erben
+    realtime = RealtimeProfile.from_config(Config)
+    if realtime is not None:
+        realtime.apply_process()
+    # Letzten Zustand vor dem ersten Frame wiederherstellen
+    store = ConfigStore.from_config(Config)
+    if store is not None:
+        with startup_timer.phase("Gespeicherte Konfiguration"):
+            store.restore(Config)
+    # Netzwerkinformationen im Hintergrund ermitteln, damit die erste Anfrage nicht wartet
+    Config.get_cached_ip_addresses()
+    
+    simulator = None
+    if args.simulate:
+        from led_controllers.simulator import LEDSimulator
+        Config.LED_OUTPUT = 'virtual'
+        simulator = LEDSimulator(terminal=args.simulate == 'terminal')
+        if args.simulate == 'terminal':
+            # Anfrage-Logs des Webservers würden die Terminal-Ansicht zerreißen
+            import logging
+            logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        else:
+            print(f"Simulator: http://localhost:{args.port}/simulator")
+    
+    # LED-Manager erstellen (ohne Hardware-Initialisierung)
+    led_manager = LEDManager(simulator=simulator, realtime=realtime, store=store)
+    # Gestartete Server, die beim Beenden gestoppt werden
+    servers = []
     try:
         
-        # LED-Start-Animation
-        only_led.start_all_start_phase()
-        
-        # Visualisierung starten
+        # Render-Thread starten: LED-Streifen, Start-Animation und Audio
+        # werden dort initialisiert, während der Webserver bereits startet
         led_manager.start_visualization()
         
+        # Steuer-Socket für lokale Automatisierung
+        from utils.control_socket import ControlServer
+        control_server = ControlServer.from_config(Config, led_manager)
+        if control_server is not None:
+            control_server.start()
+            servers.append(control_server)
+        
+        # OSC für Lichtpulte
+        from utils.osc_server import OSCServer
+        osc_server = OSCServer.from_config(Config, led_manager)
+        if osc_server is not None:
+            osc_server.start()
+            servers.append(osc_server)
+        
+        # Externe Frames über UDP bzw. Unix-Socket (nur mit Config.INGEST_ENABLED)
+        if led_manager.frame_buffer is not None:
+            from led_controllers.frame_ingest import FrameIngestServer
+            ingest_server = FrameIngestServer.from_config(Config, led_manager.frame_buffer)
+            if ingest_server is not None:
+                ingest_server.start()
+                servers.append(ingest_server)
+        
         # Flask-Server mit LED-Manager starten
-        start_flask_server(led_manager_instance=led_manager)
+        with startup_timer.phase("Import Webserver (Flask)"):
+            from only_flask import start_flask_server
+        start_flask_server(port=args.port, led_manager_instance=led_manager, simulator_instance=simulator)
 
     except Exception as e:
         print(f"Unerwarteter Fehler: {e}")
     finally:
-        cleanup(led_manager)  # Sicherheitshalber nochmal aufrufen
+        cleanup(led_manager, servers)  # Sicherheitshalber nochmal aufrufen
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
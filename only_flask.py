@@ -1,6 +1,10 @@
-from flask import Flask, render_template, request, jsonify
-import only_led
-from rpi_ws281x import Color
+import json
+from flask import Flask, Response, render_template, request, jsonify
+from utils.led_manager import ConfigVersionConflict
+from utils.metrics import metrics
+from utils.profiler import SamplingProfiler, ProfilerBusyError
+from led_controllers.palette import palettes, PaletteConflict
+from utils.startup_timer import startup_timer
 # Im Flask-Server oder beim Start deiner Anwendung
 
 
@@ -15,13 +19,42 @@ app = Flask(__name__)
 
 # Globale Variable für LED-Manager
 led_manager = None
+# LED-Simulator (nur mit main.py --simulate)
+simulator = None
+
+
+def submit_settings(settings, expected_version=None):
+    """
+    Leitet Einstellungen an den LED-Manager weiter. Der Render-Thread wendet sie an,
+    der Handler wartet nicht darauf.
+    
+    :param settings: Dictionary mit den zu ändernden Einstellungen
+    :param expected_version: Nur übernehmen, wenn dies die aktuelle Version ist (optional)
+    :return: Tupel aus neuer Konfigurationsversion und Konfiguration für den Client
+    :raises ConfigVersionConflict: Wenn expected_version nicht mehr aktuell ist
+    :raises ValueError: Wenn eine Einstellung ungültig ist
+    """
+    if led_manager:
+        version = led_manager.submit_settings(settings, expected_version=expected_version)
+        return version, led_manager.desired_config()
+    
+    # Ohne LED-Manager (nur Webserver) direkt in die Config schreiben
+    if expected_version is not None and expected_version != Config.CONFIG_VERSION:
+        raise ConfigVersionConflict(expected_version, Config.CONFIG_VERSION)
+    version = Config.apply_settings(Config.validate_settings(settings))
+    return version, Config.to_json()
+
+
+def current_config():
+    """Gibt die Konfiguration inklusive noch nicht angewendeter Änderungen zurück"""
+    return led_manager.desired_config() if led_manager else Config.to_json()
 
 
 @app.route('/')
 def index():
     """Startseite des Webservers mit vorgeladener Konfiguration"""
     # Hole die aktuelle Konfiguration
-    config_json = Config.to_json()
+    config_json = current_config()
     
     # Übergebe die Konfiguration als Variable an das Template
     return render_template('index.html', config=config_json)
@@ -30,7 +63,7 @@ def index():
 @app.route('/set_visualization_mode', methods=['POST'])
 def set_visualization_mode():
     data = request.get_json()
-    current_mode = Config.VISUALIZATION_MODE
+    current_mode = current_config()['visualization_mode']
     new_mode = data.get('mode', 'audio') # sollte kein 'mode' gesendet werden, verwende 'audio' als Standartwert
 
     print(f"Aktueller modus: {current_mode}")
@@ -38,18 +71,16 @@ def set_visualization_mode():
 
     try:
         # Validieren und umstellen des Modus
-        if new_mode in ['audio', 'static', 'off']:
-            Config.set_visualization_mode(new_mode)
-
-            # LED-Manager über Änderung informieren
-            if led_manager:
-                led_manager.handle_config_change()
+        if new_mode in Config.VISUALIZATION_MODES:
+            # Änderung an den LED-Manager übergeben
+            version, config = submit_settings({"visualization_mode": new_mode})
             
             # Vollständige Konfiguration zurückgeben
             return jsonify({
                 "status": "success", 
                 "message": f"Visualisierungs Modus umgestellt auf {new_mode}",
-                "config": Config.to_json()
+                "version": version,
+                "config": config
             })
         else:
             return jsonify({
@@ -66,13 +97,14 @@ def set_visualization_mode():
 def set_pattern_per_mode():
     data = request.get_json()
     new_pattern = data.get('pattern')
-    current_mode = Config.VISUALIZATION_MODE
+    config = current_config()
+    current_mode = config['visualization_mode']
     
     # Ermittle aktuelles Muster für Debugging
     if current_mode == 'audio':
-        current_pattern = Config.AUDIO_PATTERN
+        current_pattern = config['audio_pattern']
     elif current_mode == 'static':
-        current_pattern = Config.STATIC_PATTERN
+        current_pattern = config['static_pattern']
     else:
         current_pattern = "off"
 
@@ -83,29 +115,24 @@ def set_pattern_per_mode():
     # Muster-Update versuchen
     try:
         if new_pattern:
-            Config.set_pattern_per_mode(new_pattern)
+            # Änderung an den LED-Manager übergeben
+            version, config = submit_settings({"pattern": new_pattern})
             
-            # Hole das aktualisierte Muster zur Bestätigung
+            # Muster zur Bestätigung benennen
             if current_mode == 'audio':
-                updated_pattern = Config.AUDIO_PATTERN
                 pattern_name = new_pattern.replace('audio_pattern_', 'Audio-Muster ')
             elif current_mode == 'static':
-                updated_pattern = Config.STATIC_PATTERN
                 pattern_name = new_pattern.replace('static_pattern_', 'Statisches Muster ')
             else:
-                updated_pattern = "off"
                 pattern_name = "Aus"
-
-            # LED-Manager über Änderung informieren
-            if led_manager:
-                led_manager.handle_config_change()
                 
             # Erfolgsantwort mit vollständiger Konfiguration
             print("Wechsel Muster Erfolg")
             return jsonify({
                 "status": "success",
                 "message": f"Muster erfolgreich auf {pattern_name} umgestellt",
-                "config": Config.to_json()
+                "version": version,
+                "config": config
             })
         else:
             print("Wechsel Muster KEIN Erfolg")
@@ -126,18 +153,15 @@ def set_color():
     color = data.get('color', 'rainbow')
     
     try:
-        # Hier die Farbe im Config-Objekt speichern
-        Config.LED_COLOR = color
-        # LED-Manager über Änderung informieren
-        if led_manager:
-            led_manager.handle_config_change()
-
+        # Änderung an den LED-Manager übergeben
+        version, config = submit_settings({"led_color": color})
         
         # Vollständige Konfiguration zurückgeben
         return jsonify({
             "status": "success",
             "message": f"Farbe auf {color} umgestellt",
-            "config": Config.to_json()
+            "version": version,
+            "config": config
         })
     except ValueError as e:
         return jsonify({
@@ -145,6 +169,213 @@ def set_color():
             "message": str(e)
         }), 400
 
+@app.route('/palettes', methods=['GET', 'POST'])
+def palette_list():
+    """
+    Listet alle Paletten auf oder lädt eine eigene Palette hoch.
+    
+    POST-Body: {"name": "lagerfeuer", "label": "Lagerfeuer",
+    "stops": ["#200000", "#ff4000", "#ffd080"]} oder mit expliziten
+    Positionen {"stops": [{"position": 0.0, "color": "#200000"}, ...]}.
+    Danach kann die Palette wie eine Farbe über /set_color gewählt werden.
+    """
+    if request.method == 'GET':
+        return jsonify({
+            "status": "success",
+            "palettes": palettes.to_json(),
+            "current": current_config().get('led_color')
+        })
+    
+    data = request.get_json(silent=True)
+    try:
+        palette = palettes.register(data)
+    except PaletteConflict as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 409
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    return jsonify({
+        "status": "success",
+        "message": f"Palette {palette.name} gespeichert",
+        "palette": palette.to_json()
+    })
+
+def parse_if_match(header):
+    """
+    Liest die erwartete Konfigurationsversion aus einem If-Match-Header.
+    
+    :param header: Inhalt des Headers (z.B. '"12"' oder 'W/"12"'), None oder '*'
+    :return: Versionsnummer oder None, wenn keine Prüfung gewünscht ist
+    :raises ValueError: Wenn der Header keine gültige Version enthält
+    """
+    if header is None or header.strip() == '*':
+        return None
+    
+    value = header.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    value = value.strip('"')
+    
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Ungültiger If-Match-Header: {header}")
+
+
+@app.route('/settings', methods=['GET', 'POST', 'PATCH'])
+def settings():
+    """
+    Liest oder ändert mehrere Einstellungen auf einmal.
+    
+    Der Body ist ein Teil-Dokument, z.B. {"visualization_mode": "static",
+    "pattern": "static_pattern_02", "led_color": "blue"}. Alle Felder werden
+    gemeinsam geprüft und als eine Konfigurationsversion übernommen, mit
+    höchstens einer Übergangsanimation. Über den Header If-Match kann die
+    erwartete Version angegeben werden (optimistische Nebenläufigkeit).
+    """
+    if request.method == 'GET':
+        config = current_config()
+        response = jsonify({
+            "status": "success",
+            "version": config['config_version'],
+            "config": config
+        })
+        response.headers['ETag'] = f'"{config["config_version"]}"'
+        return response
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({
+            "status": "error",
+            "message": "Keine Einstellungen angegeben"
+        }), 400
+    
+    try:
+        expected_version = parse_if_match(request.headers.get('If-Match'))
+        version, config = submit_settings(data, expected_version=expected_version)
+    except ConfigVersionConflict as e:
+        response = jsonify({
+            "status": "error",
+            "message": str(e),
+            "version": e.current
+        })
+        response.headers['ETag'] = f'"{e.current}"'
+        return response, 412
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    response = jsonify({
+        "status": "success",
+        "message": f"{len(data)} Einstellung(en) übernommen",
+        "version": version,
+        "config": config
+    })
+    response.headers['ETag'] = f'"{version}"'
+    return response
+
+@app.route('/modulation', methods=['GET', 'PUT'])
+def modulation():
+    """
+    Liest oder ersetzt die Modulationsmatrix (Audio-Merkmale -> Muster-Parameter).
+
+    PUT-Body: {"routes": [{"source": "low", "target": "audio_pattern_06.width",
+    "curve": "square", "depth": 0.8, "smoothing": 0.5}]} ersetzt alle Routen
+    (leere Liste = keine Modulation). GET liefert zusätzlich die möglichen
+    Quellen, Kurven und Ziele sowie die zuletzt berechneten Werte.
+    """
+    from led_controllers.audio_features import FEATURES
+    from led_controllers.modulation import CURVES, modulation_targets
+
+    if request.method == 'PUT':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'routes' not in data:
+            return jsonify({
+                "status": "error",
+                "message": "Erwartet {\"routes\": [...]}"
+            }), 400
+        try:
+            expected_version = parse_if_match(request.headers.get('If-Match'))
+            version, _ = submit_settings({'modulation': data['routes']}, expected_version=expected_version)
+        except ConfigVersionConflict as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e),
+                "version": e.current
+            }), 412
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+
+    config = current_config()
+    audio_visualizer = led_manager.audio_visualizer if led_manager else None
+    return jsonify({
+        "status": "success",
+        "version": config['config_version'],
+        "routes": config['modulation'],
+        "sources": list(FEATURES),
+        "curves": list(CURVES),
+        "targets": {target: {"min": spec[0], "max": spec[1], "default": spec[2]}
+                    for target, spec in modulation_targets(Config).items()},
+        # Nur im Audio-Modus aktuell
+        "features": audio_visualizer.features.to_json() if audio_visualizer else None,
+        "values": audio_visualizer.modulation.to_json() if audio_visualizer else {}
+    })
+
+@app.route('/zones', methods=['GET', 'PUT'])
+def zones():
+    """
+    Liest oder ersetzt die Zonen (eigenes Muster, eigene Farbe und Bildrate je
+    Streifen oder Abschnitt).
+
+    PUT-Body: {"zones": [{"name": "links", "strip": 1, "mode": "static",
+    "pattern": "static_pattern_02", "color": "fire", "fps": 30},
+    {"name": "rechts", "strip": 2, "mode": "audio", "pattern": "audio_pattern_01"}]}
+    ersetzt alle Zonen (leere Liste = ein Muster auf beiden Streifen wie bisher).
+    """
+    if request.method == 'PUT':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'zones' not in data:
+            return jsonify({
+                "status": "error",
+                "message": "Erwartet {\"zones\": [...]}"
+            }), 400
+        try:
+            expected_version = parse_if_match(request.headers.get('If-Match'))
+            submit_settings({'zones': data['zones']}, expected_version=expected_version)
+        except ConfigVersionConflict as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e),
+                "version": e.current
+            }), 412
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+
+    config = current_config()
+    scheduler = led_manager.zone_scheduler if led_manager else None
+    return jsonify({
+        "status": "success",
+        "version": config['config_version'],
+        "zones": config['zones'],
+        "led_count": Config.LED_PER_STRIP,
+        # Laufende Zonen mit Anzahl berechneter Frames (nach dem Übernehmen durch den Render-Thread)
+        "active": scheduler.status() if scheduler else []
+    })
+
 # Neue Route zum direkten Abrufen der aktuellen Konfiguration
 @app.route('/get_current_config', methods=['GET'])
 def get_current_config():
@@ -154,13 +385,202 @@ def get_current_config():
     """
     return jsonify({
         "status": "success",
-        "config": Config.to_json()
+        "config": current_config()
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Gibt Zähler und Histogramme der Render- und Audio-Pipeline im
+    Prometheus-Textformat zurück.
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/quality', methods=['GET'])
+def quality_status():
+    """
+    Gibt die aktuelle Qualitätsstufe der Audio-Visualisierung, die zuletzt
+    gemessene Last und die letzten Wechsel zurück.
+    """
+    if not led_manager or led_manager.quality is None:
+        return jsonify({
+            "status": "error",
+            "message": "Adaptive Qualität ist nicht aktiv"
+        }), 404
+
+    return jsonify({
+        "status": "success",
+        "quality": led_manager.quality.status()
+    })
+
+
+def _read_exact(stream, view):
+    """
+    Liest genau len(view) Bytes aus dem Request-Stream in einen vorhandenen Puffer.
+
+    :return: Anzahl gelesener Bytes (weniger nur am Ende des Streams)
+    """
+    total = 0
+    while total < len(view):
+        count = stream.readinto(view[total:])
+        if not count:
+            break
+        total += count
+    return total
+
+
+@app.route('/frames', methods=['POST'])
+def ingest_frames():
+    """
+    Nimmt externe Frames als rohe RGB-Bytes entgegen (siehe led_controllers/frame_ingest.py).
+    
+    Der Body kann beliebig viele Frames hintereinander enthalten und gestreamt
+    werden (Transfer-Encoding: chunked); jeder Frame wird sofort übernommen.
+    Mit ?mirror=1 enthält jeder Frame nur einen Streifen, der auf beiden
+    angezeigt wird.
+    """
+    frame_buffer = led_manager.frame_buffer if led_manager else None
+    if frame_buffer is None:
+        return jsonify({
+            "status": "error",
+            "message": "Frame-Eingang ist nicht aktiv (Config.INGEST_ENABLED)"
+        }), 404
+    if frame_buffer.shared_name:
+        # Nur ein Schreiber: Frames kommen über das Shared Memory (SharedFrameClient)
+        return jsonify({
+            "status": "error",
+            "message": f"Frames werden über das Shared Memory {frame_buffer.shared_name} empfangen"
+        }), 409
+    
+    mirror = request.args.get('mirror', '0').lower() in ('1', 'true', 'yes')
+    buffer = bytearray(frame_buffer.strip_bytes if mirror else frame_buffer.frame_bytes)
+    view = memoryview(buffer)
+    frames = 0
+    while True:
+        size = _read_exact(request.stream, view)
+        if size == 0:
+            break
+        if size < len(buffer):
+            return jsonify({
+                "status": "error",
+                "message": f"Unvollständiger Frame nach {frames} Frames ({size} von {len(buffer)} Bytes)",
+                "frames": frames
+            }), 400
+        frame_buffer.write(view, 'http')
+        frames += 1
+    
+    return jsonify({
+        "status": "success",
+        "frames": frames
+    })
+
+
+@app.route('/admin/profile', methods=['POST'])
+def profile_render_thread():
+    """
+    Zeichnet ein zeitlich begrenztes Stichproben-Profil des Render-Threads auf,
+    ohne die Visualisierung anzuhalten.
+    
+    Query-Parameter:
+        duration: Dauer in Sekunden (Standard 5, maximal 60)
+        rate: Stichproben pro Sekunde (Standard 100, maximal 1000)
+        format: 'speedscope' (Standard) oder 'collapsed'
+    """
+    thread_ident = led_manager.render_thread_ident if led_manager else None
+    if thread_ident is None:
+        return jsonify({
+            "status": "error",
+            "message": "Render-Thread läuft nicht"
+        }), 409
+    
+    try:
+        duration = float(request.args.get('duration', 5))
+        rate = float(request.args.get('rate', 100))
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "duration und rate müssen Zahlen sein"
+        }), 400
+    
+    output_format = request.args.get('format', 'speedscope')
+    if not 0 < duration <= 60 or not 0 < rate <= 1000 or output_format not in ('speedscope', 'collapsed'):
+        return jsonify({
+            "status": "error",
+            "message": "Erlaubt: 0 < duration <= 60, 0 < rate <= 1000, format = speedscope | collapsed"
+        }), 400
+    
+    try:
+        profiler = SamplingProfiler(thread_ident, rate_hz=rate, duration=duration).run()
+    except ProfilerBusyError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 409
+    
+    overhead = profiler.overhead()
+    print(f"Profil des Render-Threads aufgezeichnet: {overhead}")
+    
+    if output_format == 'collapsed':
+        response = Response(profiler.collapsed(), mimetype='text/plain')
+        # Aufwand der Aufzeichnung als Header, damit die Ausgabe direkt für flamegraph.pl nutzbar bleibt
+        response.headers['X-Profile-Samples'] = str(overhead['samples'])
+        response.headers['X-Profile-Overhead-Percent'] = str(overhead['overhead_percent'])
+        return response
+    
+    return jsonify({
+        "status": "success",
+        "overhead": overhead,
+        "profile": profiler.speedscope()
+    })
+
+
+@app.route('/simulator', methods=['GET'])
+def simulator_page():
+    """Browser-Ansicht der virtuellen LED-Streifen"""
+    if simulator is None:
+        return jsonify({
+            "status": "error",
+            "message": "Simulator ist nicht aktiv (main.py --simulate browser)"
+        }), 404
+    return render_template('simulator.html')
+
+
+@app.route('/simulator/stream', methods=['GET'])
+def simulator_stream():
+    """
+    Liefert die Frames der virtuellen LED-Streifen als Server-Sent Events.
+    Ist der Client langsamer als der Render-Thread, werden Frames übersprungen.
+    """
+    if simulator is None:
+        return jsonify({
+            "status": "error",
+            "message": "Simulator ist nicht aktiv (main.py --simulate browser)"
+        }), 404
+    
+    def generate():
+        last_frame = 0
+        while True:
+            frame = simulator.wait_for_frame(last_frame, timeout=1.0)
+            if frame is None:
+                # Kommentarzeile hält die Verbindung offen, solange keine Frames kommen (z.B. Off-Modus)
+                yield ": keepalive\n\n"
+                continue
+            last_frame = frame["frame"]
+            yield f"data: {json.dumps(frame)}\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 # Richtige Version
-def start_flask_server(host='0.0.0.0', port=5000, led_manager_instance=None):
+def start_flask_server(host='0.0.0.0', port=5000, led_manager_instance=None, simulator_instance=None):
     """Startet den Flask-Server"""
-    global led_manager
+    global led_manager, simulator
     led_manager = led_manager_instance
-    app.run(host=host, port=port)
\ No newline at end of file
+    simulator = simulator_instance
+    startup_timer.mark("Webserver startet")
+    # threaded: der Simulator-Stream hält eine Verbindung dauerhaft offen
+    app.run(host=host, port=port, threaded=True)
\ No newline at end of file
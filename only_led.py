@@ -1,17 +1,25 @@
 import time
 import random
 from rpi_ws281x import PixelStrip, Color
-import pyaudio
-import numpy as np
 from config.config import Config
 
 
-# Initialisierung der LED-Streifen
-strip_one = PixelStrip(Config.LED_PER_STRIP, Config.LED_PIN_ONE, Config.LED_FREQ_HZ, Config.LED_DMA_ONE, Config.LED_INVERT, Config.LED_BRIGHTNESS, Config.LED_CHANNEL_ONE)
-strip_two = PixelStrip(Config.LED_PER_STRIP, Config.LED_PIN_TWO, Config.LED_FREQ_HZ, Config.LED_DMA_TWO, Config.LED_INVERT, Config.LED_BRIGHTNESS, Config.LED_CHANNEL_TWO)
+# LED-Streifen werden erst bei der ersten Animation initialisiert, nicht beim Import
+strip_one = None
+strip_two = None
 
-strip_one.begin()
-strip_two.begin()  # Strip zwei starten
+
+def init_strips():
+    """Initialisiert die LED-Streifen beim ersten Aufruf"""
+    global strip_one, strip_two
+    if strip_one is not None:
+        return
+    
+    strip_one = PixelStrip(Config.LED_PER_STRIP, Config.LED_PIN_ONE, Config.LED_FREQ_HZ, Config.LED_DMA_ONE, Config.LED_INVERT, Config.LED_BRIGHTNESS, Config.LED_CHANNEL_ONE)
+    strip_two = PixelStrip(Config.LED_PER_STRIP, Config.LED_PIN_TWO, Config.LED_FREQ_HZ, Config.LED_DMA_TWO, Config.LED_INVERT, Config.LED_BRIGHTNESS, Config.LED_CHANNEL_TWO)
+    
+    strip_one.begin()
+    strip_two.begin()  # Strip zwei starten
 
 def random_color():
     """Erzeugt eine zufällige RGB-Farbe"""
@@ -26,6 +34,7 @@ def random_color():
 def start_phase_one():
     """Start-Animation: LEDs werden nacheinander mit zufälligen Farben eingeschaltet"""
     print("Starte die Einschaltsequenz 1...")
+    init_strips()
     
     # Zuerst alle LEDs ausschalten
     for i in range(Config.LED_PER_STRIP):
@@ -71,6 +80,7 @@ def animation_webserver_starting(iterations=1):
     iterations: Anzahl der Durchläufe (Standard: 1, für Endlosschleife -1 verwenden)
     """
     print("Webserver wird gestartet - Animation läuft...")
+    init_strips()
     
     count = 0
     while iterations == -1 or count < iterations:
@@ -117,6 +127,7 @@ def animation_webserver_starting(iterations=1):
 def animation_webserver_error(loop=True):
     """Animation wenn der Webserver nicht gestartet werden konnte - rotes Blinken"""
     print("Webserver-Fehler - Animation läuft...")
+    init_strips()
     
     # Anzahl der Durchläufe
     cycles = 1000 if loop else 5  # Wenn loop=True, dann quasi endlos, sonst 5 Zyklen
@@ -148,6 +159,7 @@ def pulsing_all_led(color_hex, cycles=3):
     cycles (int): Anzahl der Pulsier-Zyklen
     """
     print(f"Pulsieren in Farbe {color_hex}...")
+    init_strips()
     
     # Hexwert in RGB-Komponenten umwandeln
     color_hex = color_hex.lstrip('#')
@@ -215,8 +227,12 @@ def pulsing_all_led(color_hex, cycles=3):
 
 
 def audio_visualizer():
+    # Schwere Abhängigkeiten erst hier laden
+    import numpy as np
+    from led_controllers.audio_input import AudioInput
+    init_strips()
+    
     # Audio-Parameter
-    FORMAT = pyaudio.paInt16
     CHANNELS = 1
     RATE = 44100
     CHUNK = 1024
@@ -225,42 +241,20 @@ def audio_visualizer():
     smoothing = 0.3  # Niedrigerer Wert = weniger Glättung, höherer Wert = mehr Glättung
     last_amplitude = 0
     
-    p = pyaudio.PyAudio()
-    
-    # Geräteinformationen ausgeben
-    print("Verfügbare Audiogeräte:")
-    for i in range(p.get_device_count()):
-        dev_info = p.get_device_info_by_index(i)
-        print(f"Device {i}: {dev_info['name']}")
-        print(f"  Max Input Channels: {dev_info['maxInputChannels']}")
-        print(f"  Default Sample Rate: {dev_info['defaultSampleRate']}")
-    
-    # Finde das erste Eingabegerät
-    device_index = None
-    for i in range(p.get_device_count()):
-        dev_info = p.get_device_info_by_index(i)
-        if dev_info['maxInputChannels'] > 0:
-            device_index = i
-            break
-    
-    if device_index is None:
+    # Gleiche Geräteauswahl (inkl. gespeichertem Gerät) wie die Hauptanwendung
+    stream = AudioInput(CHUNK, RATE, CHANNELS,
+                        device_name=Config.AUDIO_DEVICE_NAME,
+                        cache_file=Config.AUDIO_DEVICE_CACHE_FILE)
+    if not stream.open():
         print("Kein Eingabegerät gefunden!")
         return
     
     try:
-        print(f"Öffne Audiogerät {device_index}...")
-        stream = p.open(format=FORMAT,
-                       channels=CHANNELS,
-                       rate=RATE,
-                       input=True,
-                       input_device_index=device_index,
-                       frames_per_buffer=CHUNK)
-        
         print("Audio-Visualisierung gestartet... (Drücken Sie Strg+C zum Beenden)")
         
         while True:
             # Lese Audiodaten
-            data = stream.read(CHUNK, exception_on_overflow=False)
+            data = stream.read()
             
             # Konvertiere zu numpy array
             audio_data = np.frombuffer(data, dtype=np.int16)
@@ -308,10 +302,7 @@ def audio_visualizer():
         import traceback
         traceback.print_exc()
     finally:
-        if 'stream' in locals():
-            stream.stop_stream()
-            stream.close()
-        p.terminate()
+        stream.close()
         
         # Alle LEDs ausschalten
         for i in range(Config.LED_PER_STRIP):
@@ -0,0 +1,40 @@
+// Zeichnet die per Server-Sent Events gelieferten Frames der virtuellen LED-Streifen
+const canvas = document.getElementById('simulator-canvas');
+const context = canvas.getContext('2d');
+
+function drawStrip(hex, row) {
+    const count = hex.length / 6;
+    const size = canvas.width / Math.max(count, 1);
+    const top = 10 + row * 40;
+
+    for (let i = 0; i < count; i++) {
+        context.fillStyle = '#' + hex.substr(i * 6, 6);
+        context.beginPath();
+        context.arc(size * i + size / 2, top + 15, Math.min(size * 0.4, 15), 0, 2 * Math.PI);
+        context.fill();
+    }
+}
+
+function drawFrame(frame) {
+    context.fillStyle = '#111';
+    context.fillRect(0, 0, canvas.width, canvas.height);
+    frame.strips.forEach((hex, row) => drawStrip(hex, row));
+
+    document.getElementById('simulator-fps').textContent = frame.fps.toFixed(1);
+    document.getElementById('simulator-frame-ms').textContent = frame.frame_ms.toFixed(3);
+    document.getElementById('simulator-frame').textContent = frame.frame;
+}
+
+// Nur den neuesten Frame pro Bildschirm-Aktualisierung zeichnen
+let pendingFrame = null;
+const source = new EventSource('/simulator/stream');
+source.onmessage = event => {
+    if (pendingFrame === null) {
+        requestAnimationFrame(() => {
+            drawFrame(pendingFrame);
+            pendingFrame = null;
+        });
+    }
+    pendingFrame = JSON.parse(event.data);
+};
+source.onerror = () => console.log("Verbindung zum Simulator unterbrochen, versuche erneut...");
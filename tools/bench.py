@@ -0,0 +1,385 @@
+"""
+Benchmark für Muster, Farbberechnung und Ausgabe - läuft ohne Raspberry Pi.
+
+Alle registrierten Audio- und Static-Muster werden mit virtuellen LED-Streifen und
+einem synthetischen Audioeingang für verschiedene LED-Anzahlen gerendert.
+
+    python -m tools.bench
+    python -m tools.bench --leds 20 60 144 --frames 500 --output bench.json
+    python -m tools.bench --save-baseline          # aktuelle Werte als Baseline speichern
+    python -m tools.bench --fail-on-regression     # Exit-Code 1 bei Verschlechterung
+
+Ohne numpy laufen nur die Static-Muster und die Farbberechnung ohne NumPy;
+Audio-Muster, externe Frames und Modulation werden übersprungen.
+"""
+import argparse
+import colorsys
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from config.config import Config
+from led_controllers.audio_input import SyntheticAudioInput
+from led_controllers.output import Color, VirtualStrip
+from led_controllers.palette import palettes
+from led_controllers.render_context import ManualClock, RenderContext
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+DEFAULT_LED_COUNTS = (20, 60, 144, 300)
+SCHEMA_VERSION = 1
+
+
+def percentile(sorted_values, q):
+    """Quantil (0.0 - 1.0) mit linearer Interpolation aus einer sortierten Liste"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summarize(durations, frame_delays=None):
+    """
+    Kennzahlen einer Messreihe (Zeiten in Mikrosekunden).
+
+    :param durations: Dauer pro Frame in Sekunden
+    :param frame_delays: Vom Muster gewünschte Wartezeit pro Frame (optional)
+    """
+    values = sorted(durations)
+    mean = sum(values) / len(values)
+    summary = {
+        "frames": len(values),
+        "mean_us": round(mean * 1e6, 2),
+        "p50_us": round(percentile(values, 0.50) * 1e6, 2),
+        "p90_us": round(percentile(values, 0.90) * 1e6, 2),
+        "p99_us": round(percentile(values, 0.99) * 1e6, 2),
+        "max_us": round(values[-1] * 1e6, 2),
+        # Obergrenze, wenn nur gerechnet und nie gewartet würde
+        "max_fps": round(1.0 / mean, 1) if mean > 0 else None,
+    }
+    if frame_delays is not None:
+        # Tatsächliche Bildrate im LED-Manager: Rechenzeit + feste Pause + Wartezeit des Musters
+        mean_delay = sum(frame_delays) / len(frame_delays)
+        summary["paced_fps"] = round(1.0 / (mean + Config.FRAME_PAUSE + mean_delay), 1)
+    return summary
+
+
+def _measure(step, frames, warmup):
+    """Führt step() aus und misst die Dauer jedes Aufrufs"""
+    for _ in range(warmup):
+        step()
+    durations = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        step()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _measure_allocations(step, frames):
+    """
+    Speicherbedarf pro Frame über tracemalloc (eigener Durchlauf, da tracemalloc bremst).
+
+    :return: Dictionary mit Spitzenwert pro Frame und dauerhaft belegtem Speicher
+    """
+    tracemalloc.start()
+    try:
+        step()
+        baseline, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            step()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    peaks.sort()
+    return {
+        "alloc_peak_bytes_p50": int(percentile(peaks, 0.5)),
+        "alloc_peak_bytes_max": peaks[-1],
+        "retained_bytes": current - baseline,
+    }
+
+
+def _import_numpy(benchmark):
+    """numpy, falls installiert (sonst None und Hinweis, dass benchmark übersprungen wird)"""
+    try:
+        import numpy
+    except ImportError as e:
+        print(f"Benchmark {benchmark} wird übersprungen ({e})")
+        return None
+    return numpy
+
+
+def _load_visualizers():
+    """
+    Lädt die Visualizer-Klassen. Fehlt numpy, werden die Audio-Muster übersprungen.
+
+    :return: Liste von (Art, Klasse, Musterliste, Config-Attribut)
+    """
+    from led_controllers.pattern_visualizer import PatternVisualizer
+    visualizers = [('static', PatternVisualizer, Config.STATIC_PATTERNS, 'STATIC_PATTERN')]
+    try:
+        from led_controllers.audio_visualizer import AudioVisualizer
+    except ImportError as e:
+        print(f"Audio-Muster werden übersprungen ({e})")
+    else:
+        visualizers.insert(0, ('audio', AudioVisualizer, Config.AUDIO_PATTERNS, 'AUDIO_PATTERN'))
+    return visualizers
+
+
+def bench_patterns(led_counts, frames, warmup, seed, allocations):
+    results = []
+    for kind, visualizer_class, patterns, attribute in _load_visualizers():
+        for led_count in led_counts:
+            for pattern in patterns:
+                Config.LED_PER_STRIP = led_count
+                setattr(Config, attribute, pattern)
+                # Feste Uhr und fester Zufall: jeder Lauf rendert dieselben Frames
+                context = RenderContext(ManualClock(), seed)
+
+                strips = (VirtualStrip(led_count), VirtualStrip(led_count))
+                if kind == 'audio':
+                    visualizer = visualizer_class(strips=strips, audio_input=SyntheticAudioInput(seed=seed), context=context)
+                else:
+                    visualizer = visualizer_class(strips=strips, context=context)
+
+                frame_delays = []
+
+                def step():
+                    visualizer.update()
+                    frame_delays.append(visualizer.frame_delay)
+                    context.clock.advance(Config.FRAME_PAUSE + visualizer.frame_delay)
+
+                durations = _measure(step, frames, warmup)
+                result = {"kind": kind, "name": pattern, "led_count": led_count}
+                result.update(_summarize(durations, frame_delays[warmup:]))
+                if allocations:
+                    result.update(_measure_allocations(step, min(frames, 100)))
+                if kind == 'static':
+                    # Speicher des Animationszustands (siehe led_controllers/pattern_state.py)
+                    result["state_bytes"] = visualizer.states.nbytes
+                results.append(result)
+                print(_format_row(result))
+
+                if kind == 'audio':
+                    visualizer.stop_audio_stream()
+                else:
+                    visualizer.states.release()
+    return results
+
+
+def bench_color_and_output(led_counts, frames, warmup):
+    """Farbberechnung (HSV -> Color bzw. Paletten-LUT) und Ausgabe (alle LEDs setzen + show) für sich allein"""
+    palette = palettes.get('rainbow')
+    np = _import_numpy("palette_lut_array")
+    results = []
+    for led_count in led_counts:
+        strips = (VirtualStrip(led_count), VirtualStrip(led_count))
+
+        def hsv_colors():
+            for i in range(led_count):
+                r, g, b = colorsys.hsv_to_rgb(i / led_count, 1.0, 1.0)
+                Color(int(r * 255), int(g * 255), int(b * 255))
+
+        def lut_colors():
+            for i in range(led_count):
+                palette.sample(i / led_count, 255)
+
+        def lut_array():
+            palette.sample_array(np.arange(led_count) / led_count, 255)
+
+        def output():
+            color = Color(255, 255, 255)
+            for strip in strips:
+                for i in range(led_count):
+                    strip.setPixelColor(i, color)
+                strip.show()
+
+        steps = [('color', 'hsv_to_color', hsv_colors), ('color', 'palette_lut', lut_colors)]
+        if np is not None:
+            steps.append(('color', 'palette_lut_array', lut_array))
+        steps.append(('output', 'set_and_show', output))
+        for kind, name, step in steps:
+            result = {"kind": kind, "name": name, "led_count": led_count}
+            result.update(_summarize(_measure(step, frames, warmup)))
+            results.append(result)
+            print(_format_row(result))
+    return results
+
+
+def bench_ingest(led_counts, frames, warmup):
+    """Externe Frames: rohe RGB-Bytes übernehmen, umrechnen und auf beide Streifen ausgeben"""
+    if _import_numpy("raw_rgb_frame") is None:
+        return []
+    from led_controllers.frame_ingest import ExternalFrameVisualizer, FrameBuffer
+    results = []
+    for led_count in led_counts:
+        frame_buffer = FrameBuffer(led_count)
+        strips = (VirtualStrip(led_count), VirtualStrip(led_count))
+        visualizer = ExternalFrameVisualizer(frame_buffer, strips)
+        payload = bytes(range(256)) * (frame_buffer.frame_bytes // 256) + bytes(frame_buffer.frame_bytes % 256)
+
+        def step():
+            frame_buffer.write(payload, 'bench')
+            visualizer.update()
+
+        result = {"kind": "ingest", "name": "raw_rgb_frame", "led_count": led_count}
+        result.update(_summarize(_measure(step, frames, warmup)))
+        results.append(result)
+        print(_format_row(result))
+    return results
+
+
+def bench_modulation(frames, warmup, seed):
+    """Audio-Merkmale inkl. Frequenzbänder und Modulationsmatrix mit acht Routen für einen Chunk (unabhängig von der LED-Anzahl)"""
+    np = _import_numpy("modulation")
+    if np is None:
+        return []
+    from led_controllers.audio_features import AudioFeatures, FEATURES
+    from led_controllers.modulation import ModulationMatrix, validate_routes
+    Config.apply_settings({'modulation': validate_routes([
+        {"source": source, "target": "audio_pattern_06.width", "curve": "smoothstep", "smoothing": 0.5}
+        for source in FEATURES
+    ], Config)})
+    audio = SyntheticAudioInput(seed=seed)
+    audio.open()
+    features = AudioFeatures()
+    matrix = ModulationMatrix()
+    now = [0.0]
+
+    def step():
+        data = np.frombuffer(audio.read(), dtype=np.int16)
+        left = data[0::2].astype(np.float64)
+        right = data[1::2].astype(np.float64)
+        now[0] += audio.chunk / audio.rate
+        matrix.sync(Config)
+        matrix.evaluate(features.update(0.5, 0.4, now[0], left, right, rate=audio.rate, bands=matrix.needs_bands))
+
+    result = {"kind": "audio", "name": "modulation", "led_count": 0}
+    result.update(_summarize(_measure(step, frames, warmup)))
+    audio.close()
+    print(_format_row(result))
+    return [result]
+
+
+def _format_row(result):
+    row = (f"{result['kind']:<7} {result['name']:<18} {result['led_count']:>5} LEDs  "
+           f"p50 {result['p50_us']:>9.1f} µs  p99 {result['p99_us']:>9.1f} µs  "
+           f"max {result['max_fps'] or 0:>9.0f} FPS")
+    if 'state_bytes' in result:
+        row += f"  Zustand {result['state_bytes']:>6} B"
+    return row
+
+
+def _result_key(result):
+    return (result['kind'], result['name'], result['led_count'])
+
+
+def compare(results, baseline, threshold):
+    """
+    Vergleicht die Ergebnisse mit einer Baseline.
+
+    :param threshold: Relative Verschlechterung des Medians, ab der eine Regression gemeldet wird
+    :return: Liste der Regressionen (Dictionaries mit Schlüssel und Änderung)
+    """
+    previous = {_result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+
+    print(f"\nVergleich mit Baseline ({baseline.get('meta', {}).get('created', 'unbekannt')}):")
+    for result in results:
+        old = previous.get(_result_key(result))
+        if old is None or not old.get('p50_us'):
+            continue
+        change = (result['p50_us'] - old['p50_us']) / old['p50_us']
+        marker = ''
+        if change > threshold:
+            marker = '  <-- REGRESSION'
+            regressions.append({"kind": result['kind'], "name": result['name'], "led_count": result['led_count'],
+                                "baseline_p50_us": old['p50_us'], "p50_us": result['p50_us'],
+                                "change": round(change, 4)})
+        print(f"{result['kind']:<7} {result['name']:<18} {result['led_count']:>5} LEDs  "
+              f"{old['p50_us']:>9.1f} -> {result['p50_us']:>9.1f} µs  {change * 100:+6.1f} %{marker}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für LED-Muster ohne Hardware")
+    parser.add_argument('--leds', type=int, nargs='+', default=list(DEFAULT_LED_COUNTS), help="LED-Anzahlen pro Streifen")
+    parser.add_argument('--frames', type=int, default=300, help="Gemessene Frames pro Muster")
+    parser.add_argument('--warmup', type=int, default=30, help="Frames vor der Messung")
+    parser.add_argument('--seed', type=int, default=0, help="Startwert für Zufall und synthetisches Audio")
+    parser.add_argument('--no-alloc', action='store_true', help="Keine Speichermessung mit tracemalloc")
+    parser.add_argument('--output', help="Ergebnisse als JSON in diese Datei schreiben")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline zum Vergleich")
+    parser.add_argument('--save-baseline', action='store_true', help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Erlaubte Verschlechterung des Medians (0.15 = 15 %%)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit-Code 1 bei Regressionen")
+    args = parser.parse_args(argv)
+
+    if args.frames <= 0 or args.warmup < 0 or any(count <= 0 for count in args.leds):
+        parser.error("Frames und LED-Anzahlen müssen größer als 0 sein")
+
+    # Benchmark-Läufe sollen die Einstellungen der Anwendung nicht verändern
+    saved_settings = Config.snapshot()
+    saved_version = Config.CONFIG_VERSION
+    saved_led_count = Config.LED_PER_STRIP
+    try:
+        results = bench_patterns(args.leds, args.frames, args.warmup, args.seed, not args.no_alloc)
+        results += bench_color_and_output(args.leds, args.frames, args.warmup)
+        results += bench_ingest(args.leds, args.frames, args.warmup)
+        results += bench_modulation(args.frames, args.warmup, args.seed)
+    finally:
+        Config.apply_settings(saved_settings, saved_version)
+        Config.LED_PER_STRIP = saved_led_count
+
+    report = {
+        "meta": {
+            "schema": SCHEMA_VERSION,
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = regressions
+    elif not args.save_baseline:
+        print(f"\nKeine Baseline unter {args.baseline} (mit --save-baseline anlegen)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Ergebnisse gespeichert: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline gespeichert: {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} Regression(en) gegenüber der Baseline")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
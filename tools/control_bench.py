@@ -0,0 +1,91 @@
+"""
+Benchmark für den Steuer-Socket (utils/control_socket.py): Round-Trip-Zeit
+pro Befehl über den Unix-Socket bis zur Antwort.
+
+Ein LED-Manager mit virtuellen Streifen läuft dabei wie im Betrieb im
+Hintergrund (Static-Modus), die Einstellungen laufen also durch dieselbe
+Befehlswarteschlange wie bei /settings.
+
+    python -m tools.control_bench
+    python -m tools.control_bench --requests 5000 --fail-above-ms 1.0
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from config.config import Config
+from tools.bench import percentile
+from utils.control_socket import ControlClient, ControlServer
+
+
+def _round_trips(client, lines, requests):
+    """Sendet die Befehle reihum und misst jede Antwortzeit in Sekunden"""
+    durations = []
+    for n in range(requests):
+        start = time.perf_counter()
+        client.request(lines[n % len(lines)])
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-Trip-Zeit des Steuer-Sockets")
+    parser.add_argument('--requests', type=int, default=2000, help="Gemessene Befehle pro Art")
+    parser.add_argument('--warmup', type=int, default=100, help="Befehle vor der Messung")
+    parser.add_argument('--fail-above-ms', type=float, help="Exit-Code 1, wenn ein p99 darüber liegt")
+    args = parser.parse_args(argv)
+
+    if args.requests <= 0 or args.warmup < 0:
+        parser.error("--requests muss größer als 0 sein")
+
+    # Der Benchmark soll die Einstellungen der Anwendung nicht verändern
+    saved_settings = Config.snapshot()
+    saved_version = Config.CONFIG_VERSION
+    saved_output = Config.LED_OUTPUT
+    saved_store = Config.CONFIG_STORE_FILE
+    Config.LED_OUTPUT = 'virtual'
+    Config.CONFIG_STORE_FILE = None
+    Config.apply_settings({'visualization_mode': 'static'}, saved_version)
+
+    from utils.led_manager import LEDManager
+    led_manager = LEDManager(boot_animation=False)
+    path = os.path.join(tempfile.mkdtemp(prefix='pivoltmeter-'), 'control.sock')
+    server = ControlServer(led_manager, path)
+    cases = (
+        ('ping', ['ping']),
+        ('get', ['get']),
+        ('stats', ['stats']),
+        # Ohne Übergangsanimation, sonst misst der Lauf vor allem die Animation
+        ('set brightness', ['set brightness=40 transition=0', 'set brightness=60 transition=0']),
+    )
+    failed = False
+    try:
+        led_manager.start_visualization()
+        led_manager.hardware_ready.wait(10)
+        server.start()
+        with ControlClient(path) as client:
+            for name, lines in cases:
+                _round_trips(client, lines, args.warmup)
+                values = sorted(_round_trips(client, lines, args.requests))
+                p50 = percentile(values, 0.50) * 1000
+                p99 = percentile(values, 0.99) * 1000
+                print(f"{name:<15} p50 {p50:7.3f} ms  p99 {p99:7.3f} ms  max {values[-1] * 1000:7.3f} ms")
+                if args.fail_above_ms is not None and p99 > args.fail_above_ms:
+                    failed = True
+    finally:
+        server.stop()
+        led_manager.stop_visualization()
+        Config.apply_settings(saved_settings, saved_version)
+        Config.LED_OUTPUT = saved_output
+        Config.CONFIG_STORE_FILE = saved_store
+
+    if failed:
+        print(f"p99 über {args.fail_above_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
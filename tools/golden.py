@@ -0,0 +1,206 @@
+"""
+Golden-Frame-Vergleich für alle Muster.
+
+Jede Kombination aus Muster, Farbe und LED-Anzahl wird mit festem seed,
+synthetischem Audio und fester Bildrate offline gerendert (siehe OfflineRenderer)
+und mit einer gespeicherten Golden-Datei verglichen. So lässt sich zeigen, dass
+eine Optimierung die Ausgabe nicht verändert.
+
+    python -m tools.golden check                     # gegen tools/golden/ prüfen
+    python -m tools.golden check --tolerance 2       # Abweichung bis 2 pro Farbkanal erlauben
+    python -m tools.golden record                    # Golden-Dateien (neu) schreiben
+    python -m tools.golden record --pattern static_pattern_04
+
+Format einer Golden-Datei (<muster>-<farbe>-<leds>.golden): gzip-komprimiertes
+JSON mit den Render-Parametern und allen Frames als Base64-kodierte RGB-Bytes
+(pro Frame erst Streifen 1, dann Streifen 2, je LED R, G, B).
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import sys
+
+from config.config import Config
+from led_controllers.offline_renderer import OfflineRenderer
+
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+DEFAULT_COLORS = ('rainbow', 'green', 'red')
+DEFAULT_LED_COUNTS = (20, 60)
+DEFAULT_FRAMES = 120
+DEFAULT_FPS = 30
+DEFAULT_SEED = 1
+FORMAT_VERSION = 1
+
+
+def _golden_path(directory, pattern, color, led_count):
+    return os.path.join(directory, f"{pattern}-{color}-{led_count}.golden")
+
+
+def render_rgb(pattern, color, led_count, frames, fps, seed):
+    """
+    Rendert die Frames einer Kombination.
+
+    :return: bytes mit allen Frames hintereinander
+    """
+    renderer = OfflineRenderer(pattern, led_count=led_count, color=color, seed=seed, fps=fps)
+    data = bytearray()
+    try:
+        for _, strip_one, strip_two in renderer.frames(frames):
+            for color_value in strip_one + strip_two:
+                data += bytes(((color_value >> 16) & 0xFF, (color_value >> 8) & 0xFF, color_value & 0xFF))
+    finally:
+        renderer.close()
+    return bytes(data)
+
+
+def write_golden(path, meta, rgb):
+    document = dict(meta, format=FORMAT_VERSION, rgb=base64.b64encode(rgb).decode('ascii'))
+    # mtime=0, damit unveränderte Frames auch eine bytegleiche Datei ergeben
+    with open(path, 'wb') as f:
+        f.write(gzip.compress(json.dumps(document, sort_keys=True).encode('utf-8'), mtime=0))
+
+
+def read_golden(path):
+    """
+    :return: Tupel (Parameter, RGB-Bytes)
+    :raises ValueError: Bei unbekanntem Dateiformat
+    """
+    with open(path, 'rb') as f:
+        document = json.loads(gzip.decompress(f.read()).decode('utf-8'))
+    if document.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unbekanntes Format {document.get('format')}")
+    rgb = base64.b64decode(document.pop('rgb'))
+    document.pop('format')
+    return document, rgb
+
+
+def diff_frames(expected, actual, led_count, tolerance):
+    """
+    Vergleicht zwei Frame-Folgen pixelweise.
+
+    :param tolerance: Erlaubte Abweichung pro Farbkanal (0 = exakt)
+    :return: None bei Übereinstimmung, sonst Dictionary mit den Abweichungen
+    """
+    if len(expected) != len(actual):
+        return {"message": f"Länge unterschiedlich ({len(expected)} statt {len(actual)} Bytes erwartet)"}
+
+    frame_bytes = led_count * 2 * 3
+    bad_pixels = 0
+    max_difference = 0
+    first = None
+
+    for offset in range(0, len(expected), 3):
+        difference = max(abs(expected[offset + channel] - actual[offset + channel]) for channel in range(3))
+        if difference > tolerance:
+            bad_pixels += 1
+            max_difference = max(max_difference, difference)
+            if first is None:
+                frame, position = divmod(offset, frame_bytes)
+                strip, led = divmod(position // 3, led_count)
+                first = {
+                    "frame": frame,
+                    "strip": strip + 1,
+                    "led": led,
+                    "expected": tuple(expected[offset:offset + 3]),
+                    "actual": tuple(actual[offset:offset + 3]),
+                }
+
+    if bad_pixels == 0:
+        return None
+    return {
+        "message": f"{bad_pixels} Pixel weichen ab (max. {max_difference} pro Kanal)",
+        "pixels": bad_pixels,
+        "max_difference": max_difference,
+        "first": first,
+    }
+
+
+def _combinations(args):
+    patterns = args.pattern or (Config.AUDIO_PATTERNS + Config.STATIC_PATTERNS)
+    for pattern in patterns:
+        for color in args.color:
+            for led_count in args.leds:
+                yield pattern, color, led_count
+
+
+def record(args):
+    os.makedirs(args.directory, exist_ok=True)
+    for pattern, color, led_count in _combinations(args):
+        try:
+            rgb = render_rgb(pattern, color, led_count, args.frames, args.fps, args.seed)
+        except ImportError as e:
+            print(f"ÜBERSPRUNGEN {pattern} ({e})")
+            continue
+        meta = {"pattern": pattern, "color": color, "led_count": led_count,
+                "frames": args.frames, "fps": args.fps, "seed": args.seed}
+        path = _golden_path(args.directory, pattern, color, led_count)
+        write_golden(path, meta, rgb)
+        print(f"GESPEICHERT {os.path.relpath(path)} ({os.path.getsize(path)} Bytes)")
+    return 0
+
+
+def check(args):
+    failures = 0
+    missing = 0
+    for pattern, color, led_count in _combinations(args):
+        name = f"{pattern} {color} {led_count} LEDs"
+        path = _golden_path(args.directory, pattern, color, led_count)
+        if not os.path.exists(path):
+            print(f"FEHLT       {name}")
+            missing += 1
+            continue
+
+        meta, expected = read_golden(path)
+        try:
+            # Mit den gespeicherten Parametern rendern, nicht mit den Kommandozeilenwerten
+            actual = render_rgb(pattern, color, led_count, meta['frames'], meta['fps'], meta['seed'])
+        except ImportError as e:
+            print(f"ÜBERSPRUNGEN {name} ({e})")
+            missing += 1
+            continue
+
+        difference = diff_frames(expected, actual, led_count, args.tolerance)
+        if difference is None:
+            print(f"OK          {name}")
+        else:
+            failures += 1
+            print(f"ABWEICHUNG  {name}: {difference['message']}")
+            if difference.get('first'):
+                first = difference['first']
+                print(f"            erstes Pixel: Frame {first['frame']}, Streifen {first['strip']}, "
+                      f"LED {first['led']}: erwartet {first['expected']}, erhalten {first['actual']}")
+
+    print(f"\n{failures} Abweichung(en), {missing} ohne Golden-Datei oder übersprungen")
+    if failures or (args.strict and missing):
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden-Frame-Vergleich für alle Muster")
+    parser.add_argument('command', choices=['check', 'record'])
+    parser.add_argument('--pattern', action='append', help="Nur dieses Muster (mehrfach möglich)")
+    parser.add_argument('--color', nargs='+', default=list(DEFAULT_COLORS), help="Farben")
+    parser.add_argument('--leds', type=int, nargs='+', default=list(DEFAULT_LED_COUNTS), help="LED-Anzahlen pro Streifen")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="Frames pro Kombination (nur record)")
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS, help="Bildrate der virtuellen Uhr (nur record)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Startwert für Zufall und Audio (nur record)")
+    parser.add_argument('--tolerance', type=int, default=0, help="Erlaubte Abweichung pro Farbkanal (nur check)")
+    parser.add_argument('--strict', action='store_true', help="Fehlende Golden-Dateien als Fehler werten (nur check)")
+    parser.add_argument('--directory', default=GOLDEN_DIR, help="Verzeichnis der Golden-Dateien")
+    args = parser.parse_args(argv)
+
+    for pattern in args.pattern or ():
+        if pattern not in Config.AUDIO_PATTERNS + Config.STATIC_PATTERNS:
+            parser.error(f"Unbekanntes Muster: {pattern}")
+
+    if args.command == 'record':
+        return record(args)
+    return check(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
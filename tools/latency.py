@@ -0,0 +1,238 @@
+"""
+Messung der Latenz von Audio bis Licht.
+
+Ein synthetischer Klick-Takt wird in Echtzeit über die Audio-Schnittstelle
+eingespeist. Für jeden Klick werden die Zeitpunkte festgehalten, an denen er
+gelesen (capture), analysiert (analysis), gerendert (render) und ausgegeben
+(show) wurde, sowie der erste ausgegebene Frame, in dem er sichtbar ist
+(visible, inklusive Glättung). Die Render-Schleife entspricht der des
+LED-Managers: update(), danach Config.FRAME_PAUSE + frame_delay warten.
+
+    python -m tools.latency
+    python -m tools.latency --chunks 256 512 1024 2048 --pauses 0 0.005 0.01 0.02 --seconds 5
+    python -m tools.latency --hardware --output latency.json   # echte LED-Streifen (auf dem Pi)
+
+Alle Latenzen in Millisekunden, gemessen ab dem Zeitpunkt, an dem der Klick
+"am Mikrofon" ankam.
+"""
+import argparse
+import json
+import sys
+import time
+from array import array
+
+from config.config import Config
+from led_controllers.audio_input import SyntheticAudioInput
+from led_controllers.output import VirtualStrip, create_strips
+from tools.bench import percentile
+
+
+STAGES = ('capture', 'analysis', 'render', 'show', 'visible')
+
+
+class ClickTrainAudioInput(SyntheticAudioInput):
+    """
+    Audioeingang, der im Abstand von interval Sekunden einen kurzen, lauten Klick
+    liefert und sonst Stille. read() wartet wie ein echtes Gerät, bis der Chunk
+    "aufgenommen" ist, und merkt sich, welche Klicks im Chunk begannen.
+    """
+
+    def __init__(self, chunk, rate, max_channels=2, interval=0.5, click_seconds=0.005):
+        super().__init__(chunk, rate, max_channels, realtime=True)
+        self.interval_frames = int(interval * rate)
+        if self.interval_frames <= chunk:
+            raise ValueError("Der Abstand der Klicks muss größer als ein Chunk sein")
+        self.click_frames = max(1, int(click_seconds * rate))
+        self.events = []
+        self.reads = 0
+        self.overruns = 0
+
+    def _generate(self):
+        # Genau ein Klick-Abstand, damit die Schleife nahtlos wiederholt wird
+        samples = array('h', [0]) * (self.interval_frames * self.channels)
+        for n in range(self.click_frames):
+            # Rechteck mit ca. 2 kHz bei 44,1 kHz
+            value = 20000 if (n // 11) % 2 == 0 else -20000
+            for channel in range(self.channels):
+                samples[n * self.channels + channel] = value
+        return samples.tobytes()
+
+    def read(self):
+        if self.get_read_available() >= self.chunk:
+            self.overruns += 1
+        first_frame = self._frames_read
+        data = super().read()
+        captured = time.perf_counter()
+        self.reads += 1
+
+        # Klick-Anfänge im gerade gelesenen Bereich [first_frame, first_frame + chunk)
+        click = -(-first_frame // self.interval_frames) * self.interval_frames
+        while click < first_frame + self.chunk:
+            self.events.append({'click': self._start_time + click / self.rate, 'capture': captured})
+            click += self.interval_frames
+        return data
+
+
+class TimedStrip:
+    """Reicht alle Aufrufe an einen Streifen weiter und misst dabei show()"""
+
+    def __init__(self, strip):
+        self._strip = strip
+        self.show_started = None
+        self.show_finished = None
+
+    def show(self):
+        self.show_started = time.perf_counter()
+        self._strip.show()
+        self.show_finished = time.perf_counter()
+
+    def __getattr__(self, name):
+        return getattr(self._strip, name)
+
+
+def _lit_leds(strip, led_count):
+    return sum(1 for i in range(led_count) if strip.getPixelColor(i) & 0xFFFFFF)
+
+
+def measure(chunk, frame_pause, seconds, pattern, interval, min_lit, hardware):
+    """
+    Misst eine Konfiguration aus Chunk-Größe und Frame-Pause.
+
+    :return: Dictionary mit Perzentilen je Stufe, Bildrate und Überläufen
+    """
+    # Import erst hier, da numpy nur für die Audio-Muster benötigt wird
+    from led_controllers.audio_visualizer import AudioVisualizer
+
+    saved = (Config.AUDIO_CHUNK, Config.FRAME_PAUSE, Config.AUDIO_PATTERN, Config.VISUALIZATION_MODE)
+    Config.AUDIO_CHUNK = chunk
+    Config.FRAME_PAUSE = frame_pause
+    Config.AUDIO_PATTERN = pattern
+    Config.VISUALIZATION_MODE = 'audio'
+    try:
+        led_count = Config.LED_PER_STRIP
+        if hardware:
+            strips = create_strips(Config)
+        else:
+            strips = (VirtualStrip(led_count), VirtualStrip(led_count))
+        # show_strips() gibt erst Streifen 1, dann Streifen 2 aus
+        strip_one, strip_two = TimedStrip(strips[0]), TimedStrip(strips[1])
+
+        source = ClickTrainAudioInput(chunk, Config.AUDIO_RATE, interval=interval)
+        visualizer = AudioVisualizer(strips=(strip_one, strip_two), audio_input=source)
+
+        frames = 0
+        waiting = []
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            known_events = len(source.events)
+            visualizer.update()
+            frames += 1
+
+            for event in source.events[known_events:]:
+                # Im selben Frame analysiert, gerendert und ausgegeben
+                event['analysis'] = visualizer.analysis_timestamp
+                event['render'] = strip_one.show_started
+                event['show'] = strip_two.show_finished
+                waiting.append(event)
+
+            if waiting and _lit_leds(strip_one, led_count) >= min_lit:
+                for event in waiting:
+                    event['visible'] = strip_two.show_finished
+                waiting = []
+
+            time.sleep(Config.FRAME_PAUSE + visualizer.frame_delay)
+
+        visualizer.stop_audio_stream()
+        visualizer.clear_leds()
+    finally:
+        Config.AUDIO_CHUNK, Config.FRAME_PAUSE, Config.AUDIO_PATTERN, Config.VISUALIZATION_MODE = saved
+
+    # Der erste Klick fällt in den Start des Streams und wird nicht gewertet
+    events = source.events[1:]
+    result = {
+        "chunk": chunk,
+        "chunk_ms": round(chunk / Config.AUDIO_RATE * 1000, 2),
+        "frame_pause_ms": round(frame_pause * 1000, 2),
+        "fps": round(frames / seconds, 1),
+        "events": len(events),
+        "not_visible": sum(1 for event in events if 'visible' not in event),
+        "reads": source.reads,
+        "overruns": source.overruns,
+        "overrun_ratio": round(source.overruns / source.reads, 4) if source.reads else None,
+    }
+    for stage in STAGES:
+        latencies = sorted((event[stage] - event['click']) * 1000 for event in events if event.get(stage) is not None)
+        if latencies:
+            result[stage] = {
+                "p50_ms": round(percentile(latencies, 0.5), 2),
+                "p90_ms": round(percentile(latencies, 0.9), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max_ms": round(latencies[-1], 2),
+            }
+    return result
+
+
+def keeps_up(result, max_overrun_ratio):
+    """Die Schleife liest schnell genug und jeder Klick wurde sichtbar"""
+    return (result['events'] > 0 and result['not_visible'] == 0
+            and result['overrun_ratio'] is not None and result['overrun_ratio'] <= max_overrun_ratio)
+
+
+def _format_row(result, ok):
+    parts = [f"Chunk {result['chunk']:>5} ({result['chunk_ms']:5.1f} ms)  Pause {result['frame_pause_ms']:5.1f} ms  "
+             f"{result['fps']:6.1f} FPS"]
+    for stage in STAGES:
+        stats = result.get(stage)
+        parts.append(f"{stage} {stats['p50_ms']:6.1f}/{stats['p99_ms']:6.1f}" if stats else f"{stage}      -")
+    parts.append(f"Überläufe {result['overrun_ratio'] * 100 if result['overrun_ratio'] is not None else 0:5.1f} %")
+    parts.append("ok" if ok else "HÄLT NICHT MIT")
+    return "  ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latenz von Audio bis Licht messen")
+    parser.add_argument('--chunks', type=int, nargs='+', default=[Config.AUDIO_CHUNK], help="Chunk-Größen in Samples")
+    parser.add_argument('--pauses', type=float, nargs='+', default=[Config.FRAME_PAUSE], help="Frame-Pausen in Sekunden")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Messdauer pro Konfiguration")
+    parser.add_argument('--pattern', default='audio_pattern_01', choices=Config.AUDIO_PATTERNS, help="Audio-Muster")
+    parser.add_argument('--interval', type=float, default=0.5, help="Abstand der Klicks in Sekunden")
+    parser.add_argument('--min-lit', type=int, default=1, help="Ab so vielen leuchtenden LEDs gilt ein Klick als sichtbar")
+    parser.add_argument('--max-overrun-ratio', type=float, default=0.01, help="Erlaubter Anteil an Lesevorgängen mit Rückstau")
+    parser.add_argument('--hardware', action='store_true', help="Echte LED-Streifen verwenden (Config.LED_OUTPUT)")
+    parser.add_argument('--output', help="Ergebnisse als JSON in diese Datei schreiben")
+    args = parser.parse_args(argv)
+
+    if args.seconds <= 0 or any(chunk <= 0 for chunk in args.chunks) or any(pause < 0 for pause in args.pauses):
+        parser.error("Dauer und Chunk-Größen müssen größer als 0, Pausen mindestens 0 sein")
+
+    print("Latenzen p50/p99 in ms ab Klick:")
+    results = []
+    for chunk in args.chunks:
+        for pause in args.pauses:
+            try:
+                result = measure(chunk, pause, args.seconds, args.pattern, args.interval, args.min_lit, args.hardware)
+            except ValueError as e:
+                print(f"Chunk {chunk}: {e}")
+                continue
+            result['keeps_up'] = keeps_up(result, args.max_overrun_ratio)
+            results.append(result)
+            print(_format_row(result, result['keeps_up']))
+
+    # Niedrigste sichtbare Latenz unter den Konfigurationen, die mithalten
+    candidates = [result for result in results if result['keeps_up'] and 'visible' in result]
+    best = min(candidates, key=lambda result: (result['visible']['p50_ms'], result['visible']['p99_ms']), default=None)
+    if best:
+        print(f"\nEmpfehlung: AUDIO_CHUNK = {best['chunk']}, FRAME_PAUSE = {best['frame_pause_ms'] / 1000:g} "
+              f"(sichtbar nach {best['visible']['p50_ms']:.1f} ms, p99 {best['visible']['p99_ms']:.1f} ms)")
+    else:
+        print("\nKeine Konfiguration hält mit")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"pattern": args.pattern, "results": results, "best": best}, f, indent=2)
+        print(f"Ergebnisse gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
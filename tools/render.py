@@ -0,0 +1,51 @@
+"""
+Rendert ein Muster offline (ohne Hardware, schneller als Echtzeit) in eine Datei.
+
+Format der Ausgabe: pro Frame erst alle LEDs von Streifen 1, dann von Streifen 2,
+je LED 3 Byte (R, G, B) ohne Helligkeitsskalierung.
+
+    python -m tools.render static_pattern_04 --seconds 3600 --seed 1 --output matrix.rgb
+"""
+import argparse
+import sys
+import time
+
+from led_controllers.offline_renderer import OfflineRenderer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Muster offline rendern")
+    parser.add_argument('pattern', help="Name des Musters, z.B. static_pattern_01")
+    parser.add_argument('--seconds', type=float, default=60.0, help="Dauer in Sekunden (Zeit der virtuellen Uhr)")
+    parser.add_argument('--fps', type=float, help="Feste Bildrate (Standard: Taktung wie im LED-Manager)")
+    parser.add_argument('--leds', type=int, help="LEDs pro Streifen")
+    parser.add_argument('--color', help="Farbe, z.B. rainbow oder red")
+    parser.add_argument('--seed', type=int, default=0, help="Startwert für Zufall und synthetisches Audio")
+    parser.add_argument('--output', required=True, help="Zieldatei für die RGB-Frames")
+    args = parser.parse_args(argv)
+
+    try:
+        renderer = OfflineRenderer(args.pattern, led_count=args.leds, color=args.color, seed=args.seed, fps=args.fps)
+    except ValueError as e:
+        parser.error(str(e))
+
+    frames = 0
+    start = time.perf_counter()
+    with open(args.output, 'wb') as f:
+        while renderer.clock.now() < args.seconds:
+            _, strip_one, strip_two = renderer.render_frame()
+            data = bytearray()
+            for color in strip_one + strip_two:
+                data += bytes(((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF))
+            f.write(data)
+            frames += 1
+    renderer.close()
+
+    duration = time.perf_counter() - start
+    print(f"{frames} Frames ({args.seconds:.0f} s Musterzeit) in {duration:.2f} s gerendert "
+          f"({args.seconds / duration if duration else 0:.0f}x Echtzeit) -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
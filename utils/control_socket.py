@@ -0,0 +1,262 @@
+"""
+Steuerung über einen Unix-Socket mit einem einfachen Zeilenprotokoll.
+
+Für lokale Automatisierung ohne HTTP: Jede Zeile ist ein Befehl, die Antwort
+ist genau eine Zeile, die mit 'ok' oder 'err' beginnt.
+
+    ping                                 -> ok pong
+    get                                  -> ok {"visualization_mode": "audio", ..., "version": 3}
+    stats                                -> ok {"mode": "audio", "last_frame_ms": 1.2, ...}
+    set mode=static pattern=static_pattern_02 color=fire brightness=80
+                                         -> ok 4   (neue Konfigurationsversion)
+    mode static | pattern ... | color ... | brightness 80
+                                         -> Kurzform von set mit einer Einstellung
+    param static_pattern_04 density 0.3  -> ok 5   (Parameter aus Config.PATTERN_PARAMETERS)
+
+Optionen für set: transition=0 (ohne Übergangsanimation), if_version=N
+(nur übernehmen, wenn N die aktuelle Version ist). Die Einstellungen laufen
+wie bei /settings über LEDManager.submit_settings(). 'get' liefert nur
+Config.snapshot() ohne Anzeige-Texte und IP-Adressen.
+
+    python3 -c "import socket; s = socket.socket(socket.AF_UNIX); s.connect('state/control.sock'); s.sendall(b'color fire\\n'); print(s.recv(100))"
+"""
+import json
+import os
+import socket
+import threading
+from config.config import Config
+from utils.led_manager import ConfigVersionConflict
+from utils.metrics import metrics
+
+
+CONTROL_COMMANDS = metrics.counter(
+    'pivoltmeter_control_commands',
+    'Über den Steuer-Socket empfangene Befehle',
+    labelnames=('command', 'status')
+)
+
+# Kurznamen -> Schlüssel wie bei /settings
+SETTING_ALIASES = {
+    'mode': 'visualization_mode',
+    'color': 'led_color',
+    'colour': 'led_color',
+    'brightness': 'led_brightness',
+}
+SETTING_KEYS = ('visualization_mode', 'audio_pattern', 'static_pattern', 'pattern', 'led_color', 'led_brightness')
+# Bekannte Befehle; andere erscheinen in den Metriken als 'unknown', damit Clients keine beliebigen Label-Werte erzeugen
+COMMANDS = ('ping', 'get', 'stats', 'set', 'param', 'mode', 'pattern', 'color', 'colour', 'brightness')
+
+
+def parse_settings(arguments):
+    """
+    Übersetzt 'schlüssel=wert'-Paare in Einstellungen und Optionen.
+
+    :param arguments: Liste der Wörter nach 'set'
+    :return: Tupel (settings, transition, expected_version)
+    :raises ValueError: Bei ungültigen Paaren
+    """
+    settings = {}
+    transition = True
+    expected_version = None
+    for argument in arguments:
+        key, separator, value = argument.partition('=')
+        if not separator or not value:
+            raise ValueError(f"Erwartet schlüssel=wert, nicht '{argument}'")
+        key = SETTING_ALIASES.get(key, key)
+        if key == 'transition':
+            transition = value not in ('0', 'false', 'no')
+        elif key == 'if_version':
+            try:
+                expected_version = int(value)
+            except ValueError:
+                raise ValueError(f"Ungültige Version: {value}")
+        elif key == 'led_brightness':
+            try:
+                settings[key] = int(value)
+            except ValueError:
+                raise ValueError(f"Ungültige Helligkeit: {value}")
+        elif key in SETTING_KEYS:
+            settings[key] = value
+        else:
+            raise ValueError(f"Unbekannte Einstellung: {key}")
+    if not settings:
+        raise ValueError("Keine Einstellungen angegeben")
+    return settings, transition, expected_version
+
+
+class ControlServer:
+    """Beantwortet Befehle auf einem Unix-Stream-Socket, ein Thread pro Verbindung"""
+
+    def __init__(self, led_manager, path, mode=0o660):
+        """
+        :param led_manager: LEDManager, an den Einstellungen übergeben werden
+        :param path: Pfad des Sockets
+        :param mode: Dateirechte des Sockets (Zugriff = volle Steuerung)
+        """
+        self.led_manager = led_manager
+        self.path = path
+        self.mode = mode
+        self._socket = None
+        self._running = False
+
+    @classmethod
+    def from_config(cls, config, led_manager):
+        """
+        :return: ControlServer oder None, wenn config.CONTROL_SOCKET nicht gesetzt ist
+        """
+        if not config.CONTROL_SOCKET:
+            return None
+        return cls(led_manager, config.CONTROL_SOCKET, mode=config.CONTROL_SOCKET_MODE)
+
+    def start(self):
+        """Öffnet den Socket und nimmt im Hintergrund Verbindungen an"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self.path)
+        os.chmod(self.path, self.mode)
+        self._socket.listen(8)
+        self._running = True
+        thread = threading.Thread(target=self._accept_loop, name="control-socket")
+        thread.daemon = True
+        thread.start()
+        print(f"Steuer-Socket unter {self.path}")
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                break
+            thread = threading.Thread(target=self._serve, args=(connection,), name="control-connection")
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, connection):
+        with connection, connection.makefile('rb') as lines:
+            for line in lines:
+                try:
+                    reply = self.handle(line.decode('utf-8', 'replace').strip())
+                except Exception as e:
+                    # Eine fehlerhafte Anfrage darf die Verbindung nicht beenden
+                    reply = f"err {e}"
+                try:
+                    connection.sendall(reply.encode('utf-8') + b'\n')
+                except OSError:
+                    break
+
+    def handle(self, line):
+        """
+        Führt einen Befehl aus.
+
+        :param line: Befehlszeile ohne Zeilenumbruch
+        :return: Antwortzeile ohne Zeilenumbruch
+        """
+        words = line.split()
+        if not words:
+            return "err Leerer Befehl"
+        command, arguments = words[0].lower(), words[1:]
+        label = command if command in COMMANDS else 'unknown'
+        try:
+            reply = self._dispatch(command, arguments)
+        except ConfigVersionConflict as e:
+            CONTROL_COMMANDS.labels(command=label, status='conflict').inc()
+            return f"err {e}"
+        except ValueError as e:
+            CONTROL_COMMANDS.labels(command=label, status='error').inc()
+            return f"err {e}"
+        CONTROL_COMMANDS.labels(command=label, status='ok').inc()
+        return f"ok {reply}"
+
+    def _dispatch(self, command, arguments):
+        if command == 'ping':
+            return "pong"
+        if command == 'get':
+            return json.dumps(self._settings(), separators=(',', ':'))
+        if command == 'stats':
+            return json.dumps(self._stats(), separators=(',', ':'))
+        if command in ('mode', 'pattern', 'color', 'colour', 'brightness'):
+            if len(arguments) != 1:
+                raise ValueError(f"{command} erwartet genau einen Wert")
+            arguments = [f"{command}={arguments[0]}"]
+            command = 'set'
+        if command == 'param':
+            if len(arguments) != 3:
+                raise ValueError("param erwartet Muster, Name und Wert")
+            pattern, name, value = arguments
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"Ungültiger Wert: {value}")
+            version = self.led_manager.submit_settings({'pattern_params': {pattern: {name: value}}}, transition=False)
+            return str(version)
+        if command == 'set':
+            settings, transition, expected_version = parse_settings(arguments)
+            version = self.led_manager.submit_settings(settings, transition=transition,
+                                                       expected_version=expected_version)
+            return str(version)
+        raise ValueError(f"Unbekannter Befehl: {command}")
+
+    def _settings(self):
+        """Gewünschte Einstellungen inklusive noch nicht angewendeter Befehle, ohne to_json()"""
+        settings, version = self.led_manager.desired_settings()
+        settings['version'] = version
+        return settings
+
+    def _stats(self):
+        manager = self.led_manager
+        last_frame = manager.last_frame_seconds
+        return {
+            "mode": manager.current_mode,
+            "config_version": Config.CONFIG_VERSION,
+            "desired_version": manager.desired_version,
+            "last_frame_ms": round(last_frame * 1000, 3) if last_frame is not None else None,
+            "audio_active": manager.audio_active,
+            "external_frames": manager.frame_buffer is not None and manager.frame_buffer.is_active(),
+            "quality_level": manager.quality.level if manager.quality is not None else None,
+        }
+
+    def stop(self):
+        """Schließt den Socket"""
+        self._running = False
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class ControlClient:
+    """Minimaler Client für den Steuer-Socket (für Skripte und tools/control_bench.py)"""
+
+    def __init__(self, path):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._lines = self._socket.makefile('rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request(self, line):
+        """
+        Sendet einen Befehl und wartet auf die Antwort.
+
+        :return: Antwort ohne 'ok '
+        :raises ValueError: Bei einer 'err'-Antwort
+        """
+        self._socket.sendall(line.encode('utf-8') + b'\n')
+        reply = self._lines.readline().decode('utf-8').rstrip('\n')
+        status, _, payload = reply.partition(' ')
+        if status != 'ok':
+            raise ValueError(payload or reply)
+        return payload
+
+    def close(self):
+        self._lines.close()
+        self._socket.close()
@@ -1,67 +1,566 @@
+import queue
 import threading
 import time
 from config.config import Config
-from led_controllers.audio_visualizer import AudioVisualizer
-from led_controllers.pattern_visualizer import PatternVisualizer
+from utils.metrics import metrics
+from utils.quality import QualityController
+from utils.realtime import install_gc_metrics
+from utils.startup_timer import startup_timer
+
+
+FRAMES = metrics.counter(
+    'pivoltmeter_frames',
+    'Vom Render-Thread ausgegebene Frames',
+    labelnames=('mode',)
+)
+FRAME_SECONDS = metrics.histogram(
+    'pivoltmeter_frame_seconds',
+    'Dauer eines Frames im Render-Thread (Audio, Berechnung, Ausgabe), ohne Wartezeit',
+    labelnames=('mode',)
+)
+FRAME_INTERVAL_SECONDS = metrics.histogram(
+    'pivoltmeter_frame_interval_seconds',
+    'Zeit zwischen zwei Frames inklusive Wartezeit (1 / FPS)'
+)
+COMMANDS_APPLIED = metrics.counter(
+    'pivoltmeter_commands_applied',
+    'Vom Render-Thread übernommene Konfigurationsbefehle'
+)
+COMMAND_BATCHES = metrics.counter(
+    'pivoltmeter_command_batches',
+    'Zusammengefasste Befehlsstapel (je eine Konfigurationsversion)'
+)
+CONFIG_VERSION = metrics.gauge(
+    'pivoltmeter_config_version',
+    'Zuletzt angewendete Konfigurationsversion'
+)
+FRAME_JITTER_SECONDS = metrics.histogram(
+    'pivoltmeter_frame_jitter_seconds',
+    'Verspätung nach der Wartezeit zwischen zwei Frames (tatsächliche minus geplante Wartezeit)',
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05)
+)
+AUDIO_COLD_START_SECONDS = metrics.histogram(
+    'pivoltmeter_audio_cold_start_seconds',
+    'Zeit vom Anfordern des Audio-Subsystems bis zum geöffneten Audiostream',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+AUDIO_ACTIVE = metrics.gauge(
+    'pivoltmeter_audio_active',
+    '1, wenn das Audio-Subsystem (PyAudio und Stream) geöffnet ist'
+)
+
+
+class ConfigVersionConflict(ValueError):
+    """Die erwartete Konfigurationsversion stimmt nicht mit der aktuellen überein"""
+
+    def __init__(self, expected, current):
+        super().__init__(f"Konfiguration wurde inzwischen geändert (erwartet Version {expected}, aktuell {current})")
+        self.expected = expected
+        self.current = current
+
+
+class ConfigCommand:
+    """Eine Konfigurationsänderung, die vom Render-Thread angewendet wird"""
+
+    def __init__(self, version, settings, transition=True):
+        """
+        :param version: Konfigurationsversion, die nach dem Anwenden gilt
+        :param settings: Geprüfte Einstellungen aus Config.validate_settings()
+        :param transition: Ob eine Übergangsanimation abgespielt werden soll
+        """
+        self.version = version
+        self.settings = settings
+        self.transition = transition
+
 
 class LEDManager:
-    def __init__(self):
-        self.audio_visualizer = AudioVisualizer()
-        self.pattern_visualizer = PatternVisualizer()
+    def __init__(self, boot_animation=True, simulator=None, realtime=None, store=None):
+        """
+        Erstellt den LED-Manager. Die Hardware (LED-Streifen, Audio) wird erst im
+        Render-Thread initialisiert, damit der Webserver sofort starten kann.
+        
+        :param boot_animation: Start-Animation vor der ersten Visualisierung abspielen
+        :param simulator: LEDSimulator für virtuelle Streifen (optional)
+        :param realtime: RealtimeProfile für den Render-Thread (optional, siehe utils/realtime.py)
+        :param store: ConfigStore, der jede übernommene Konfiguration speichert (optional, siehe config/store.py)
+        """
+        self.audio_visualizer = None
+        self.pattern_visualizer = None
+        self.boot_animation = boot_animation
+        self.simulator = simulator
+        self.realtime = realtime
+        self.store = store
+        # Adaptive Qualität im Audio-Modus (None = abgeschaltet)
+        self.quality = QualityController.from_config(Config)
+        # Zonen-Scheduler, wird mit den Streifen im Render-Thread erzeugt (siehe utils/zones.py)
+        self.zone_scheduler = None
+        # Externe Frames (None = abgeschaltet); numpy wird nur dann importiert
+        self.frame_buffer = None
+        self.external_visualizer = None
+        self._external_active = False
+        # Laufende Übergangsanimation (Generator aus transition_sequence()) und Zeitpunkt des nächsten Frames
+        self._transition = None
+        self._transition_due = 0.0
+        if Config.INGEST_ENABLED:
+            from led_controllers.frame_ingest import FrameBuffer
+            self.frame_buffer = FrameBuffer.from_config(Config)
+        install_gc_metrics()
+        # Rechenzeit des letzten Frames in Sekunden (ohne Wartezeit)
+        self.last_frame_seconds = None
+        self.hardware_ready = threading.Event()
         self.current_thread = None
+
+        # Audio-Subsystem wird erst im Audio-Modus gestartet und nach
+        # Config.AUDIO_IDLE_TIMEOUT Sekunden in anderen Modi wieder freigegeben
+        self.audio_active = False
+        self._audio_lock = threading.Lock()
+        self._audio_thread = None
+        self._audio_idle_since = None
+        self._audio_retry_at = 0
         self.stop_event = threading.Event()
         self.current_mode = None
-    
+
+        # Befehlswarteschlange zwischen Flask-Handlern und dem Render-Thread.
+        # Es gibt genau einen Konsumenten: den Render-Thread.
+        self.command_queue = queue.Queue()
+        self._command_lock = threading.Lock()
+        self._pending_settings = {}
+        self._desired_version = Config.CONFIG_VERSION
+
     def start_visualization(self):
-        # Stoppe laufende Visualisierung
-        self.stop_visualization()
+        """Startet den Render-Thread, falls er noch nicht läuft"""
+        if self.current_thread and self.current_thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.current_thread = threading.Thread(target=self._render_loop, name="led-render")
+        self.current_thread.daemon = True
+        self.current_thread.start()
+
+    def _init_hardware(self):
+        """
+        Initialisiert die LED-Streifen im Render-Thread. Ist der Audio-Modus aktiv,
+        läuft die Audio-Initialisierung (numpy, PyAudio, Gerätesuche) parallel zur
+        Start-Animation.
+        """
+        if self.pattern_visualizer is not None:
+            return
         
-        # Starte neue Visualisierung basierend auf Config
-        mode = Config.VISUALIZATION_MODE
-        self.current_mode = mode
+        with startup_timer.phase("Import Pattern-Visualizer"):
+            from led_controllers.pattern_visualizer import PatternVisualizer
+        with startup_timer.phase("LED-Streifen initialisieren"):
+            self.pattern_visualizer = PatternVisualizer()
+        from utils.zones import ZoneScheduler
+        self.zone_scheduler = ZoneScheduler(self.pattern_visualizer.strips)
+        if self.frame_buffer is not None:
+            from led_controllers.frame_ingest import ExternalFrameVisualizer
+            self.external_visualizer = ExternalFrameVisualizer(self.frame_buffer, self.pattern_visualizer.strips)
+        if self.simulator is not None:
+            self.simulator.attach(self)
+        self.hardware_ready.set()
         
-        if mode == 'off':
-            self.turn_off_leds()
+        if Config.VISUALIZATION_MODE == 'audio':
+            self._request_audio()
+
+    def _request_audio(self):
+        """Startet das Audio-Subsystem im Hintergrund, falls es nicht schon läuft"""
+        with self._audio_lock:
+            if self.audio_active or (self._audio_thread and self._audio_thread.is_alive()):
+                return
+            if time.monotonic() < self._audio_retry_at:
+                return
+            self._audio_thread = threading.Thread(target=self._init_audio, name="audio-init")
+            self._audio_thread.daemon = True
+            self._audio_thread.start()
+
+    def _init_audio(self):
+        if self.realtime is not None:
+            self.realtime.apply_audio_thread()
+        start = time.perf_counter()
+        try:
+            if self.audio_visualizer is None:
+                with startup_timer.phase("Import Audio-Visualizer (numpy)"):
+                    from led_controllers.audio_visualizer import AudioVisualizer
+                # Streifen mitbenutzen, damit die laufende Animation nicht gelöscht wird
+                self.audio_visualizer = AudioVisualizer(strips=self.pattern_visualizer.strips, start_stream=False)
+            
+            self.audio_visualizer.start_audio_stream()
+        except Exception as e:
+            print(f"Fehler beim Initialisieren der Audio-Visualisierung: {e}")
+            # Nicht bei jedem Frame erneut versuchen
+            self._audio_retry_at = time.monotonic() + 5.0
             return
         
-        # Thread für entsprechenden Modus starten
-        self.stop_event.clear()
+        duration = time.perf_counter() - start
+        AUDIO_COLD_START_SECONDS.observe(duration)
+        AUDIO_ACTIVE.set(1)
+        self.audio_active = True
+        print(f"Audio-Subsystem gestartet in {duration * 1000:.0f} ms")
+
+    def _release_idle_audio(self):
+        """Gibt das Audio-Subsystem frei, wenn es länger als AUDIO_IDLE_TIMEOUT ungenutzt ist"""
+        if not self.audio_active or self._audio_idle_since is None or Config.AUDIO_IDLE_TIMEOUT is None:
+            return
+        if time.monotonic() - self._audio_idle_since < Config.AUDIO_IDLE_TIMEOUT:
+            return
         
-        if mode == 'audio':
-            self.current_thread = threading.Thread(target=self._run_audio_visualization)
-        elif mode == 'static':
-            self.current_thread = threading.Thread(target=self._run_pattern_visualization)
+        with self._audio_lock:
+            self.audio_visualizer.stop_audio_stream()
+            self.audio_active = False
+        AUDIO_ACTIVE.set(0)
+        print("Audio-Subsystem wegen Inaktivität freigegeben")
+
+    def _run_boot_sequence(self):
+        """
+        Spielt die Start-Animation Frame für Frame ab. Sie wird abgebrochen,
+        sobald ein Befehl eintrifft oder der Manager gestoppt wird.
+        """
+        with startup_timer.phase("Start-Animation"):
+            for delay in self.pattern_visualizer.boot_sequence():
+                if self.stop_event.is_set() or not self.command_queue.empty():
+                    print("Start-Animation abgebrochen")
+                    break
+                if delay:
+                    self.stop_event.wait(delay)
+
+    def _render_loop(self):
+        # Einziger Thread, der die LED-Streifen beschreibt
+        if self.realtime is not None:
+            self.realtime.apply_render_thread()
+        self._init_hardware()
+        if self.boot_animation:
+            self.boot_animation = False
+            self._run_boot_sequence()
         
-        self.current_thread.daemon = True
-        self.current_thread.start()
-    
-    def _run_audio_visualization(self):
-        # Audio-Visualisierung im Thread ausführen
-        while not self.stop_event.is_set():
-            self.audio_visualizer.update()
-            time.sleep(0.01)
-    
-    def _run_pattern_visualization(self):
-        # Pattern-Visualisierung im Thread ausführen
+        self._switch_mode(Config.VISUALIZATION_MODE)
+        startup_timer.mark("Erster Frame der Visualisierung")
+        startup_timer.report()
+        if self.realtime is not None:
+            self.realtime.after_startup()
+        frame_metrics = {}
+        last_frame_start = None
+
         while not self.stop_event.is_set():
-            self.pattern_visualizer.update()
-            time.sleep(0.01)
-    
+            # Konfigurationsänderungen nur an Frame-Grenzen übernehmen
+            self._process_commands()
+
+            if self.frame_buffer is not None and self._render_external(frame_metrics):
+                self._transition = None
+                last_frame_start = None
+                continue
+
+            mode = self.current_mode
+            if Config.ZONES and mode != 'off':
+                self._render_zones(frame_metrics)
+                last_frame_start = None
+                continue
+
+            if self._transition is not None:
+                self._step_transition()
+                last_frame_start = None
+                continue
+
+            if mode == 'audio':
+                if not self.audio_active:
+                    # Audio wird im Hintergrund gestartet, bis dahin auf Befehle warten
+                    self._request_audio()
+                    self._wait(0.02, self.stop_event.wait)
+                    continue
+                visualizer = self.audio_visualizer
+            else:
+                self._release_idle_audio()
+            
+            if mode == 'static':
+                visualizer = self.pattern_visualizer
+            elif mode == 'off':
+                # Im Off-Modus nur auf neue Befehle warten
+                last_frame_start = None
+                self._wait(0.05, self.stop_event.wait)
+                continue
+
+            frame_start = time.perf_counter()
+            if last_frame_start is not None:
+                FRAME_INTERVAL_SECONDS.observe(frame_start - last_frame_start)
+            last_frame_start = frame_start
+
+            visualizer.update()
+
+            # Label-Kinder nur einmal pro Modus nachschlagen
+            if mode not in frame_metrics:
+                frame_metrics[mode] = (FRAMES.labels(mode=mode), FRAME_SECONDS.labels(mode=mode))
+            frames, frame_seconds = frame_metrics[mode]
+            frames.inc()
+            self.last_frame_seconds = time.perf_counter() - frame_start
+            frame_seconds.observe(self.last_frame_seconds)
+            if mode == 'audio' and self.quality is not None:
+                self._regulate_quality(visualizer)
+
+            # Wartezeit des Musters plus kurze Pause
+            self._wait(Config.FRAME_PAUSE + visualizer.frame_delay, jitter=True)
+
+        if self.realtime is not None:
+            self.realtime.shutdown()
+
+    def _wait(self, seconds, wait=time.sleep, jitter=False):
+        """
+        Wartet im Render-Thread. Alle Wartezeiten des Render-Loops laufen hierüber:
+        Ein Teil davon dient ggf. der Garbage Collection, die mit REALTIME_GC_IDLE
+        sonst nie liefe.
+
+        :param seconds: Wartezeit in Sekunden
+        :param wait: Wartefunktion mit der Zeit in Sekunden (z. B. self.stop_event.wait)
+        :param jitter: Verspätung des Aufwachens als FRAME_JITTER_SECONDS erfassen
+        """
+        if self.realtime is not None:
+            seconds -= self.realtime.idle(seconds)
+        if seconds <= 0:
+            return
+        sleep_start = time.perf_counter()
+        wait(seconds)
+        if jitter:
+            FRAME_JITTER_SECONDS.observe(max(0.0, time.perf_counter() - sleep_start - seconds))
+
+    def _step_transition(self):
+        """
+        Zeigt den nächsten Frame der Übergangsanimation, sobald er fällig ist. Bis
+        dahin werden nur kurze Wartezeiten eingelegt, damit neue Befehle und externe
+        Frames sie abbrechen können; im Audio-Modus wird Audio weiter gelesen, damit
+        sich im Puffer nichts staut.
+        """
+        now = time.monotonic()
+        if now < self._transition_due:
+            if self.current_mode == 'audio' and self.audio_active and self.audio_visualizer.stream is not None:
+                # Das Lesen eines Chunks wartet auf das Audiogerät
+                self.audio_visualizer.analyze(self.audio_visualizer.context)
+            else:
+                self._wait(min(self._transition_due - now, 0.02), self.stop_event.wait)
+            return
+        try:
+            delay = next(self._transition)
+        except StopIteration:
+            self._transition = None
+            return
+        self._transition_due = time.monotonic() + delay
+
+    def _render_zones(self, frame_metrics):
+        """
+        Berechnet die fälligen Zonen und gibt beide Streifen gemeinsam aus. Audio
+        wird gestartet bzw. offen gehalten, solange eine Zone es benötigt.
+        """
+        scheduler = self.zone_scheduler
+        scheduler.sync(Config)
+        if scheduler.needs_audio:
+            self._audio_idle_since = None
+            if not self.audio_active:
+                self._request_audio()
+        else:
+            if self._audio_idle_since is None:
+                self._audio_idle_since = time.monotonic()
+            self._release_idle_audio()
+
+        frame_start = time.perf_counter()
+        if scheduler.tick(self.audio_visualizer if self.audio_active else None):
+            if 'zones' not in frame_metrics:
+                frame_metrics['zones'] = (FRAMES.labels(mode='zones'), FRAME_SECONDS.labels(mode='zones'))
+            frames, frame_seconds = frame_metrics['zones']
+            frames.inc()
+            self.last_frame_seconds = time.perf_counter() - frame_start
+            frame_seconds.observe(self.last_frame_seconds)
+
+        # Höchstens 50 ms warten, damit Befehle zügig übernommen werden
+        self._wait(min(scheduler.wait_seconds(), 0.05))
+
+    def _render_external(self, frame_metrics):
+        """
+        Gibt externe Frames aus, solange welche eintreffen. Nach INGEST_TIMEOUT
+        Sekunden ohne Frame läuft wieder der konfigurierte Modus.
+
+        :return: True, wenn der Frame extern war (der Render-Loop überspringt dann das Muster)
+        """
+        from led_controllers.frame_ingest import INGEST_ACTIVE
+        if not self.frame_buffer.is_active():
+            if self._external_active:
+                self._external_active = False
+                INGEST_ACTIVE.set(0)
+                print("Keine externen Frames mehr, zurück zum konfigurierten Muster")
+                # Modus erneut setzen, damit z. B. im Off-Modus die LEDs wieder ausgehen
+                self._switch_mode(Config.VISUALIZATION_MODE)
+            return False
+
+        if not self._external_active:
+            self._external_active = True
+            INGEST_ACTIVE.set(1)
+            print(f"Externe Frames von {self.frame_buffer.source}, Muster pausiert")
+
+        frame_start = time.perf_counter()
+        if self.external_visualizer.update():
+            if 'external' not in frame_metrics:
+                frame_metrics['external'] = (FRAMES.labels(mode='external'), FRAME_SECONDS.labels(mode='external'))
+            frames, frame_seconds = frame_metrics['external']
+            frames.inc()
+            self.last_frame_seconds = time.perf_counter() - frame_start
+            frame_seconds.observe(self.last_frame_seconds)
+
+        # Bis zum nächsten Frame warten, aber regelmäßig Befehle und Timeout prüfen
+        self._wait(0.05, self.frame_buffer.wait)
+        return True
+
+    def _regulate_quality(self, visualizer):
+        """
+        Gibt die Rechenzeit des Frames an den Qualitätsregler weiter. Das Budget ist
+        die Dauer eines Audio-Chunks abzüglich der festen Pause: Braucht ein Frame
+        länger, staut sich Audio im Puffer.
+        """
+        if visualizer.silence.silent:
+            # Übersprungene Frames würden die Last zu niedrig erscheinen lassen
+            return
+        chunk_seconds = visualizer.CHUNK / visualizer.RATE
+        budget = max(chunk_seconds - Config.FRAME_PAUSE, chunk_seconds * 0.1)
+        work = self.last_frame_seconds - visualizer.last_read_seconds
+        if self.quality.observe(work, budget):
+            visualizer.apply_quality(self.quality.settings)
+
+    def _process_commands(self):
+        """
+        Übernimmt alle wartenden Befehle als eine Konfigurationsversion.
+        Überholte Werte werden dabei von neueren Befehlen überschrieben.
+        """
+        commands = []
+        while True:
+            try:
+                commands.append(self.command_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if not commands:
+            return
+
+        merged = {}
+        transition = False
+        for command in commands:
+            merged.update(command.settings)
+            transition = transition or command.transition
+        version = commands[-1].version
+
+        Config.apply_settings(merged, version)
+        COMMANDS_APPLIED.inc(len(commands))
+        COMMAND_BATCHES.inc()
+        CONFIG_VERSION.set(version)
+        if self.store is not None:
+            # Nur vormerken; geschrieben wird entprellt im Hintergrund
+            self.store.schedule(Config.snapshot())
+
+        with self._command_lock:
+            if self._desired_version == version:
+                self._pending_settings.clear()
+
+        # Helligkeit direkt an die Streifen weitergeben
+        if 'led_brightness' in merged:
+            if self.audio_visualizer:
+                self.audio_visualizer.configure_from_config()
+            self.pattern_visualizer.configure_from_config()
+
+        # Höchstens eine Übergangsanimation pro Befehlsstapel; jeder neue Stapel bricht eine laufende ab.
+        # Nicht über externe Frames oder Zonen malen, die haben Vorrang
+        self._transition = None
+        if transition and not Config.ZONES and not (self.frame_buffer is not None and self.frame_buffer.is_active()):
+            self._transition = self.pattern_visualizer.transition_sequence()
+            self._transition_due = 0.0
+
+        if self.current_mode != Config.VISUALIZATION_MODE or 'zones' in merged:
+            # Auch beim Ändern der Zonen, damit Audio-Leerlauf und Off-Modus wieder stimmen
+            self._switch_mode(Config.VISUALIZATION_MODE)
+
+    def _switch_mode(self, mode):
+        self.current_mode = mode
+        if mode == 'audio':
+            self._audio_idle_since = None
+            self._request_audio()
+        elif self._audio_idle_since is None:
+            self._audio_idle_since = time.monotonic()
+        
+        if mode != 'static' and self.pattern_visualizer:
+            # Animationszustand des statischen Musters abgeben; beim Zurückschalten beginnt es von vorn
+            self.pattern_visualizer.states.release()
+        
+        if mode == 'off':
+            self.turn_off_leds()
+
     def stop_visualization(self):
         if self.current_thread and self.current_thread.is_alive():
             self.stop_event.set()
             self.current_thread.join(timeout=2.0)
             self.current_thread = None
-    
+
     def turn_off_leds(self):
-        # LEDs ausschalten
-        self.pattern_visualizer.clear_leds()
-    
+        # LEDs ausschalten (nur wenn die Streifen bereits initialisiert sind)
+        if self.pattern_visualizer:
+            self.pattern_visualizer.clear_leds()
+
+    def submit_settings(self, settings, transition=True, expected_version=None):
+        """
+        Prüft Einstellungen und reiht sie in die Befehlswarteschlange ein.
+        Kehrt sofort zurück; der Render-Thread wendet die Änderung beim nächsten Frame an.
+
+        :param settings: Dictionary mit den zu ändernden Einstellungen
+        :param transition: Ob eine Übergangsanimation abgespielt werden soll
+        :param expected_version: Nur übernehmen, wenn dies die aktuelle Version ist (optional)
+        :return: Die Konfigurationsversion, die nach dem Anwenden gilt
+        :raises ConfigVersionConflict: Wenn expected_version nicht mehr aktuell ist
+        :raises ValueError: Wenn eine Einstellung ungültig ist
+        """
+        with self._command_lock:
+            if expected_version is not None and expected_version != self._desired_version:
+                raise ConfigVersionConflict(expected_version, self._desired_version)
+
+            base = Config.snapshot()
+            base.update(self._pending_settings)
+            settings = Config.validate_settings(settings, base)
+
+            self._desired_version += 1
+            version = self._desired_version
+            self._pending_settings.update(settings)
+            self.command_queue.put(ConfigCommand(version, settings, transition))
+        return version
+
+    @property
+    def render_thread_ident(self):
+        """Thread-ID des Render-Threads (None, wenn er nicht läuft)"""
+        thread = self.current_thread
+        if thread and thread.is_alive():
+            return thread.ident
+        return None
+
+    @property
+    def desired_version(self):
+        """Versionsnummer der zuletzt angenommenen Konfiguration"""
+        return self._desired_version
+
+    def desired_config(self):
+        """
+        Gibt die Konfiguration inklusive noch nicht angewendeter Befehle zurück.
+
+        :return: Dictionary im Format von Config.to_json()
+        """
+        with self._command_lock:
+            pending = dict(self._pending_settings)
+            version = self._desired_version
+        return Config.to_json(pending, version)
+
+    def desired_settings(self):
+        """
+        Wie desired_config(), aber nur die Einstellungen selbst (ohne Anzeige-Texte
+        und IP-Adressen) - für schnelle Abfragen, z. B. über den Steuer-Socket.
+
+        :return: Tupel (Einstellungen im Format von Config.snapshot(), Versionsnummer)
+        """
+        with self._command_lock:
+            pending = dict(self._pending_settings)
+            version = self._desired_version
+        settings = Config.snapshot()
+        settings.update(pending)
+        return settings, version
+
     def handle_config_change(self):
-        """Reagiert auf Konfigurationsänderungen"""
-        # Übergangsanimation abspielen
-        self.pattern_visualizer.play_transition_animation()
-        
-        if self.current_mode != Config.VISUALIZATION_MODE:
-            # Modus hat sich geändert, Visualisierung neu starten
-            self.start_visualization()
\ No newline at end of file
+        """Reagiert auf Konfigurationsänderungen (spielt die Übergangsanimation im Render-Thread ab)"""
+        return self.submit_settings({})
@@ -0,0 +1,217 @@
+import threading
+from bisect import bisect_left
+
+
+# Standard-Buckets für Zeitmessungen in Sekunden (100 µs bis 1 s)
+DEFAULT_TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """
+    Gemeinsame Basis für alle Metriken.
+
+    Aufzeichnen (inc/set/observe) erfolgt ohne Lock: jede Metrik wird in der Regel
+    nur von einem Thread geschrieben, und ein seltener verlorener Zählerschritt ist
+    für Diagnosezwecke unkritisch. Nur das Anlegen von Label-Kindern ist geschützt.
+    """
+
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=(), labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._labels = tuple(labels)
+        self._children = {}
+        self._children_lock = threading.Lock()
+
+    def labels(self, **labels):
+        """
+        Gibt die Kind-Metrik für die angegebenen Label-Werte zurück.
+        Für Aufrufe pro Frame sollte das Ergebnis zwischengespeichert werden.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._children_lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child(tuple(zip(self.labelnames, key)))
+                    self._children[key] = child
+        return child
+
+    def _new_child(self, labels):
+        raise NotImplementedError
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def collect(self):
+        """Liefert alle Messwerte als Liste von (Name, Labels, Wert)"""
+        if self.labelnames:
+            samples = []
+            for child in list(self._children.values()):
+                samples.extend(child._samples())
+            return samples
+        return self._samples()
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler"""
+
+    TYPE = "counter"
+
+    def __init__(self, name, documentation, labelnames=(), labels=()):
+        super().__init__(name, documentation, labelnames, labels)
+        self.value = 0
+
+    def _new_child(self, labels):
+        return Counter(self.name, self.documentation, labels=labels)
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def _samples(self):
+        return [(self.name + "_total", self._labels, self.value)]
+
+
+class Gauge(_Metric):
+    """Momentanwert, der steigen und fallen kann"""
+
+    TYPE = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), labels=()):
+        super().__init__(name, documentation, labelnames, labels)
+        self.value = 0
+
+    def _new_child(self, labels):
+        return Gauge(self.name, self.documentation, labels=labels)
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def _samples(self):
+        return [(self.name, self._labels, self.value)]
+
+
+class Histogram(_Metric):
+    """
+    Histogramm mit festen Buckets.
+    observe() kostet eine binäre Suche und drei Additionen (deutlich unter 1 µs).
+    """
+
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, buckets=DEFAULT_TIME_BUCKETS, labelnames=(), labels=()):
+        super().__init__(name, documentation, labelnames, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Letzter Eintrag zählt Werte oberhalb des größten Buckets (+Inf)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self, labels):
+        return Histogram(self.name, self.documentation, self.buckets, labels=labels)
+
+    def observe(self, value):
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Schätzt ein Quantil (0.0 - 1.0) anhand der Bucket-Grenzen.
+
+        :return: Obere Grenze des Buckets, in dem das Quantil liegt (None ohne Messwerte)
+        """
+        if self.count == 0:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self._counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+    def _samples(self):
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self._counts):
+            cumulative += count
+            samples.append((self.name + "_bucket", self._labels + (("le", _format_value(float(bound))),), cumulative))
+        samples.append((self.name + "_sum", self._labels, self.sum))
+        samples.append((self.name + "_count", self._labels, self.count))
+        return samples
+
+
+class MetricsRegistry:
+    """Sammlung aller Metriken mit Ausgabe im Prometheus-Textformat"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, *args, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metrik {name} ist bereits als {metric.TYPE} registriert")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames=labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames=labelnames)
+
+    def histogram(self, name, documentation, buckets=DEFAULT_TIME_BUCKETS, labelnames=()):
+        return self._register(Histogram, name, documentation, buckets=buckets, labelnames=labelnames)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """
+        Erzeugt die Ausgabe im Prometheus-Textformat (Version 0.0.4).
+
+        :return: String für den /metrics-Endpunkt
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for name, labels, value in metric.collect():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Globale Registry für die gesamte Anwendung
+metrics = MetricsRegistry()
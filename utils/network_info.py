@@ -0,0 +1,115 @@
+import select
+import socket
+import threading
+import time
+
+
+# Netlink-Konstanten (linux/rtnetlink.h) für Benachrichtigungen bei Adressänderungen
+NETLINK_ROUTE = 0
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+
+class NetworkInfoCache:
+    """
+    Zwischenspeicher für die Netzwerkinformationen (IP-Adressen, Hostname).
+
+    Die eigentliche Ermittlung (Socket zu 8.8.8.8, gethostname, `hostname -I`)
+    läuft ausschließlich in einem Hintergrund-Thread. get() liefert immer sofort
+    den zuletzt bekannten Wert zurück und blockiert nie einen Request oder den
+    Render-Thread.
+    """
+
+    def __init__(self, resolver, ttl=60.0, placeholder=None):
+        """
+        :param resolver: Funktion ohne Parameter, die die Liste der Adressen liefert
+        :param ttl: Maximales Alter des Zwischenspeichers in Sekunden
+        :param placeholder: Wert, der bis zur ersten Ermittlung zurückgegeben wird
+        """
+        self._resolver = resolver
+        self._ttl = ttl
+        self._value = list(placeholder or ["Wird ermittelt..."])
+        self._updated_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Startet den Hintergrund-Thread (mehrfacher Aufruf ist unschädlich)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="network-info", daemon=True)
+            self._thread.start()
+
+    def get(self):
+        """
+        Gibt die zwischengespeicherten Adressen zurück, ohne zu blockieren.
+        Ist der Wert älter als die TTL, wird im Hintergrund eine Aktualisierung angestoßen.
+        """
+        if self._thread is None:
+            self.start()
+        elif time.monotonic() - self._updated_at > self._ttl:
+            self._refresh_event.set()
+        return list(self._value)
+
+    def invalidate(self):
+        """Erzwingt eine Aktualisierung im Hintergrund"""
+        self._refresh_event.set()
+
+    def _refresh(self):
+        try:
+            value = self._resolver()
+        except Exception as e:
+            value = [f"IP-Fehler: {str(e)}"]
+        # Referenz austauschen - Leser sehen entweder den alten oder den neuen Wert
+        self._value = value
+        self._updated_at = time.monotonic()
+
+    def _open_netlink(self):
+        """
+        Öffnet einen Netlink-Socket, der bei Adressänderungen lesbar wird.
+        Gibt None zurück, wenn Netlink nicht verfügbar ist (z.B. kein Linux).
+        """
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+            sock.setblocking(False)
+            return sock
+        except (AttributeError, OSError):
+            return None
+
+    def _wait_for_change(self, sock, timeout):
+        """
+        Wartet auf eine Adressänderung, eine manuelle Anforderung oder den Ablauf der TTL.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._refresh_event.is_set():
+                return
+            if sock is None:
+                self._refresh_event.wait(remaining)
+                continue
+            # In kurzen Intervallen warten, damit auch invalidate() berücksichtigt wird
+            readable, _, _ = select.select([sock], [], [], min(remaining, 1.0))
+            if readable:
+                try:
+                    while sock.recv(65536):
+                        pass
+                except (BlockingIOError, OSError):
+                    pass
+                # Kurz warten, bis DHCP/SLAAC alle Adressen gesetzt hat
+                time.sleep(0.5)
+                return
+
+    def _run(self):
+        sock = self._open_netlink()
+        try:
+            while True:
+                self._refresh_event.clear()
+                self._refresh()
+                self._wait_for_change(sock, self._ttl)
+        finally:
+            if sock is not None:
+                sock.close()
@@ -0,0 +1,265 @@
+"""
+OSC über UDP für Lichtpulte und Controller.
+
+Adressen (Präfix Config.OSC_PREFIX, Standard '/pivoltmeter'):
+
+    /mode <s>                      bzw. /mode/<modus>             audio, static, off
+    /pattern <s>                   bzw. /pattern/<muster>         Muster des (neuen) Modus
+    /color <s>                     bzw. /color/<palette>          Palettenname oder '#rrggbb'
+    /brightness <f|i>              Float 0.0 - 1.0 (Fader) oder Integer 0 - 255
+    /param/<muster>/<name> <f|i>   Parameter aus Config.PATTERN_PARAMETERS
+
+Bei den Formen ohne Wert (z. B. /pattern/static_pattern_02) zählt eine
+Nachricht ohne Argument oder mit einem Wert ungleich 0; das Loslassen einer
+Taste (0) wird ignoriert. Bundles werden entpackt, Zeitstempel ignoriert.
+
+Nachrichten werden einzeln geprüft und gesammelt; spätestens nach
+Config.OSC_COALESCE_SECONDS wird alles als eine Konfigurationsversion ohne
+Übergangsanimation übergeben. Eine Fader-Fahrt mit hunderten Nachrichten
+ergibt so höchstens eine Version pro Frame.
+"""
+import socket
+import struct
+import threading
+import time
+from config.config import Config
+from utils.metrics import metrics
+
+
+OSC_MESSAGES = metrics.counter(
+    'pivoltmeter_osc_messages',
+    'Empfangene OSC-Nachrichten',
+    labelnames=('status',)
+)
+OSC_BATCHES = metrics.counter(
+    'pivoltmeter_osc_batches',
+    'Aus OSC-Nachrichten zusammengefasste Konfigurationsversionen'
+)
+
+
+def _read_string(data, offset):
+    """OSC-String: nullterminiert, auf 4 Bytes aufgefüllt"""
+    end = data.index(b'\0', offset)
+    return data[offset:end].decode('utf-8'), (end + 4) & ~3
+
+
+def parse_message(data):
+    """
+    Zerlegt eine OSC-Nachricht.
+
+    :param data: bytes einer Nachricht (kein Bundle)
+    :return: Tupel (adresse, argumente)
+    :raises ValueError: Bei ungültigem Format oder nicht unterstütztem Typ
+    """
+    try:
+        address, offset = _read_string(data, 0)
+        if offset >= len(data):
+            # Ältere Sender lassen die Typ-Angabe bei Nachrichten ohne Argumente weg
+            return address, []
+        tags, offset = _read_string(data, offset)
+        if not tags.startswith(','):
+            raise ValueError(f"Ungültige Typ-Angabe: {tags}")
+        arguments = []
+        for tag in tags[1:]:
+            if tag == 'i':
+                arguments.append(struct.unpack_from('>i', data, offset)[0])
+                offset += 4
+            elif tag == 'f':
+                arguments.append(struct.unpack_from('>f', data, offset)[0])
+                offset += 4
+            elif tag == 'h':
+                arguments.append(struct.unpack_from('>q', data, offset)[0])
+                offset += 8
+            elif tag == 'd':
+                arguments.append(struct.unpack_from('>d', data, offset)[0])
+                offset += 8
+            elif tag == 's' or tag == 'S':
+                value, offset = _read_string(data, offset)
+                arguments.append(value)
+            elif tag == 'b':
+                size = struct.unpack_from('>i', data, offset)[0]
+                arguments.append(bytes(data[offset + 4:offset + 4 + size]))
+                offset += 4 + ((size + 3) & ~3)
+            elif tag == 'T':
+                arguments.append(True)
+            elif tag == 'F':
+                arguments.append(False)
+            elif tag in 'NI':
+                arguments.append(None)
+            else:
+                raise ValueError(f"Nicht unterstützter OSC-Typ: {tag}")
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Ungültige OSC-Nachricht: {e}")
+    return address, arguments
+
+
+def parse_packet(data):
+    """
+    Zerlegt ein OSC-Paket (Nachricht oder verschachteltes Bundle).
+
+    :return: Liste von (adresse, argumente)
+    :raises ValueError: Bei ungültigem Format
+    """
+    if not data.startswith(b'#bundle\0'):
+        return [parse_message(data)]
+    messages = []
+    # 8 Bytes '#bundle\0', 8 Bytes Zeitstempel, dann Elemente mit Längenangabe
+    offset = 16
+    while offset < len(data):
+        if offset + 4 > len(data):
+            raise ValueError("Abgeschnittenes OSC-Bundle")
+        size = struct.unpack_from('>i', data, offset)[0]
+        offset += 4
+        if size <= 0 or offset + size > len(data):
+            raise ValueError("Ungültige Elementlänge im OSC-Bundle")
+        messages.extend(parse_packet(data[offset:offset + size]))
+        offset += size
+    return messages
+
+
+class OSCServer:
+    """Empfängt OSC-Nachrichten und übergibt sie gesammelt an den LED-Manager"""
+
+    def __init__(self, led_manager, port, host='0.0.0.0', prefix='/pivoltmeter', coalesce_seconds=0.02):
+        """
+        :param led_manager: LEDManager, an den die Einstellungen gehen
+        :param port: UDP-Port
+        :param host: Adresse, an die der Socket gebunden wird
+        :param prefix: Gemeinsames Präfix aller Adressen ('' = keins)
+        :param coalesce_seconds: Sammelzeit ab der ersten Nachricht eines Stapels
+        """
+        self.led_manager = led_manager
+        self.port = port
+        self.host = host
+        self.prefix = prefix.rstrip('/')
+        self.coalesce_seconds = coalesce_seconds
+        self._socket = None
+        self._running = False
+        self._pending = {}
+        self._deadline = None
+
+    @classmethod
+    def from_config(cls, config, led_manager):
+        """
+        :return: OSCServer oder None, wenn config.OSC_PORT nicht gesetzt ist
+        """
+        if config.OSC_PORT is None:
+            return None
+        return cls(led_manager, config.OSC_PORT, prefix=config.OSC_PREFIX,
+                   coalesce_seconds=config.OSC_COALESCE_SECONDS)
+
+    def start(self):
+        """Öffnet den UDP-Socket und startet den Empfangs-Thread"""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._running = True
+        thread = threading.Thread(target=self._serve, name="osc")
+        thread.daemon = True
+        thread.start()
+        print(f"OSC-Eingang auf UDP-Port {self.port} ({self.prefix or '/'}...)")
+
+    def _serve(self):
+        buffer = bytearray(65535)
+        while self._running:
+            # Ohne gesammelte Nachrichten blockierend warten, sonst höchstens bis zur Übergabe
+            timeout = None if self._deadline is None else max(0.0, self._deadline - time.monotonic())
+            try:
+                self._socket.settimeout(timeout)
+                size = self._socket.recv_into(buffer)
+            except (socket.timeout, BlockingIOError):
+                # Sammelzeit abgelaufen (bei Timeout 0 ist der Socket nicht blockierend)
+                self.flush()
+                continue
+            except OSError:
+                break
+            try:
+                messages = parse_packet(bytes(buffer[:size]))
+            except ValueError as e:
+                OSC_MESSAGES.labels(status='invalid').inc()
+                print(f"OSC: {e}")
+                continue
+            for address, arguments in messages:
+                self.handle(address, arguments)
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                self.flush()
+
+    def map_message(self, address, arguments):
+        """
+        Übersetzt eine OSC-Adresse in Einstellungen wie bei /settings.
+
+        :return: Dictionary mit Einstellungen, leer für ignorierte Nachrichten (losgelassene Tasten)
+        :raises ValueError: Bei unbekannter Adresse oder falschem Argument
+        """
+        if self.prefix:
+            if not address.startswith(self.prefix + '/'):
+                raise ValueError(f"Unbekannte Adresse: {address}")
+            address = address[len(self.prefix):]
+        parts = address.strip('/').split('/')
+        keys = {'mode': 'visualization_mode', 'pattern': 'pattern', 'color': 'led_color'}
+
+        if parts[0] in keys and len(parts) == 2:
+            # Taste: /pattern/static_pattern_02 [1]
+            if arguments and not arguments[0]:
+                return {}
+            return {keys[parts[0]]: parts[1]}
+        if parts[0] in keys and len(parts) == 1:
+            if len(arguments) != 1 or not isinstance(arguments[0], str):
+                raise ValueError(f"{address} erwartet einen String")
+            return {keys[parts[0]]: arguments[0]}
+        if parts == ['brightness']:
+            if len(arguments) != 1 or isinstance(arguments[0], (str, bool)) or arguments[0] is None:
+                raise ValueError(f"{address} erwartet eine Zahl")
+            value = arguments[0]
+            if isinstance(value, float):
+                # Fader liefern 0.0 - 1.0
+                value = round(min(1.0, max(0.0, value)) * 255)
+            return {'led_brightness': value}
+        if parts[0] == 'param' and len(parts) == 3:
+            if len(arguments) != 1 or isinstance(arguments[0], (str, bool)) or arguments[0] is None:
+                raise ValueError(f"{address} erwartet eine Zahl")
+            return {'pattern_params': {parts[1]: {parts[2]: arguments[0]}}}
+        raise ValueError(f"Unbekannte Adresse: {address}")
+
+    def handle(self, address, arguments):
+        """
+        Prüft eine Nachricht und merkt sie für die nächste Übergabe vor.
+        Ungültige Nachrichten werden verworfen, ohne den Stapel zu verlieren.
+        """
+        try:
+            settings = self.map_message(address, arguments)
+            if not settings:
+                OSC_MESSAGES.labels(status='ignored').inc()
+                return
+            # Gegen den gewünschten Stand inklusive bereits gesammelter Werte prüfen
+            base, _ = self.led_manager.desired_settings()
+            base.update(self._pending)
+            self._pending.update(Config.validate_settings(settings, base))
+        except ValueError as e:
+            OSC_MESSAGES.labels(status='invalid').inc()
+            print(f"OSC {address} {arguments}: {e}")
+            return
+        OSC_MESSAGES.labels(status='ok').inc()
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.coalesce_seconds
+
+    def flush(self):
+        """Übergibt die gesammelten Einstellungen als eine Konfigurationsversion"""
+        self._deadline = None
+        if not self._pending:
+            return
+        settings, self._pending = self._pending, {}
+        try:
+            self.led_manager.submit_settings(settings, transition=False)
+        except ValueError as e:
+            # Zwischenzeitlich über einen anderen Weg geänderter Modus o. ä.
+            print(f"OSC-Einstellungen verworfen: {e}")
+            return
+        OSC_BATCHES.inc()
+
+    def stop(self):
+        """Schließt den Socket"""
+        self._running = False
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
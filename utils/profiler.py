@@ -0,0 +1,183 @@
+import os
+import sys
+import threading
+import time
+
+
+class ProfilerBusyError(RuntimeError):
+    """Es läuft bereits eine Profiling-Sitzung"""
+
+
+class SamplingProfiler:
+    """
+    Statistischer Profiler für einen laufenden Thread.
+
+    Liest in festen Abständen den Stack des Ziel-Threads über sys._current_frames()
+    aus. Der Ziel-Thread wird dabei weder angehalten noch neu gestartet; er verliert
+    lediglich für die Dauer jeder Stichprobe den GIL.
+
+    Da eine Stichprobe den GIL benötigt, werden Stellen bevorzugt erfasst, an denen
+    der Ziel-Thread den GIL freigibt (sleep, I/O). Während der Aufzeichnung wird
+    deshalb das Thread-Wechselintervall des Interpreters verkürzt.
+    """
+
+    SWITCH_INTERVAL = 0.0002
+
+    _session_lock = threading.Lock()
+
+    def __init__(self, thread_ident, rate_hz=100, duration=5.0):
+        """
+        :param thread_ident: threading.get_ident() des zu untersuchenden Threads
+        :param rate_hz: Stichproben pro Sekunde
+        :param duration: Dauer der Aufzeichnung in Sekunden
+        """
+        if rate_hz <= 0 or duration <= 0:
+            raise ValueError("Rate und Dauer müssen größer als 0 sein")
+
+        self.thread_ident = thread_ident
+        self.rate_hz = rate_hz
+        self.duration = duration
+        self.stacks = {}
+        self.samples = 0
+        self.missed_samples = 0
+        self.sampling_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def run(self):
+        """
+        Zeichnet das Profil blockierend auf (im aufrufenden Thread).
+        Es kann immer nur eine Sitzung gleichzeitig laufen.
+
+        :raises ProfilerBusyError: Wenn bereits eine Sitzung läuft
+        """
+        if not SamplingProfiler._session_lock.acquire(blocking=False):
+            raise ProfilerBusyError("Es läuft bereits eine Profiling-Sitzung")
+
+        previous_switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(previous_switch_interval, self.SWITCH_INTERVAL))
+        try:
+            interval = 1.0 / self.rate_hz
+            own_ident = threading.get_ident()
+            start = time.perf_counter()
+            cpu_start = time.thread_time()
+            next_sample = start
+            end = start + self.duration
+
+            while True:
+                now = time.perf_counter()
+                if now >= end:
+                    break
+                if now < next_sample:
+                    time.sleep(next_sample - now)
+                    continue
+
+                sample_start = time.perf_counter()
+                self._sample(own_ident)
+                self.sampling_seconds += time.perf_counter() - sample_start
+
+                next_sample += interval
+                # Verpasste Stichproben nicht nachholen, sondern zählen
+                if next_sample < time.perf_counter():
+                    skipped = int((time.perf_counter() - next_sample) / interval) + 1
+                    self.missed_samples += skipped
+                    next_sample += skipped * interval
+
+            self.wall_seconds = time.perf_counter() - start
+            self.cpu_seconds = time.thread_time() - cpu_start
+        finally:
+            sys.setswitchinterval(previous_switch_interval)
+            SamplingProfiler._session_lock.release()
+        return self
+
+    def _sample(self, own_ident):
+        frame = sys._current_frames().get(self.thread_ident)
+        if frame is None or self.thread_ident == own_ident:
+            self.missed_samples += 1
+            return
+
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        # Wurzel zuerst, wie bei Flamegraphs üblich
+        stack.reverse()
+        key = tuple(stack)
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+        self.samples += 1
+
+    def overhead(self):
+        """
+        Kennzahlen zum Aufwand der Aufzeichnung.
+
+        :return: Dictionary mit Stichprobenanzahl und Zeitanteilen
+        """
+        return {
+            "samples": self.samples,
+            "missed_samples": self.missed_samples,
+            "rate_hz": self.rate_hz,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "sampling_seconds": round(self.sampling_seconds, 6),
+            "profiler_cpu_seconds": round(self.cpu_seconds, 6),
+            "mean_sample_us": round(self.sampling_seconds / self.samples * 1e6, 2) if self.samples else None,
+            # Zeitanteil, in dem der Profiler den GIL hielt und der Render-Thread warten musste
+            "overhead_percent": round(self.sampling_seconds / self.wall_seconds * 100, 3) if self.wall_seconds else None,
+        }
+
+    @staticmethod
+    def _frame_name(entry):
+        name, filename, line = entry
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def collapsed(self):
+        """
+        Profil im "collapsed stack"-Format (Brendan Gregg, flamegraph.pl, speedscope).
+
+        :return: String mit einer Zeile pro Stack: "a;b;c <Anzahl>"
+        """
+        lines = []
+        for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+            lines.append(";".join(self._frame_name(entry) for entry in stack) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name="led-render"):
+        """
+        Profil im Dateiformat von speedscope (https://www.speedscope.app).
+
+        :return: JSON-kompatibles Dictionary
+        """
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        interval = 1.0 / self.rate_hz
+
+        for stack, count in self.stacks.items():
+            indices = []
+            for entry in stack:
+                index = frame_index.get(entry)
+                if index is None:
+                    index = len(frames)
+                    frame_index[entry] = index
+                    frames.append({"name": entry[0], "file": entry[1], "line": entry[2]})
+                indices.append(index)
+            # Gleiche Stacks zusammengefasst, Gewicht = Anzahl * Intervall
+            samples.append(indices)
+            weights.append(count * interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "pivoltmeter",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
@@ -0,0 +1,162 @@
+import collections
+import threading
+import time
+from utils.metrics import metrics
+
+
+QUALITY_LEVEL = metrics.gauge(
+    'pivoltmeter_quality_level',
+    'Aktuelle Qualitätsstufe der Audio-Visualisierung (0 = volle Qualität)'
+)
+QUALITY_CHANGES = metrics.counter(
+    'pivoltmeter_quality_changes',
+    'Wechsel der Qualitätsstufe',
+    labelnames=('direction',)
+)
+FRAME_LOAD_RATIO = metrics.gauge(
+    'pivoltmeter_frame_load_ratio',
+    'Mittlere Rechenzeit pro Frame (ohne Warten auf Audio) im Verhältnis zum Frame-Budget'
+)
+
+# Qualitätsstufen von voll bis minimal:
+#   analysis_step: nur jedes n-te Audio-Sample pro Kanal für den Pegel auswerten
+#   render_divisor: nur jeden n-ten Audio-Chunk berechnen und ausgeben; die
+#                   Glättung läuft weiter über jeden Chunk, der nächste Frame
+#                   enthält also auch die übersprungenen
+QUALITY_LEVELS = (
+    {'analysis_step': 1, 'render_divisor': 1},
+    {'analysis_step': 2, 'render_divisor': 1},
+    {'analysis_step': 4, 'render_divisor': 2},
+    {'analysis_step': 8, 'render_divisor': 3},
+)
+
+
+class QualityController:
+    """
+    Regelt die Qualitätsstufe anhand der Rechenzeit pro Frame.
+
+    Nach jeweils window Frames wird die mittlere Last (Rechenzeit / Budget)
+    bewertet: Über high_load wird sofort eine Stufe gesenkt, unter low_load
+    wird erst nach up_windows aufeinanderfolgenden Fenstern eine Stufe
+    angehoben, damit die Stufe nicht ständig hin und her springt.
+    """
+
+    def __init__(self, levels=QUALITY_LEVELS, high_load=0.9, low_load=0.5, window=30, up_windows=5, history=20):
+        """
+        :param levels: Qualitätsstufen, beginnend mit der höchsten
+        :param high_load: Last, ab der die Qualität gesenkt wird
+        :param low_load: Last, unter der die Qualität wieder angehoben wird
+        :param window: Anzahl Frames pro Bewertung
+        :param up_windows: Aufeinanderfolgende Fenster mit wenig Last vor dem Anheben
+        :param history: Anzahl der gemerkten Wechsel für status()
+        :raises ValueError: Bei ungültigen Schwellen
+        """
+        if not levels:
+            raise ValueError("Mindestens eine Qualitätsstufe erforderlich")
+        if not 0 < low_load < high_load:
+            raise ValueError("Es muss 0 < low_load < high_load gelten")
+        if window < 1 or up_windows < 1:
+            raise ValueError("window und up_windows müssen mindestens 1 sein")
+
+        self.levels = levels
+        self.high_load = high_load
+        self.low_load = low_load
+        self.window = window
+        self.up_windows = up_windows
+        self.level = 0
+        self.load = None
+        self.budget = None
+        self._work = 0.0
+        self._frames = 0
+        self._quiet_windows = 0
+        self._history = collections.deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Erzeugt den Regler aus den QUALITY_*-Einstellungen.
+
+        :return: QualityController oder None, wenn config.QUALITY_ADAPTIVE nicht gesetzt ist
+        """
+        if not config.QUALITY_ADAPTIVE:
+            return None
+        return cls(
+            high_load=config.QUALITY_HIGH_LOAD,
+            low_load=config.QUALITY_LOW_LOAD,
+            window=config.QUALITY_WINDOW,
+        )
+
+    @property
+    def settings(self):
+        """Einstellungen der aktuellen Stufe"""
+        return self.levels[self.level]
+
+    def observe(self, work_seconds, budget_seconds):
+        """
+        Erfasst die Rechenzeit eines Frames.
+
+        :param work_seconds: Rechenzeit des Frames ohne Warten (Audio, Pause)
+        :param budget_seconds: Verfügbare Zeit pro Frame
+        :return: True, wenn sich die Stufe geändert hat
+        """
+        self._work += work_seconds
+        self._frames += 1
+        if self._frames < self.window:
+            return False
+
+        self.budget = budget_seconds
+        self.load = self._work / self._frames / budget_seconds
+        self._work = 0.0
+        self._frames = 0
+        FRAME_LOAD_RATIO.set(self.load)
+
+        if self.load > self.high_load:
+            self._quiet_windows = 0
+            if self.level < len(self.levels) - 1:
+                self._change(self.level + 1, 'down')
+                return True
+        elif self.load < self.low_load:
+            self._quiet_windows += 1
+            if self._quiet_windows >= self.up_windows and self.level > 0:
+                self._quiet_windows = 0
+                self._change(self.level - 1, 'up')
+                return True
+        else:
+            self._quiet_windows = 0
+        return False
+
+    def _change(self, level, direction):
+        previous = self.level
+        self.level = level
+        QUALITY_LEVEL.set(level)
+        QUALITY_CHANGES.labels(direction=direction).inc()
+        entry = {
+            "time": time.time(),
+            "from": previous,
+            "to": level,
+            "load": round(self.load, 3),
+            "budget_ms": round(self.budget * 1000, 3),
+            "settings": dict(self.levels[level]),
+        }
+        with self._lock:
+            self._history.append(entry)
+        print(f"[Qualität] Stufe {previous} -> {level} bei {self.load * 100:.0f} % Last "
+              f"(Budget {self.budget * 1000:.1f} ms): {self.levels[level]}")
+
+    def status(self):
+        """
+        :return: Dictionary mit Stufe, Einstellungen, letzter Last und den letzten Wechseln
+        """
+        with self._lock:
+            history = list(self._history)
+        return {
+            "level": self.level,
+            "settings": dict(self.settings),
+            "levels": [dict(level) for level in self.levels],
+            "load": round(self.load, 3) if self.load is not None else None,
+            "budget_ms": round(self.budget * 1000, 3) if self.budget is not None else None,
+            "high_load": self.high_load,
+            "low_load": self.low_load,
+            "history": history,
+        }
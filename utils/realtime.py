@@ -0,0 +1,213 @@
+import gc
+import os
+import threading
+import time
+from utils.metrics import metrics
+
+
+GC_PAUSE_SECONDS = metrics.histogram(
+    'pivoltmeter_gc_pause_seconds',
+    'Dauer der Garbage Collection (alle Threads, blockiert den gesamten Interpreter)',
+    labelnames=('generation',)
+)
+GC_IDLE_COLLECTIONS = metrics.counter(
+    'pivoltmeter_gc_idle_collections',
+    'Garbage Collections, die in der Wartezeit zwischen zwei Frames ausgeführt wurden',
+    labelnames=('generation',)
+)
+GC_FORCED_COLLECTIONS = metrics.counter(
+    'pivoltmeter_gc_forced_collections',
+    'Garbage Collections außerhalb der Wartezeit, weil zu lange keine Zeit dafür war'
+)
+
+_gc_metrics_lock = threading.Lock()
+_gc_metrics_installed = False
+_gc_started = {}
+
+
+def _on_gc(phase, info):
+    # Der Collector läuft in genau einem Thread gleichzeitig; Startzeit pro Thread merken
+    if phase == 'start':
+        _gc_started[threading.get_ident()] = time.perf_counter()
+    else:
+        start = _gc_started.pop(threading.get_ident(), None)
+        if start is not None:
+            GC_PAUSE_SECONDS.labels(generation=info['generation']).observe(time.perf_counter() - start)
+
+
+def install_gc_metrics():
+    """Misst ab jetzt jede Garbage Collection (mehrfacher Aufruf ist unschädlich)"""
+    global _gc_metrics_installed
+    with _gc_metrics_lock:
+        if not _gc_metrics_installed:
+            gc.callbacks.append(_on_gc)
+            _gc_metrics_installed = True
+
+
+class RealtimeProfile:
+    """
+    Optionale Echtzeit-Einstellungen für den Render-Thread (nur Linux):
+
+    - CPU-Affinität: Render-Thread auf eigene Kerne, alle anderen Threads
+      (Flask, Netzwerk, Audio-Initialisierung) auf die übrigen Kerne
+    - Scheduler: SCHED_FIFO oder SCHED_RR für den Render-Thread (benötigt root
+      bzw. CAP_SYS_NICE, sonst wird nur eine Warnung ausgegeben)
+    - gc.freeze() nach dem Start: alle bis dahin erzeugten Objekte werden von
+      der Garbage Collection nicht mehr durchsucht
+    - Garbage Collection nur in der Wartezeit zwischen zwei Frames
+
+    Jede Einstellung lässt sich einzeln abschalten, damit ihre Wirkung an
+    pivoltmeter_frame_jitter_seconds und pivoltmeter_gc_pause_seconds
+    verglichen werden kann.
+    """
+
+    POLICIES = {'fifo': 'SCHED_FIFO', 'rr': 'SCHED_RR'}
+
+    def __init__(self, render_cpus=None, audio_cpus=None, policy='fifo', priority=50,
+                 gc_freeze=True, gc_idle=True, gc_idle_min_budget=0.002):
+        """
+        :param render_cpus: Kerne für den Render-Thread (None = letzter verfügbarer Kern, [] = nicht festlegen)
+        :param audio_cpus: Kerne für die Audio-Initialisierung (None = die übrigen Kerne)
+        :param policy: 'fifo', 'rr' oder None (Standard-Scheduler beibehalten)
+        :param priority: Echtzeit-Priorität (1-99)
+        :param gc_freeze: Nach dem Start gc.freeze() aufrufen
+        :param gc_idle: Automatische Garbage Collection abschalten und nur in der Wartezeit sammeln
+        :param gc_idle_min_budget: Mindestwartezeit in Sekunden, ab der gesammelt wird
+        """
+        if policy is not None and policy not in self.POLICIES:
+            raise ValueError(f"Unbekannte Scheduler-Policy: {policy}")
+        if not 1 <= priority <= 99:
+            raise ValueError("Die Echtzeit-Priorität muss zwischen 1 und 99 liegen")
+
+        self.policy = policy
+        self.priority = priority
+        self.gc_freeze = gc_freeze
+        self.gc_idle = gc_idle
+        self.gc_idle_min_budget = gc_idle_min_budget
+        self.render_cpus, self.other_cpus = self._split_cpus(render_cpus)
+        self.audio_cpus = set(audio_cpus) if audio_cpus is not None else self.other_cpus
+        self._gc_thresholds = gc.get_threshold()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Erzeugt das Profil aus den REALTIME_*-Einstellungen.
+
+        :return: RealtimeProfile oder None, wenn config.REALTIME_ENABLED nicht gesetzt ist
+        """
+        if not config.REALTIME_ENABLED:
+            return None
+        return cls(
+            render_cpus=config.REALTIME_RENDER_CPUS,
+            audio_cpus=config.REALTIME_AUDIO_CPUS,
+            policy=config.REALTIME_POLICY,
+            priority=config.REALTIME_PRIORITY,
+            gc_freeze=config.REALTIME_GC_FREEZE,
+            gc_idle=config.REALTIME_GC_IDLE,
+        )
+
+    @staticmethod
+    def _split_cpus(render_cpus):
+        if not hasattr(os, 'sched_getaffinity'):
+            return set(), set()
+        available = os.sched_getaffinity(0)
+        if render_cpus is None:
+            # Ohne Angabe: letzter Kern für das Rendern, sofern noch einer übrig bleibt
+            render_cpus = {max(available)} if len(available) > 1 else set()
+        render_cpus = set(render_cpus) & available
+        other_cpus = (available - render_cpus) or available
+        return render_cpus, other_cpus
+
+    @staticmethod
+    def _set_affinity(cpus, label):
+        if not cpus or not hasattr(os, 'sched_setaffinity'):
+            return
+        try:
+            os.sched_setaffinity(0, cpus)
+            print(f"[Echtzeit] {label} auf Kern(e) {sorted(cpus)}")
+        except OSError as e:
+            print(f"[Echtzeit] CPU-Affinität für {label} nicht gesetzt: {e}")
+
+    def apply_process(self):
+        """
+        Im Hauptthread vor dem Start aller anderen Threads aufrufen: neue Threads
+        erben die Affinität und bleiben so vom Render-Kern fern.
+        """
+        self._set_affinity(self.other_cpus if self.render_cpus else set(), "Hauptprozess")
+
+    def apply_render_thread(self):
+        """Im Render-Thread aufrufen: eigene Kerne und Echtzeit-Scheduler"""
+        self._set_affinity(self.render_cpus, "Render-Thread")
+        if self.policy is None or not hasattr(os, 'sched_setscheduler'):
+            return
+        try:
+            policy = getattr(os, self.POLICIES[self.policy])
+            # pid 0 = aufrufender Thread
+            os.sched_setscheduler(0, policy, os.sched_param(self.priority))
+            print(f"[Echtzeit] Render-Thread mit {self.POLICIES[self.policy]}, Priorität {self.priority}")
+        except (OSError, AttributeError) as e:
+            print(f"[Echtzeit] Scheduler {self.policy} nicht gesetzt (root oder CAP_SYS_NICE nötig): {e}")
+
+    def apply_audio_thread(self):
+        """
+        In Threads aufrufen, die vom Render-Thread gestartet werden (Audio-Initialisierung):
+        Sie würden sonst Kern und Echtzeit-Priorität erben und den Render-Thread blockieren.
+        """
+        self._set_affinity(self.audio_cpus if self.render_cpus else set(), "Audio-Initialisierung")
+        if self.policy is None or not hasattr(os, 'sched_setscheduler'):
+            return
+        try:
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        except OSError as e:
+            print(f"[Echtzeit] Scheduler der Audio-Initialisierung nicht zurückgesetzt: {e}")
+
+    def after_startup(self):
+        """Nach dem Start (erster Frame): Startobjekte einfrieren, GC in die Wartezeit verlegen"""
+        if self.gc_freeze:
+            gc.collect()
+            gc.freeze()
+            print(f"[Echtzeit] gc.freeze(): {gc.get_freeze_count()} Objekte von der Garbage Collection ausgenommen")
+        if self.gc_idle:
+            gc.disable()
+            print("[Echtzeit] Garbage Collection nur noch zwischen den Frames")
+
+    def idle(self, budget):
+        """
+        Nutzt die Wartezeit zwischen zwei Frames für die Garbage Collection.
+        Es wird nur die Generation gesammelt, die auch der automatische Collector
+        jetzt sammeln würde.
+
+        :param budget: Verfügbare Wartezeit in Sekunden
+        :return: Verbrauchte Zeit in Sekunden
+        """
+        if not self.gc_idle:
+            return 0.0
+
+        threshold0, threshold1, threshold2 = self._gc_thresholds
+        count0, count1, count2 = gc.get_count()
+        if count0 < threshold0:
+            return 0.0
+
+        # Kommt lange keine ausreichende Wartezeit, trotzdem sammeln, damit der Speicher nicht wächst
+        forced = count0 >= threshold0 * 10
+        if budget < self.gc_idle_min_budget and not forced:
+            return 0.0
+
+        generation = 0
+        if count1 >= threshold1:
+            generation = 1
+            if count2 >= threshold2:
+                generation = 2
+
+        start = time.perf_counter()
+        gc.collect(generation)
+        if forced and budget < self.gc_idle_min_budget:
+            GC_FORCED_COLLECTIONS.inc()
+        else:
+            GC_IDLE_COLLECTIONS.labels(generation=generation).inc()
+        return time.perf_counter() - start
+
+    def shutdown(self):
+        """Stellt die automatische Garbage Collection wieder her"""
+        if self.gc_idle:
+            gc.enable()
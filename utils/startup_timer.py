@@ -0,0 +1,72 @@
+import threading
+import time
+from contextlib import contextmanager
+from utils.metrics import metrics
+
+
+STARTUP_PHASE_SECONDS = metrics.gauge(
+    'pivoltmeter_startup_phase_seconds',
+    'Dauer der einzelnen Startphasen',
+    labelnames=('phase',)
+)
+STARTUP_MILESTONE_SECONDS = metrics.gauge(
+    'pivoltmeter_startup_milestone_seconds',
+    'Zeitpunkt eines Meilensteins seit Programmstart',
+    labelnames=('milestone',)
+)
+
+
+class StartupTimer:
+    """
+    Erfasst die Dauer der Startphasen (auch aus mehreren Threads) und gibt
+    eine Aufschlüsselung aus.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def elapsed(self):
+        """Sekunden seit Programmstart"""
+        return time.perf_counter() - self.start
+
+    def mark(self, milestone):
+        """
+        Hält einen Meilenstein fest (z.B. "Webserver nimmt Anfragen an").
+
+        :param milestone: Bezeichnung des Meilensteins
+        """
+        at = self.elapsed()
+        STARTUP_MILESTONE_SECONDS.labels(milestone=milestone).set(round(at, 4))
+        print(f"[Start] {milestone} nach {at * 1000:.0f} ms")
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Misst die Dauer eines Abschnitts:
+
+            with startup_timer.phase("LED-Streifen"):
+                ...
+        """
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - begin
+            with self._lock:
+                self.phases.append((name, threading.current_thread().name, begin - self.start, duration))
+            STARTUP_PHASE_SECONDS.labels(phase=name).set(round(duration, 4))
+            print(f"[Start] {name}: {duration * 1000:.0f} ms")
+
+    def report(self):
+        """Gibt die Aufschlüsselung aller bisher gemessenen Phasen aus"""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[2])
+        print("[Start] Aufschlüsselung:")
+        for name, thread_name, begin, duration in phases:
+            print(f"[Start]   {begin * 1000:7.0f} ms  +{duration * 1000:6.0f} ms  {name} ({thread_name})")
+
+
+# Startzeitpunkt = erster Import dieses Moduls (main.py importiert es zuerst)
+startup_timer = StartupTimer()
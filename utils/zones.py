@@ -0,0 +1,307 @@
+"""
+Zonen: mehrere Muster gleichzeitig auf Streifen oder Abschnitten davon.
+
+Eine Zone (Einstellung 'zones', über /zones oder /settings änderbar):
+
+    {"name": "links", "strip": 1, "start": 0, "length": 30,
+     "mode": "static", "pattern": "static_pattern_02", "color": "fire", "fps": 30}
+
+    name     Eindeutiger Name für Meldungen und /zones (höchstens 32 Zeichen)
+    strip    1, 2 oder "both" (Standard "both": Stereo-Muster zeigen links/rechts wie gewohnt)
+    start    Erste LED (Standard 0)
+    length   Anzahl LEDs (Standard: bis zum Ende des Streifens)
+    mode     'static', 'audio' oder 'off' (Standard 'static')
+    pattern  Muster des Modus (Standard: aktuelles Muster aus Config)
+    color    Palettenname oder '#rrggbb' (Standard: aktuelle Farbe)
+    fps      Feste Bildrate (Standard None: Takt des Musters wie ohne Zonen)
+
+Zonen auf demselben Streifen dürfen sich nicht überschneiden; LEDs außerhalb
+aller Zonen bleiben aus. Eine Zone auf nur einem Streifen zeigt das, was das
+Muster auf dem ersten Streifen zeigen würde (bei Stereo-Mustern den linken Kanal).
+
+Alle Zonen laufen im Render-Thread: Der ZoneScheduler ruft pro Takt die fälligen
+Zonen auf, die in Ausschnitte (SegmentStrip) der gemeinsamen Streifen schreiben,
+und gibt danach beide Streifen einmal aus. Audio-Zonen teilen sich eine Analyse
+pro Audio-Chunk und werden nur mit einem neuen Chunk berechnet. Parameter
+(Config.PATTERN_PARAMS) und Modulation gelten je Muster, also für alle Zonen
+mit diesem Muster. Der Modus 'off' und externe Frames haben Vorrang vor Zonen.
+"""
+import time
+from config.config import Config
+from led_controllers.base_controller import STRIP_SHOW_SECONDS
+from led_controllers.output import Color, SegmentStrip, VirtualStrip
+from utils.metrics import metrics
+
+
+ZONE_FRAMES = metrics.counter(
+    'pivoltmeter_zone_frames',
+    'Berechnete Frames je Zonenplatz (Position in der Liste, 0 bis MAX_ZONES - 1)',
+    labelnames=('zone',)
+)
+ZONE_TICKS = metrics.counter(
+    'pivoltmeter_zone_ticks',
+    'Takte des Zonen-Schedulers mit gemeinsamer Ausgabe beider Streifen'
+)
+
+MAX_ZONES = 16
+MAX_ZONE_NAME = 32
+ZONE_MODES = ('static', 'audio', 'off')
+
+
+def validate_zones(zones, config):
+    """
+    Prüft eine vollständige Liste von Zonen.
+
+    :param zones: Liste von Zonen (siehe Modulbeschreibung)
+    :param config: Config-Klasse (LED-Anzahl, Muster, aktuelle Farbe)
+    :return: Liste normalisierter Zonen mit allen Feldern
+    :raises ValueError: Bei ungültigen Feldern oder überlappenden Zonen
+    """
+    from led_controllers.palette import palettes
+
+    if not isinstance(zones, list):
+        raise ValueError("zones muss eine Liste von Zonen sein")
+    if len(zones) > MAX_ZONES:
+        raise ValueError(f"Höchstens {MAX_ZONES} Zonen erlaubt")
+
+    result = []
+    names = set()
+    # Belegte LEDs je Streifen als (start, ende, name)
+    used = {1: [], 2: []}
+    for zone in zones:
+        if not isinstance(zone, dict):
+            raise ValueError("Eine Zone muss ein Objekt sein")
+        unknown = set(zone) - {'name', 'strip', 'start', 'length', 'mode', 'pattern', 'color', 'fps'}
+        if unknown:
+            raise ValueError(f"Unbekannte Felder in der Zone: {', '.join(sorted(unknown))}")
+
+        name = zone.get('name')
+        if not isinstance(name, str) or not name:
+            raise ValueError("Jede Zone braucht einen Namen")
+        if len(name) > MAX_ZONE_NAME:
+            raise ValueError(f"Zonenname darf höchstens {MAX_ZONE_NAME} Zeichen lang sein: {name[:MAX_ZONE_NAME]}...")
+        if name in names:
+            raise ValueError(f"Zone {name} ist doppelt vorhanden")
+        names.add(name)
+
+        strip = zone.get('strip', 'both')
+        if strip not in (1, 2, 'both'):
+            raise ValueError(f"Zone {name}: strip muss 1, 2 oder 'both' sein: {strip}")
+
+        start = zone.get('start', 0)
+        if isinstance(start, bool) or not isinstance(start, int) or not 0 <= start < config.LED_PER_STRIP:
+            raise ValueError(f"Zone {name}: start muss zwischen 0 und {config.LED_PER_STRIP - 1} liegen: {start}")
+        length = zone.get('length')
+        if length is None:
+            length = config.LED_PER_STRIP - start
+        if isinstance(length, bool) or not isinstance(length, int) or not 1 <= length <= config.LED_PER_STRIP - start:
+            raise ValueError(f"Zone {name}: length muss zwischen 1 und {config.LED_PER_STRIP - start} liegen: {length}")
+
+        mode = zone.get('mode', 'static')
+        if mode not in ZONE_MODES:
+            raise ValueError(f"Zone {name}: Ungültiger Modus: {mode}")
+        patterns = config.AUDIO_PATTERNS if mode == 'audio' else config.STATIC_PATTERNS
+        pattern = zone.get('pattern', config.AUDIO_PATTERN if mode == 'audio' else config.STATIC_PATTERN)
+        if pattern not in patterns:
+            raise ValueError(f"Zone {name}: Ungültiges Muster für Modus {mode}: {pattern}")
+
+        color = zone.get('color', config.LED_COLOR)
+        if not isinstance(color, str) or not color:
+            raise ValueError(f"Zone {name}: Ungültige Farbe: {color}")
+        color = palettes.normalize(color)
+
+        fps = zone.get('fps')
+        if fps is not None and (isinstance(fps, bool) or not isinstance(fps, (int, float)) or not 1 <= fps <= 240):
+            raise ValueError(f"Zone {name}: fps muss zwischen 1 und 240 liegen: {fps}")
+
+        for number in ((1, 2) if strip == 'both' else (strip,)):
+            for other_start, other_end, other_name in used[number]:
+                if start < other_end and other_start < start + length:
+                    raise ValueError(f"Zone {name} überschneidet sich auf Streifen {number} mit Zone {other_name}")
+            used[number].append((start, start + length, name))
+
+        result.append({
+            "name": name,
+            "strip": strip,
+            "start": start,
+            "length": length,
+            "mode": mode,
+            "pattern": pattern,
+            "color": color,
+            "fps": float(fps) if fps is not None else None,
+        })
+    return result
+
+
+class Zone:
+    """Eine Zone mit eigenem Visualizer, der in Ausschnitte der gemeinsamen Streifen schreibt"""
+
+    def __init__(self, settings, strips, slot=0):
+        """
+        :param settings: Normalisierte Zone aus validate_zones()
+        :param strips: Die beiden gemeinsamen LED-Streifen
+        :param slot: Position in der Liste der Zonen (Label der Metriken)
+        """
+        self.name = settings['name']
+        self.mode = settings['mode']
+        self.pattern = settings['pattern']
+        self.color = settings['color']
+        self.length = settings['length']
+        self.interval = 1.0 / settings['fps'] if settings['fps'] else None
+        # Zeitpunkt (time.monotonic()), ab dem die Zone wieder berechnet wird
+        self.due = 0.0
+        # Metriken je Platz statt je Name: Namen sind frei wählbar, Plätze auf MAX_ZONES begrenzt
+        self.frame_counter = ZONE_FRAMES.labels(zone=str(slot))
+        self.frames = 0
+
+        start = settings['start']
+        if settings['strip'] == 'both':
+            self.segments = (SegmentStrip(strips[0], start, self.length), SegmentStrip(strips[1], start, self.length))
+            visualizer_strips = self.segments
+        else:
+            # Der zweite Streifen des Musters wird verworfen
+            self.segments = (SegmentStrip(strips[settings['strip'] - 1], start, self.length),)
+            visualizer_strips = (self.segments[0], VirtualStrip(self.length))
+
+        if self.mode == 'audio':
+            # Import erst hier, da numpy nur für Audio-Muster benötigt wird
+            from led_controllers.audio_visualizer import AudioVisualizer
+            self.visualizer = AudioVisualizer(strips=visualizer_strips, start_stream=False)
+        elif self.mode == 'static':
+            from led_controllers.pattern_visualizer import PatternVisualizer
+            self.visualizer = PatternVisualizer(strips=visualizer_strips)
+        else:
+            self.visualizer = None
+        if self.visualizer is not None:
+            self.visualizer.zone = self
+
+    def render(self, now, source=None):
+        """
+        Berechnet den nächsten Frame der Zone (ohne Ausgabe) und plant den nächsten.
+
+        :param now: Aktuelle Zeit (time.monotonic())
+        :param source: AudioVisualizer mit dem analysierten Chunk (nur für Audio-Zonen)
+        :return: True, wenn ein Frame berechnet wurde
+        """
+        visualizer = self.visualizer
+        if self.mode == 'audio':
+            if source is None:
+                return False
+            visualizer.render(visualizer.context, visualizer.follow(source))
+        else:
+            visualizer.update()
+        self.frames += 1
+        self.frame_counter.inc()
+
+        # Feste Bildrate oder Takt des Musters wie im LED-Manager; verpasste Frames nicht nachholen
+        interval = self.interval if self.interval is not None else Config.FRAME_PAUSE + visualizer.frame_delay
+        self.due = max(self.due + interval, now)
+        return True
+
+    def status(self):
+        state_bytes = self.visualizer.states.nbytes if self.mode == 'static' else 0
+        return {"name": self.name, "mode": self.mode, "pattern": self.pattern, "color": self.color,
+                "frames": self.frames, "state_bytes": state_bytes}
+
+    def close(self):
+        """Gibt den Animationszustand der Zone ab (vor dem Neuaufbau der Zonen)"""
+        if self.mode == 'static':
+            self.visualizer.states.release()
+
+
+class ZoneScheduler:
+    """
+    Berechnet alle Zonen im Render-Thread und gibt beide Streifen einmal pro Takt aus.
+    """
+
+    def __init__(self, strips):
+        """
+        :param strips: Die beiden gemeinsamen LED-Streifen (strip_one, strip_two)
+        """
+        self.strips = strips
+        self.zones = []
+        self.needs_audio = False
+        self._settings = None
+        self._audio_source = None
+        # Zeitpunkt (time.monotonic()), ab dem der nächste Audio-Chunk gelesen wird
+        self._audio_due = 0.0
+
+    def sync(self, config):
+        """
+        Baut die Zonen neu auf, wenn sich config.ZONES geändert hat (apply_settings()
+        ersetzt die Liste, daher genügt ein Vergleich der Identität). Der Zustand der
+        Muster beginnt dabei von vorn.
+
+        :return: True, wenn neu aufgebaut wurde
+        """
+        if config.ZONES is self._settings:
+            return False
+        self._settings = config.ZONES
+        for zone in self.zones:
+            zone.close()
+        self.zones = [Zone(settings, self.strips, slot) for slot, settings in enumerate(config.ZONES)]
+        self.needs_audio = any(zone.mode == 'audio' for zone in self.zones)
+        # LEDs außerhalb der Zonen und Zonen im Modus 'off' ausschalten
+        for strip in self.strips:
+            for n in range(config.LED_PER_STRIP):
+                strip.setPixelColor(n, Color(0, 0, 0))
+        self._show()
+        print(f"Zonen: {', '.join(f'{zone.name} ({zone.pattern})' for zone in self.zones) or 'keine'}")
+        return True
+
+    def tick(self, source=None):
+        """
+        Berechnet alle fälligen Zonen und gibt die Streifen aus, wenn sich etwas geändert hat.
+
+        :param source: Laufender AudioVisualizer (None, solange Audio nicht bereit ist)
+        :return: True, wenn die Streifen ausgegeben wurden
+        """
+        now = time.monotonic()
+        self._audio_source = source if self.needs_audio else None
+        analyzed = None
+        if self._audio_source is not None and self._audio_ready(source, now):
+            # Ein Chunk für alle Audio-Zonen
+            source.analyze(source.context)
+            analyzed = source
+            now = time.monotonic()
+            # read() kehrt zurück, sobald der Chunk vollständig ist; der nächste folgt eine Chunk-Dauer später
+            self._audio_due = now + source.CHUNK / source.RATE
+
+        rendered = False
+        for zone in self.zones:
+            if zone.visualizer is None or now < zone.due:
+                continue
+            rendered = zone.render(now, analyzed) or rendered
+        if rendered:
+            self._show()
+            ZONE_TICKS.inc()
+        return rendered
+
+    def _audio_ready(self, source, now):
+        """
+        Ob der nächste Chunk gelesen werden soll: nach der Dauer eines Chunks oder
+        sofort, wenn bereits ein ganzer Chunk im Puffer liegt (dann blockiert read() nicht).
+        """
+        if now >= self._audio_due:
+            return True
+        return source.stream is not None and source.stream.get_read_available() >= source.CHUNK
+
+    def wait_seconds(self):
+        """Wartezeit bis zur nächsten fälligen statischen Zone bzw. zum nächsten Audio-Chunk"""
+        due = [zone.due for zone in self.zones if zone.visualizer is not None and zone.mode == 'static']
+        if self._audio_source is not None:
+            due.append(self._audio_due)
+        if not due:
+            # Nur Audio-Zonen ohne bereites Audio bzw. nur Zonen im Modus 'off'
+            return 0.02
+        return max(0.0, min(due) - time.monotonic())
+
+    def _show(self):
+        start = time.perf_counter()
+        self.strips[0].show()
+        self.strips[1].show()
+        STRIP_SHOW_SECONDS.observe(time.perf_counter() - start)
+
+    def status(self):
+        """Zonen mit Muster und Anzahl berechneter Frames (für /zones)"""
+        return [zone.status() for zone in self.zones]